@@ -113,11 +113,8 @@ def main(date, top, show_risky, show_locked, ignore_locks, cookies, output, verb
         if discord:
             load_dotenv()
             try:
-                # Get earliest game time for deadline display
-                _, games = session.get_players_for_date(date)
-                earliest_game_time = get_earliest_game_time(games)
-
-                # Get notable injuries for the digest
+                # Reuse the games and injury matches behind the recommendations
+                earliest_game_time = get_earliest_game_time(session.last_games)
                 notable_injuries = session.get_notable_injuries(date)
 
                 success = post_to_discord(
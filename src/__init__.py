@@ -1,6 +1,7 @@
 # TTFL Picker modules
 
 from datetime import datetime
+from functools import lru_cache
 
 
 def get_current_season() -> str:
@@ -11,9 +12,12 @@ def get_current_season() -> str:
     and ends in June. Before October, we're in the previous season.
     """
     now = datetime.now()
-    year = now.year
-    month = now.month
+    return _season_for(now.year, now.month)
 
+
+@lru_cache(maxsize=None)
+def _season_for(year: int, month: int) -> str:
+    """Get the season string for a calendar month (memoized: it only changes monthly)."""
     # NBA season starts in October
     # If we're in Oct-Dec, season is current_year to next_year
     # If we're in Jan-Sep, season is previous_year to current_year
@@ -1,12 +1,15 @@
 """Team defense statistics and TTFL defense rating calculation."""
 
+import threading
 from dataclasses import dataclass
+from datetime import date
 
+import numpy as np
 from nba_api.stats.endpoints import LeagueDashTeamStats
 from nba_api.stats.static import teams
 
-from . import get_current_season
-from .nba_config import nba_api_call
+from . import disk_cache, get_current_season
+from .nba_config import NBA_CACHE_TTL, nba_api_call
 
 
 # Maximum defense adjustment
@@ -15,8 +18,17 @@ MAX_DEFENSE_ADJUSTMENT = 0.30  # +/- 30%
 # Cache for team defense stats (populated once per run)
 _defense_stats_cache: dict[int, "TeamDefenseStats"] | None = None
 
+# Serializes cache fills so concurrent callers share a single fetch
+_defense_stats_lock = threading.Lock()
 
-@dataclass
+# Flat team_id -> defense_factor view of the cache for per-player lookups
+_defense_factor_by_team: dict[int, float] = {}
+
+# Static team metadata indexed by team ID (built once at import)
+_TEAM_BY_ID: dict[int, dict] = {t["id"]: t for t in teams.get_teams()}
+
+
+@dataclass(slots=True)
 class TeamDefenseStats:
     """Defense statistics for a team."""
 
@@ -34,30 +46,42 @@ class TeamDefenseStats:
     defense_factor: float  # Factor relative to league average
 
 
-def _calculate_estimated_ttfl_allowed(stats: dict) -> float:
+def _result_set_columns(result_set: dict) -> dict[str, np.ndarray]:
+    """Transpose a raw nba_api result set ({"headers", "rowSet"}) into columns."""
+    headers = result_set["headers"]
+    rows = result_set["rowSet"]
+    data = np.array(rows, dtype=object).reshape(len(rows), len(headers))
+    return {header: data[:, i] for i, header in enumerate(headers)}
+
+
+def _opp_column(columns: dict[str, np.ndarray], column: str) -> np.ndarray:
+    """Get an opponent stat column as a float array (missing values become 0)."""
+    if column not in columns:
+        return np.zeros(len(columns["TEAM_ID"]))
+    return np.nan_to_num(columns[column].astype(np.float64))
+
+
+def _calculate_estimated_ttfl_allowed(columns: dict[str, np.ndarray]) -> np.ndarray:
     """
-    Estimate TTFL points a defense allows per player.
+    Estimate TTFL points each defense allows per player.
 
     This is a rough estimate based on team-level opponent stats,
-    distributed across ~5 main players.
+    distributed across ~5 main players. Operates on the whole
+    LeagueDashTeamStats result set at once (one value per team row).
     """
     # Get opponent stats (what the defense allows)
-    opp_pts = stats.get("OPP_PTS", 0) or 0
-    opp_reb = stats.get("OPP_REB", 0) or 0
-    opp_ast = stats.get("OPP_AST", 0) or 0
-    opp_fgm = stats.get("OPP_FGM", 0) or 0
-    opp_fg3m = stats.get("OPP_FG3M", 0) or 0
-    opp_ftm = stats.get("OPP_FTM", 0) or 0
-    opp_tov = stats.get("OPP_TOV", 0) or 0  # Turnovers forced (negative for opponent)
+    opp_pts = _opp_column(columns, "OPP_PTS")
+    opp_reb = _opp_column(columns, "OPP_REB")
+    opp_ast = _opp_column(columns, "OPP_AST")
+    opp_fgm = _opp_column(columns, "OPP_FGM")
+    opp_fg3m = _opp_column(columns, "OPP_FG3M")
+    opp_ftm = _opp_column(columns, "OPP_FTM")
+    opp_tov = _opp_column(columns, "OPP_TOV")  # Turnovers forced (negative for opponent)
 
     # Also need misses for negative TTFL contribution
-    opp_fga = stats.get("OPP_FGA", 0) or 0
-    opp_fg3a = stats.get("OPP_FG3A", 0) or 0
-    opp_fta = stats.get("OPP_FTA", 0) or 0
-
-    opp_fg_miss = opp_fga - opp_fgm
-    opp_fg3_miss = opp_fg3a - opp_fg3m
-    opp_ft_miss = opp_fta - opp_ftm
+    opp_fg_miss = _opp_column(columns, "OPP_FGA") - opp_fgm
+    opp_fg3_miss = _opp_column(columns, "OPP_FG3A") - opp_fg3m
+    opp_ft_miss = _opp_column(columns, "OPP_FTA") - opp_ftm
 
     # TTFL formula applied to team totals
     positive = opp_pts + opp_reb + opp_ast + opp_fgm + opp_fg3m + opp_ftm
@@ -75,18 +99,19 @@ def _calculate_estimated_ttfl_allowed(stats: dict) -> float:
 
 def get_team_abbrev(team_id: int) -> str:
     """Get team abbreviation from team ID."""
-    for team in teams.get_teams():
-        if team["id"] == team_id:
-            return team["abbreviation"]
-    return str(team_id)
+    return _TEAM_BY_ID.get(team_id, {}).get("abbreviation", str(team_id))
 
 
 def get_team_name(team_id: int) -> str:
     """Get team full name from team ID."""
-    for team in teams.get_teams():
-        if team["id"] == team_id:
-            return team["full_name"]
-    return str(team_id)
+    return _TEAM_BY_ID.get(team_id, {}).get("full_name", str(team_id))
+
+
+def _set_cache(team_defense: dict[int, TeamDefenseStats]) -> None:
+    """Populate the in-memory cache and its defense factor view."""
+    global _defense_stats_cache, _defense_factor_by_team
+    _defense_stats_cache = team_defense
+    _defense_factor_by_team = {team_id: stats.defense_factor for team_id, stats in team_defense.items()}
 
 
 def fetch_team_defense_stats(season: str | None = None) -> dict[int, TeamDefenseStats]:
@@ -96,25 +121,43 @@ def fetch_team_defense_stats(season: str | None = None) -> dict[int, TeamDefense
     Uses LeagueDashTeamStats with MeasureType="Opponent" to get
     what each team allows on defense.
 
+    Safe to call from several threads: concurrent callers wait for a
+    single fetch and then share its result.
+
     Args:
         season: NBA season string
 
     Returns:
         Dict mapping team_id to TeamDefenseStats
     """
-    global _defense_stats_cache
-
     if _defense_stats_cache is not None:
         return _defense_stats_cache
 
+    with _defense_stats_lock:
+        # Another thread may have filled the cache while we were waiting
+        if _defense_stats_cache is not None:
+            return _defense_stats_cache
+        return _load_team_defense_stats(season)
+
+
+def _load_team_defense_stats(season: str | None) -> dict[int, TeamDefenseStats]:
+    """Fill the cache from disk or the NBA API (caller holds the lock)."""
     if season is None:
         season = get_current_season()
 
+    # Team defense changes at most once a day: reuse today's result across runs
+    cache_key = f"defense_{season}_{date.today().isoformat()}"
+    cached = disk_cache.load(cache_key)
+    if cached is not None:
+        _set_cache(cached)
+        return cached
+
     try:
         # Fetch opponent stats (what defenses allow)
         team_stats = nba_api_call(
             LeagueDashTeamStats,
             critical=False,
+            cache_ttl=NBA_CACHE_TTL,
             season=season,
             measure_type_detailed_defense="Opponent",
             per_mode_detailed="PerGame",
@@ -122,66 +165,61 @@ def fetch_team_defense_stats(season: str | None = None) -> dict[int, TeamDefense
         if team_stats is None:
             print("Warning: Could not fetch team defense stats (all retries exhausted)")
             return {}
-        df = team_stats.get_data_frames()[0]
+        # Read the raw result set: only a handful of numeric columns are needed
+        columns = _result_set_columns(team_stats.get_dict()["resultSets"][0])
 
-        if df.empty:
+        if len(columns["TEAM_ID"]) == 0:
             print("Warning: No team defense stats available")
             return {}
 
-        # Calculate stats for each team
-        team_defense = {}
-        ttfl_allowed_values = []
+        # Estimate TTFL allowed for every team at once
+        ttfl_allowed = _calculate_estimated_ttfl_allowed(columns)
 
-        for _, row in df.iterrows():
-            team_id = row["TEAM_ID"]
-            stats = row.to_dict()
+        # Calculate league average and capped defense factors
+        league_avg = ttfl_allowed.mean()
+        if league_avg > 0:
+            defense_factors = np.clip(
+                ttfl_allowed / league_avg,
+                1.0 - MAX_DEFENSE_ADJUSTMENT,
+                1.0 + MAX_DEFENSE_ADJUSTMENT,
+            )
+        else:
+            defense_factors = np.ones(len(ttfl_allowed))
 
-            estimated_ttfl = _calculate_estimated_ttfl_allowed(stats)
-            ttfl_allowed_values.append(estimated_ttfl)
+        team_names = columns.get("TEAM_NAME", [None] * len(ttfl_allowed))
+        team_defense = {}
 
+        for team_id, team_name, pts, reb, ast, fgm, fg3m, ftm, tov, estimated_ttfl, factor in zip(
+            columns["TEAM_ID"].tolist(),
+            team_names,
+            _opp_column(columns, "OPP_PTS"),
+            _opp_column(columns, "OPP_REB"),
+            _opp_column(columns, "OPP_AST"),
+            _opp_column(columns, "OPP_FGM"),
+            _opp_column(columns, "OPP_FG3M"),
+            _opp_column(columns, "OPP_FTM"),
+            _opp_column(columns, "OPP_TOV"),
+            ttfl_allowed,
+            defense_factors,
+        ):
+            team_info = _TEAM_BY_ID.get(team_id, {})
             team_defense[team_id] = TeamDefenseStats(
                 team_id=team_id,
-                team_abbrev=get_team_abbrev(team_id),
-                team_name=row.get("TEAM_NAME", get_team_name(team_id)),
-                opp_pts=stats.get("OPP_PTS", 0) or 0,
-                opp_reb=stats.get("OPP_REB", 0) or 0,
-                opp_ast=stats.get("OPP_AST", 0) or 0,
-                opp_fgm=stats.get("OPP_FGM", 0) or 0,
-                opp_fg3m=stats.get("OPP_FG3M", 0) or 0,
-                opp_ftm=stats.get("OPP_FTM", 0) or 0,
-                opp_tov=stats.get("OPP_TOV", 0) or 0,
-                estimated_ttfl_allowed=estimated_ttfl,
-                defense_factor=1.0,  # Will be calculated below
+                team_abbrev=team_info.get("abbreviation", str(team_id)),
+                team_name=team_name or team_info.get("full_name", str(team_id)),
+                opp_pts=float(pts),
+                opp_reb=float(reb),
+                opp_ast=float(ast),
+                opp_fgm=float(fgm),
+                opp_fg3m=float(fg3m),
+                opp_ftm=float(ftm),
+                opp_tov=float(tov),
+                estimated_ttfl_allowed=float(estimated_ttfl),
+                defense_factor=float(factor),
             )
 
-        # Calculate league average and defense factors
-        if ttfl_allowed_values:
-            league_avg = sum(ttfl_allowed_values) / len(ttfl_allowed_values)
-
-            for team_id, stats in team_defense.items():
-                if league_avg > 0:
-                    raw_factor = stats.estimated_ttfl_allowed / league_avg
-                    # Cap the adjustment
-                    capped_factor = max(
-                        1.0 - MAX_DEFENSE_ADJUSTMENT,
-                        min(1.0 + MAX_DEFENSE_ADJUSTMENT, raw_factor),
-                    )
-                    team_defense[team_id] = TeamDefenseStats(
-                        team_id=stats.team_id,
-                        team_abbrev=stats.team_abbrev,
-                        team_name=stats.team_name,
-                        opp_pts=stats.opp_pts,
-                        opp_reb=stats.opp_reb,
-                        opp_ast=stats.opp_ast,
-                        opp_fgm=stats.opp_fgm,
-                        opp_fg3m=stats.opp_fg3m,
-                        opp_ftm=stats.opp_ftm,
-                        opp_tov=stats.opp_tov,
-                        estimated_ttfl_allowed=stats.estimated_ttfl_allowed,
-                        defense_factor=capped_factor,
-                    )
-
-        _defense_stats_cache = team_defense
+        _set_cache(team_defense)
+        disk_cache.save(cache_key, team_defense)
         return team_defense
 
     except Exception as e:
@@ -202,15 +240,15 @@ def get_defense_factor(opponent_team_id: int, season: str | None = None) -> floa
         >1.0 means bad defense (boost player's expected score)
         <1.0 means good defense (reduce player's expected score)
     """
-    defense_stats = fetch_team_defense_stats(season)
-
-    if opponent_team_id in defense_stats:
-        return defense_stats[opponent_team_id].defense_factor
+    if _defense_stats_cache is None:
+        fetch_team_defense_stats(season)
 
-    return 1.0  # Default to no adjustment
+    return _defense_factor_by_team.get(opponent_team_id, 1.0)  # Default to no adjustment
 
 
 def clear_cache():
-    """Clear the defense stats cache."""
-    global _defense_stats_cache
+    """Clear the defense stats cache (in memory and on disk)."""
+    global _defense_stats_cache, _defense_factor_by_team
     _defense_stats_cache = None
+    _defense_factor_by_team = {}
+    disk_cache.delete("defense_")
@@ -1,6 +1,8 @@
 """Discord webhook notifications with rich embeds."""
 
+import math
 import os
+from bisect import bisect_right
 from datetime import datetime
 
 from discord_webhook import DiscordEmbed, DiscordWebhook
@@ -9,74 +11,66 @@ from .picker import PlayerRecommendation
 from .playoffs import tier_emoji
 from .session import InjuredPlayer
 
+# Discord limits for a single webhook message
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+
+# Trend emoji by form direction ("stable" has none)
+_TREND_EMOJIS = {"hot": "🔥", "cold": "❄️"}
+
+# Risk tiers by DNP probability. The first bound is the smallest positive
+# float, so any non-zero risk gets at least a warning.
+_RISK_THRESHOLDS = (math.nextafter(0.0, 1.0), 0.5, 1.0)
+_RISK_EMOJIS = ("", "⚠️", "⛔", "🚫")
+
+# Matchup tiers by combined defense factor (defense_factor * defender_factor)
+_MATCHUP_THRESHOLDS = (0.90, 1.0, 1.10)
+_MATCHUP_TIERS = (
+    ("🔴", "Very tough defense"),
+    ("🟠", "Tough defense"),
+    ("🟡", "Average defense"),
+    ("🟢", "Weak defense"),
+)
+
 
 def _get_trend_emoji(direction: str) -> str:
     """Get trend emoji."""
-    if direction == "hot":
-        return "🔥"
-    elif direction == "cold":
-        return "❄️"
-    return ""
+    return _TREND_EMOJIS.get(direction, "")
 
 
 def _get_risk_emoji(dnp_risk: float) -> str:
     """Get risk emoji."""
-    if dnp_risk >= 1.0:
-        return "🚫"
-    elif dnp_risk >= 0.5:
-        return "⛔"
-    elif dnp_risk > 0:
-        return "⚠️"
-    return ""
-
-
-def _get_matchup_emoji(defense_factor: float, defender_factor: float) -> str:
-    """Get matchup quality emoji."""
-    combined = defense_factor * defender_factor
-    if combined >= 1.10:
-        return "🟢"
-    elif combined >= 1.0:
-        return "🟡"
-    elif combined >= 0.90:
-        return "🟠"
-    else:
-        return "🔴"
+    return _RISK_EMOJIS[bisect_right(_RISK_THRESHOLDS, dnp_risk)]
+
+
+def _classify_matchup(combined: float) -> tuple[str, str]:
+    """Get (emoji, label) for a combined defense factor."""
+    return _MATCHUP_TIERS[bisect_right(_MATCHUP_THRESHOLDS, combined)]
 
 
 def _format_detailed_pick(rank: int, rec: PlayerRecommendation) -> str:
     """Format a pick with detailed analysis."""
-    matchup = _get_matchup_emoji(rec.defense_factor, rec.defender_factor)
-
-    # Build matchup text based on combined factor (same as emoji logic)
+    # Classify the matchup once for both emoji and label
     combined = rec.defense_factor * rec.defender_factor
-    matchup_text = f"{matchup} "
-    if combined >= 1.10:
-        matchup_text += "Weak defense"
-    elif combined >= 1.0:
-        matchup_text += "Average defense"
-    elif combined >= 0.90:
-        matchup_text += "Tough defense"
-    else:
-        matchup_text += "Very tough defense"
+    matchup_emoji, matchup_label = _classify_matchup(combined)
+    matchup_text = f"{matchup_emoji} {matchup_label}"
 
     if rec.best_defender and rec.defender_factor < 0.95:
         matchup_text += f" (vs {rec.best_defender})"
 
     # Build status text (only show if injured)
+    risk_emoji = _get_risk_emoji(rec.dnp_risk)
     if rec.dnp_risk >= 1.0:
-        status = "\n🚫 OUT"
-    elif rec.dnp_risk >= 0.5:
-        status = f"\n⛔ {rec.injury_status} ({int(rec.dnp_risk*100)}%)"
-    elif rec.dnp_risk > 0:
-        status = f"\n⚠️ {rec.injury_status} ({int(rec.dnp_risk*100)}%)"
+        status = f"{risk_emoji} OUT"
+    elif risk_emoji:
+        status = f"{risk_emoji} {rec.injury_status} ({int(rec.dnp_risk*100)}%)"
     else:
         status = ""
 
     # Build trend text
-    if rec.trend_direction == "hot":
-        trend_text = f"🔥 {rec.trend_display}"
-    elif rec.trend_direction == "cold":
-        trend_text = f"❄️ {rec.trend_display}"
+    trend_emoji = _get_trend_emoji(rec.trend_direction)
+    if trend_emoji:
+        trend_text = f"{trend_emoji} {rec.trend_display}"
     else:
         trend_text = "➡️ Stable"
 
@@ -90,15 +84,18 @@ def _format_detailed_pick(rank: int, rec: PlayerRecommendation) -> str:
         games_str = ""
         if rec.expected_remaining_games is not None:
             games_str = f" · ~{rec.expected_remaining_games:.1f} games left"
-        playoff_line = f"\n{emoji} #{rec.seed} seed · {tier} (odds {odds_str}){games_str} · urgency {urgency}"
-
-    return (
-        f"**#{rank} {rec.name}** ({rec.team} vs {rec.opponent_team})\n"
-        f"Score: **{rec.adjusted_score:.1f}** | Avg: {rec.avg_ttfl:.1f} | {trend_text}\n"
-        f"{matchup_text}"
-        f"{playoff_line}"
-        f"{status}"
-    )
+        playoff_line = f"{emoji} #{rec.seed} seed · {tier} (odds {odds_str}){games_str} · urgency {urgency}"
+
+    lines = [
+        f"**#{rank} {rec.name}** ({rec.team} vs {rec.opponent_team})",
+        f"Score: **{rec.adjusted_score:.1f}** | Avg: {rec.avg_ttfl:.1f} | {trend_text}",
+        matchup_text,
+    ]
+    if playoff_line:
+        lines.append(playoff_line)
+    if status:
+        lines.append(status)
+    return "\n".join(lines)
 
 
 def _build_picks_embed(
@@ -176,8 +173,14 @@ def _build_injuries_embed(
     if not injuries:
         return None
 
-    out_players = [p for p in injuries if p.dnp_risk >= 1.0]
-    doubtful_players = [p for p in injuries if 0.75 <= p.dnp_risk < 1.0]
+    # Partition in a single pass
+    out_players = []
+    doubtful_players = []
+    for p in injuries:
+        if p.dnp_risk >= 1.0:
+            out_players.append(p)
+        elif p.dnp_risk >= 0.75:
+            doubtful_players.append(p)
 
     embed = DiscordEmbed(
         title=f"\U0001f3e5 Notable Injuries - {date}",
@@ -212,8 +215,9 @@ def post_to_discord(
 ) -> bool:
     """Post recommendations to Discord with multiple messages.
 
-    Sends separate messages with 10 picks each (up to 50 total),
-    followed by a notable injuries embed if available.
+    Builds one embed per 10 picks (up to 50 total), followed by a notable
+    injuries embed if available, and packs them into as few webhook
+    messages as Discord's per-message limits allow.
 
     Args:
         recommendations: List of player recommendations
@@ -235,39 +239,87 @@ def post_to_discord(
     if not recommendations:
         return False
 
-    # Send messages in batches of 10 picks
-    ranges = [(1, 10), (11, 20), (21, 30), (31, 40), (41, 50)]
-    success = True
+    # Build every embed up front: batches of 10 picks (up to 50), then injuries
+    embeds = []
+    n = min(len(recommendations), 50)
+    ranges = [(i + 1, min(i + 10, n)) for i in range(0, n, 10)]
 
     for start, end in ranges:
-        if start > len(recommendations):
-            break
-
         # Pass earliest_game_time only for first embed
         game_time = earliest_game_time if start == 1 else None
         embed = _build_picks_embed(recommendations, start, end, date, game_time)
-        if not embed:
-            continue
 
         # Add timestamp to first message only
         if start == 1:
             embed.set_timestamp()
 
-        webhook = DiscordWebhook(url=url, username="TTFL Picker", rate_limit_retry=True)
-        webhook.add_embed(embed)
+        embeds.append(embed)
 
-        response = webhook.execute()
-        if response.status_code != 200:
-            success = False
-
-    # Send injuries embed as final message
+    # Injuries embed goes last
     if notable_injuries:
         injuries_embed = _build_injuries_embed(notable_injuries, date)
         if injuries_embed:
-            webhook = DiscordWebhook(url=url, username="TTFL Picker", rate_limit_retry=True)
-            webhook.add_embed(injuries_embed)
-            response = webhook.execute()
-            if response.status_code != 200:
-                success = False
+            embeds.append(injuries_embed)
+
+    return _send_embeds(url, embeds)
+
+
+def _embed_length(embed: DiscordEmbed) -> int:
+    """Count the characters Discord charges against the per-message embed limit."""
+    total = len(embed.title or "") + len(embed.description or "")
+    for field in embed.fields:
+        total += len(field.get("name") or "") + len(field.get("value") or "")
+    if embed.footer:
+        total += len(embed.footer.get("text") or "")
+    if embed.author:
+        total += len(embed.author.get("name") or "")
+    return total
+
+
+def _batch_embeds(embeds: list[DiscordEmbed]) -> list[list[DiscordEmbed]]:
+    """Pack embeds, in order, into as few messages as Discord's limits allow."""
+    batches: list[list[DiscordEmbed]] = []
+    current: list[DiscordEmbed] = []
+    current_chars = 0
+
+    for embed in embeds:
+        length = _embed_length(embed)
+        if current and (
+            len(current) >= MAX_EMBEDS_PER_MESSAGE
+            or current_chars + length > MAX_EMBED_CHARS_PER_MESSAGE
+        ):
+            batches.append(current)
+            current = []
+            current_chars = 0
+        current.append(embed)
+        current_chars += length
+
+    if current:
+        batches.append(current)
+
+    return batches
+
+
+def _send_embeds(url: str, embeds: list[DiscordEmbed]) -> bool:
+    """Send embeds to the webhook, packing several embeds per message.
+
+    Messages are sent sequentially on purpose: Discord displays them in
+    arrival order, and concurrent posts would shuffle the pick batches.
+
+    Returns:
+        True if every message was accepted, False otherwise
+    """
+    success = True
+    # Embeds are batched into messages within the 10-embed / 6000-character
+    # limits; one webhook sends each batch and execute() clears its embeds
+    webhook = DiscordWebhook(url=url, username="TTFL Picker", rate_limit_retry=True)
+
+    for batch in _batch_embeds(embeds):
+        for embed in batch:
+            webhook.add_embed(embed)
+
+        response = webhook.execute(remove_embeds=True)
+        if response.status_code != 200:
+            success = False
 
     return success
@@ -0,0 +1,76 @@
+"""On-disk pickle cache for data that changes at most once per day."""
+
+import logging
+import os
+import pickle
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Configuration from environment
+CACHE_DIR = Path(os.environ.get("TTFL_CACHE_DIR") or Path.home() / ".cache" / "ttfl-picker")
+
+# Entries are keyed by date, so a day is the natural upper bound on freshness
+DEFAULT_MAX_AGE = 24 * 60 * 60
+
+
+def cache_path(key: str) -> Path:
+    """Get the file path for a cache key."""
+    return CACHE_DIR / f"{key}.pkl"
+
+
+def load(key: str, max_age: float = DEFAULT_MAX_AGE) -> Any | None:
+    """
+    Load a cached value if present and fresh.
+
+    Args:
+        key: Cache key (used as the file name)
+        max_age: Maximum age of the cache file in seconds
+
+    Returns:
+        The cached value, or None on miss, expiry, or unreadable file.
+    """
+    path = cache_path(key)
+    try:
+        if time.time() - path.stat().st_mtime > max_age:
+            return None
+        with path.open("rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning("Ignoring unreadable cache file %s: %s", path, e)
+        return None
+
+
+def save(key: str, value: Any) -> None:
+    """
+    Save a value to the cache atomically (write to a temp file, then rename).
+
+    Failures are logged and ignored: the cache is an optimization only.
+    """
+    path = cache_path(key)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{key}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_name, path)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+    except Exception as e:
+        logger.warning("Could not write cache file %s: %s", path, e)
+
+
+def delete(prefix: str) -> None:
+    """Delete every cache file whose key starts with prefix."""
+    for path in CACHE_DIR.glob(f"{prefix}*.pkl"):
+        try:
+            path.unlink()
+        except OSError:
+            pass
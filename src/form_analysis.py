@@ -1,18 +1,22 @@
 """Form analysis: weighted averages, trends, and consistency factors."""
 
-import statistics
 from dataclasses import dataclass
 
+import numpy as np
+
 
 # Weights for last 10 games (most recent first)
 GAME_WEIGHTS = [0.25, 0.18, 0.14, 0.11, 0.09, 0.07, 0.06, 0.05, 0.03, 0.02]
+_GAME_WEIGHTS_NP = np.array(GAME_WEIGHTS, dtype=np.float64)
+# Sum of the first n weights at index n - 1
+_GAME_WEIGHT_SUMS = np.cumsum(_GAME_WEIGHTS_NP)
 
 # Maximum adjustments
 MAX_TREND_ADJUSTMENT = 0.20  # +/- 20%
 MAX_CONSISTENCY_PENALTY = 0.15  # -15% max
 
 
-@dataclass
+@dataclass(slots=True)
 class FormAnalysis:
     """Result of form analysis for a player."""
 
@@ -36,18 +40,8 @@ def calculate_weighted_average(scores: list[float]) -> float:
     if not scores:
         return 0.0
 
-    # Use available weights up to the number of games
-    num_games = min(len(scores), len(GAME_WEIGHTS))
-    weights = GAME_WEIGHTS[:num_games]
-
-    # Normalize weights to sum to 1
-    weight_sum = sum(weights)
-    normalized_weights = [w / weight_sum for w in weights]
-
-    # Calculate weighted average
-    weighted_sum = sum(score * weight for score, weight in zip(scores[:num_games], normalized_weights))
-
-    return weighted_sum
+    weighted_avg, _, _, _ = _form_kernel(scores)
+    return weighted_avg
 
 
 def calculate_trend_factor(scores: list[float]) -> tuple[float, str]:
@@ -65,31 +59,16 @@ def calculate_trend_factor(scores: list[float]) -> tuple[float, str]:
     if len(scores) < 3:
         return 1.0, "stable"
 
-    # Reverse to chronological order (oldest first) for regression
-    chronological = list(reversed(scores))
-    n = len(chronological)
-
-    # Simple linear regression
-    x_mean = (n - 1) / 2
-    y_mean = sum(chronological) / n
-
-    numerator = sum((i - x_mean) * (y - y_mean) for i, y in enumerate(chronological))
-    denominator = sum((i - x_mean) ** 2 for i in range(n))
-
-    if denominator == 0:
+    _, simple_avg, raw_adjustment, _ = _form_kernel(scores)
+    if simple_avg == 0:
         return 1.0, "stable"
 
-    slope = numerator / denominator
+    return _trend_from_adjustment(raw_adjustment)
 
-    # Convert slope to percentage change per game relative to average
-    if y_mean == 0:
-        return 1.0, "stable"
 
-    slope_pct = slope / y_mean
-
-    # Scale: +1% per game slope -> +10% trend factor (over ~10 games)
+def _trend_from_adjustment(raw_adjustment: float) -> tuple[float, str]:
+    """Cap a raw trend adjustment and classify its direction."""
     # Cap at MAX_TREND_ADJUSTMENT
-    raw_adjustment = slope_pct * n
     capped_adjustment = max(-MAX_TREND_ADJUSTMENT, min(MAX_TREND_ADJUSTMENT, raw_adjustment))
 
     trend_factor = 1.0 + capped_adjustment
@@ -121,18 +100,15 @@ def calculate_consistency_factor(scores: list[float]) -> float:
     if len(scores) < 3:
         return 1.0
 
-    mean = sum(scores) / len(scores)
-    if mean == 0:
+    _, simple_avg, _, cv = _form_kernel(scores)
+    if simple_avg == 0:
         return 1.0
 
-    # Calculate coefficient of variation (std dev / mean)
-    try:
-        std_dev = statistics.stdev(scores)
-    except statistics.StatisticsError:
-        return 1.0
+    return _consistency_from_cv(cv)
 
-    cv = std_dev / mean
 
+def _consistency_from_cv(cv: float) -> float:
+    """Map a coefficient of variation to a consistency factor."""
     # High CV = inconsistent player
     # CV of 0.3 (~30% variation) = moderate penalty
     # CV of 0.5+ = maximum penalty
@@ -147,6 +123,51 @@ def calculate_consistency_factor(scores: list[float]) -> float:
     return 1.0 - penalty
 
 
+def _form_kernel(scores: list[float]) -> tuple[float, float, float, float]:
+    """
+    Accumulate every form statistic in a single pass over the scores.
+
+    The scalar counterpart of analyze_form_batch: for one 10-game list a
+    plain loop beats building arrays.
+
+    Returns:
+        Tuple of (weighted_avg, simple_avg, raw trend adjustment, cv).
+        The last two are only meaningful with 3+ games and a non-zero average.
+    """
+    n = len(scores)
+    total = 0.0
+    total_sq = 0.0
+    index_sum = 0.0  # sum of chronological index * score (oldest game = 0)
+    weighted = 0.0
+    weight_sum = 0.0
+
+    for j, score in enumerate(scores):
+        total += score
+        total_sq += score * score
+        index_sum += (n - 1 - j) * score
+        if j < len(GAME_WEIGHTS):
+            weighted += GAME_WEIGHTS[j] * score
+            weight_sum += GAME_WEIGHTS[j]
+
+    mean = total / n
+    weighted_avg = weighted / weight_sum
+    if n < 3 or mean == 0:
+        return weighted_avg, mean, 0.0, 0.0
+
+    # Closed-form regression slope against the centered game index
+    x_mean = (n - 1) / 2
+    denominator = n * (n * n - 1) / 12
+    slope = (index_sum - n * x_mean * mean) / denominator
+    # Slope as a share of the average, scaled by games: +1% per game -> +10% over 10 games
+    raw_adjustment = slope / mean * n
+
+    # Sample standard deviation (ddof=1)
+    variance = max(0.0, (total_sq - n * mean * mean) / (n - 1))
+    cv = variance**0.5 / mean
+
+    return weighted_avg, mean, raw_adjustment, cv
+
+
 def analyze_form(scores: list[float]) -> FormAnalysis:
     """
     Perform complete form analysis for a player.
@@ -166,10 +187,15 @@ def analyze_form(scores: list[float]) -> FormAnalysis:
             simple_avg=0.0,
         )
 
-    simple_avg = sum(scores) / len(scores)
-    weighted_avg = calculate_weighted_average(scores)
-    trend_factor, trend_direction = calculate_trend_factor(scores)
-    consistency_factor = calculate_consistency_factor(scores)
+    weighted_avg, simple_avg, raw_adjustment, cv = _form_kernel(scores)
+
+    # Trend and consistency need at least 3 games and a non-zero average
+    if len(scores) >= 3 and simple_avg != 0:
+        trend_factor, trend_direction = _trend_from_adjustment(raw_adjustment)
+        consistency_factor = _consistency_from_cv(cv)
+    else:
+        trend_factor, trend_direction = 1.0, "stable"
+        consistency_factor = 1.0
 
     return FormAnalysis(
         weighted_avg=weighted_avg,
@@ -180,6 +206,101 @@ def analyze_form(scores: list[float]) -> FormAnalysis:
     )
 
 
+def simple_form(avg_ttfl: float) -> FormAnalysis:
+    """
+    Build a neutral form analysis from an average alone.
+
+    Used when only a pre-averaged score is available (no per-game
+    sequence): no trend and no consistency penalty.
+    """
+    return FormAnalysis(
+        weighted_avg=avg_ttfl,
+        trend_factor=1.0,
+        trend_direction="stable",
+        consistency_factor=1.0,
+        simple_avg=avg_ttfl,
+    )
+
+
+def analyze_form_batch(score_lists: list[list[float]]) -> list[FormAnalysis]:
+    """
+    Perform form analysis for many players at once.
+
+    Every factor is computed with a handful of vector operations over a
+    NaN-padded (players x games) matrix instead of one Python call per
+    player. Single lists go through analyze_form's scalar loop instead,
+    which must give the same results.
+
+    Args:
+        score_lists: One list of TTFL scores per player, most recent first
+
+    Returns:
+        FormAnalysis per player, in input order
+    """
+    if not score_lists:
+        return []
+
+    width = max(1, max(len(scores) for scores in score_lists))
+    matrix = np.full((len(score_lists), width), np.nan)
+    for row, scores in enumerate(score_lists):
+        matrix[row, : len(scores)] = scores
+
+    mask = ~np.isnan(matrix)
+    filled = np.where(mask, matrix, 0.0)
+    counts = mask.sum(axis=1)
+    safe_counts = np.maximum(counts, 1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        simple_avg = filled.sum(axis=1) / safe_counts
+
+        # Weighted average over the most recent games, normalized by the sum
+        # of the weights used (scores are left-aligned, so it's a prefix sum)
+        recent = min(width, len(GAME_WEIGHTS))
+        weight_sums = _GAME_WEIGHT_SUMS[np.clip(counts, 1, recent) - 1]
+        weighted_avg = (filled[:, :recent] @ _GAME_WEIGHTS_NP[:recent]) / weight_sums
+
+        # Trend: centered chronological index for column j is (n - 1) / 2 - j
+        x = np.where(mask, (counts[:, None] - 1) / 2 - np.arange(width), 0.0)
+        deviations = np.where(mask, matrix - simple_avg[:, None], 0.0)
+        slope = (deviations * x).sum(axis=1) / (x * x).sum(axis=1)
+        # Slope as a share of the average, scaled by games: +1% per game -> +10% over 10 games
+        raw_adjustment = slope / simple_avg * counts
+        capped_adjustment = np.clip(raw_adjustment, -MAX_TREND_ADJUSTMENT, MAX_TREND_ADJUSTMENT)
+
+        # Consistency: coefficient of variation with the sample std
+        std_dev = np.sqrt((deviations * deviations).sum(axis=1) / np.maximum(counts - 1, 1))
+        cv = std_dev / simple_avg
+        # CV of 0.2 or less = no penalty, 0.5+ = maximum penalty
+        penalty = np.minimum(1.0, (cv - 0.2) / 0.3) * MAX_CONSISTENCY_PENALTY
+
+    has_trend = (counts >= 3) & (simple_avg != 0)
+    capped_adjustment = np.where(has_trend, capped_adjustment, 0.0)
+    trend_factor = 1.0 + capped_adjustment
+    trend_direction = np.select(
+        [capped_adjustment > 0.05, capped_adjustment < -0.05], ["hot", "cold"], "stable"
+    )
+    consistency_factor = np.where(has_trend & (cv > 0.2), 1.0 - penalty, 1.0)
+    weighted_avg = np.where(counts > 0, weighted_avg, 0.0)
+    simple_avg = np.where(counts > 0, simple_avg, 0.0)
+
+    return [
+        FormAnalysis(
+            weighted_avg=float(wa),
+            trend_factor=float(tf),
+            trend_direction=str(direction),
+            consistency_factor=float(cf),
+            simple_avg=float(avg),
+        )
+        for wa, tf, direction, cf, avg in zip(
+            weighted_avg.tolist(),
+            trend_factor.tolist(),
+            trend_direction.tolist(),
+            consistency_factor.tolist(),
+            simple_avg.tolist(),
+        )
+    ]
+
+
 def calculate_form_score(analysis: FormAnalysis) -> float:
     """
     Calculate the final form-adjusted score.
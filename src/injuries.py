@@ -1,7 +1,17 @@
 """Fetch injury reports and assess DNP risk."""
 
+import re
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from requests.adapters import HTTPAdapter
+
+from . import disk_cache
 
 
 # DNP risk probabilities by injury status
@@ -18,7 +28,29 @@ DNP_RISK = {
     "game time decision": 0.30,
 }
 
+# Shared HTTP session so connections are reused across fetches
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
+# Injury pages are reused without a request for this long, then revalidated
+# with ETag / Last-Modified so an unchanged page costs a bodyless 304
+INJURY_PAGE_MAX_AGE = 5 * 60
+
+# Only table rows are needed from the injury pages: skip building the rest of the tree
+_ONLY_ROWS = SoupStrainer("tr")
+
+
+# Partial-match table, longest key first so the most specific status wins
+# (e.g. "available" in "Available without restriction" beats the "out" in "without")
+_DNP_RISK_BY_LENGTH = tuple(sorted(DNP_RISK.items(), key=lambda item: -len(item[0])))
+_DNP_RISK_RANK = {key: rank for rank, (key, _) in enumerate(_DNP_RISK_BY_LENGTH)}
 
+# Every status key found in a string, in a single scan (the lookahead also
+# reports keys overlapping another match, e.g. the "out" in "doubtful")
+_DNP_RISK_RE = re.compile("(?=(" + "|".join(re.escape(key) for key, _ in _DNP_RISK_BY_LENGTH) + "))")
+
+
+@lru_cache(maxsize=512)
 def get_dnp_risk(status: str | None) -> float:
     """
     Convert injury status to DNP probability.
@@ -38,10 +70,10 @@ def get_dnp_risk(status: str | None) -> float:
     if status_lower in DNP_RISK:
         return DNP_RISK[status_lower]
 
-    # Check for partial matches
-    for key, risk in DNP_RISK.items():
-        if key in status_lower:
-            return risk
+    # Check for partial matches, longest key first
+    found = _DNP_RISK_RE.findall(status_lower)
+    if found:
+        return DNP_RISK[min(found, key=_DNP_RISK_RANK.__getitem__)]
 
     return 0.0
 
@@ -64,6 +96,40 @@ def get_injury_status_display(status: str | None) -> str:
         return "✓"
 
 
+def _fetch_page(url: str, headers: dict[str, str], cache_key: str) -> str:
+    """
+    Fetch a page's HTML, reusing the on-disk copy when fresh or unchanged.
+
+    Raises:
+        requests.HTTPError: If the server returns an error status
+    """
+    cached = disk_cache.load(cache_key) or {}
+    if cached and time.time() - cached["fetched_at"] < INJURY_PAGE_MAX_AGE:
+        return cached["html"]
+
+    # Conditional request: the server answers 304 if the page is unchanged
+    request_headers = dict(headers)
+    if cached.get("etag"):
+        request_headers["If-None-Match"] = cached["etag"]
+    if cached.get("last_modified"):
+        request_headers["If-Modified-Since"] = cached["last_modified"]
+
+    response = _session.get(url, headers=request_headers, timeout=10)
+    if response.status_code == 304 and cached:
+        html = cached["html"]
+    else:
+        response.raise_for_status()
+        html = response.text
+
+    disk_cache.save(cache_key, {
+        "html": html,
+        "etag": response.headers.get("ETag") or cached.get("etag"),
+        "last_modified": response.headers.get("Last-Modified") or cached.get("last_modified"),
+        "fetched_at": time.time(),
+    })
+    return html
+
+
 def fetch_espn_injuries() -> dict[str, str]:
     """
     Fetch injury report from ESPN.
@@ -77,9 +143,7 @@ def fetch_espn_injuries() -> dict[str, str]:
     }
 
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        return parse_espn_injuries(response.text)
+        return parse_espn_injuries(_fetch_page(url, headers, "injuries_espn"))
     except Exception as e:
         print(f"Warning: Could not fetch ESPN injuries: {e}")
         return {}
@@ -87,26 +151,22 @@ def fetch_espn_injuries() -> dict[str, str]:
 
 def parse_espn_injuries(html: str) -> dict[str, str]:
     """Parse ESPN injury page HTML."""
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "html.parser", parse_only=_ONLY_ROWS)
     injuries = {}
 
     # ESPN uses tables for injury data
-    tables = soup.find_all("table")
-
-    for table in tables:
-        rows = table.find_all("tr")
-        for row in rows:
-            cells = row.find_all("td")
-            # ESPN columns: NAME | POS | EST. RETURN DATE | STATUS | COMMENT
-            if len(cells) >= 4:
-                player_cell = cells[0]
-                status_cell = cells[3]  # STATUS is in column index 3
+    for row in soup.find_all("tr"):
+        cells = row.find_all("td")
+        # ESPN columns: NAME | POS | EST. RETURN DATE | STATUS | COMMENT
+        if len(cells) >= 4:
+            player_cell = cells[0]
+            status_cell = cells[3]  # STATUS is in column index 3
 
-                player_name = player_cell.get_text(strip=True)
-                status = status_cell.get_text(strip=True) if status_cell else None
+            player_name = player_cell.get_text(strip=True)
+            status = status_cell.get_text(strip=True) if status_cell else None
 
-                if player_name and status:
-                    injuries[player_name] = status
+            if player_name and status:
+                injuries[player_name] = status
 
     return injuries
 
@@ -124,9 +184,7 @@ def fetch_cbssports_injuries() -> dict[str, str]:
     }
 
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        return parse_cbssports_injuries(response.text)
+        return parse_cbssports_injuries(_fetch_page(url, headers, "injuries_cbssports"))
     except Exception as e:
         print(f"Warning: Could not fetch CBS Sports injuries: {e}")
         return {}
@@ -134,7 +192,7 @@ def fetch_cbssports_injuries() -> dict[str, str]:
 
 def parse_cbssports_injuries(html: str) -> dict[str, str]:
     """Parse CBS Sports injury page HTML."""
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "html.parser", parse_only=_ONLY_ROWS)
     injuries = {}
 
     # CBS Sports uses tables with specific classes
@@ -164,14 +222,17 @@ def get_injury_report() -> dict[str, str]:
     Returns:
         Dict mapping player name to injury status
     """
-    injuries = {}
+    # Both sources are independent: fetch them concurrently
+    # (each fetcher handles its own errors and returns {} on failure)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        espn_future = executor.submit(fetch_espn_injuries)
+        cbs_future = executor.submit(fetch_cbssports_injuries)
 
-    # Try ESPN first
-    espn_injuries = fetch_espn_injuries()
-    injuries.update(espn_injuries)
+    # ESPN first
+    injuries = dict(espn_future.result())
 
     # CBS Sports as backup/supplement
-    cbs_injuries = fetch_cbssports_injuries()
+    cbs_injuries = cbs_future.result()
 
     # Merge CBS injuries (don't overwrite ESPN data)
     for player, status in cbs_injuries.items():
@@ -181,28 +242,30 @@ def get_injury_report() -> dict[str, str]:
     return injuries
 
 
+_WS_RE = re.compile(r"\s+")
+
+# "Jr." → "Jr", "De'Aaron" → "DeAaron", "Gilgeous-Alexander" → "Gilgeous Alexander"
+_NAME_TRANS = str.maketrans({".": "", "'": "", "\u2019": "", "-": " "})
+
+
+@lru_cache(maxsize=4096)
 def normalize_player_name(name: str) -> str:
     """Normalize player name for matching."""
-    import re
-    import unicodedata
-
-    # Remove accents
-    name = unicodedata.normalize("NFD", name)
-    name = "".join(c for c in name if unicodedata.category(c) != "Mn")
-    # Strip periods ("Jr." → "Jr", "O.G." → "OG")
-    name = name.replace(".", "")
-    # Remove apostrophes ("De'Aaron" → "DeAaron")
-    name = name.replace("'", "").replace("\u2019", "")
-    # Replace hyphens with spaces ("Gilgeous-Alexander" → "Gilgeous Alexander")
-    name = name.replace("-", " ")
+    # Remove accents (pure ASCII names have none, skip the decomposition)
+    if not name.isascii():
+        name = unicodedata.normalize("NFD", name)
+        name = "".join(c for c in name if unicodedata.category(c) != "Mn")
+    # Strip periods and apostrophes, hyphens become spaces (single pass)
+    name = name.translate(_NAME_TRANS)
     # Collapse whitespace and strip
-    name = re.sub(r"\s+", " ", name).strip()
+    name = _WS_RE.sub(" ", name).strip()
     return name.lower()
 
 
 _NAME_SUFFIXES = {"jr", "sr", "ii", "iii", "iv", "v"}
 
 
+@lru_cache(maxsize=4096)
 def _strip_suffix(normalized_name: str) -> str:
     """Remove name suffixes (Jr, Sr, II, III, IV, V) from a normalized name."""
     parts = normalized_name.split()
@@ -211,41 +274,82 @@ def _strip_suffix(normalized_name: str) -> str:
     return normalized_name
 
 
-def match_player_injury(player_name: str, injuries: dict[str, str]) -> str | None:
+@dataclass
+class InjuryIndex:
+    """Injury statuses keyed by every name form match_player_injury tries.
+
+    On collisions the first injured player in report order wins, matching
+    a linear scan of the report.
+    """
+
+    exact: dict[str, str]
+    normalized: dict[str, str]
+    stripped: dict[str, str]
+    parts: list[tuple[frozenset[str], str]]  # For partial matches, in report order
+    _match_cache: dict[str, str | None] = field(default_factory=dict, repr=False)  # player name -> result
+
+
+def build_injury_index(injuries: dict[str, str]) -> InjuryIndex:
+    """Normalize every injured player's name once for repeated lookups."""
+    index = InjuryIndex(exact=dict(injuries), normalized={}, stripped={}, parts=[])
+
+    for inj_player, status in injuries.items():
+        normalized = normalize_player_name(inj_player)
+        index.normalized.setdefault(normalized, status)
+        index.stripped.setdefault(_strip_suffix(normalized), status)
+        index.parts.append((frozenset(normalized.split()), status))
+
+    return index
+
+
+def match_player_injury(player_name: str, injuries: InjuryIndex | dict[str, str]) -> str | None:
     """
     Find injury status for a player, handling name variations.
 
     Args:
         player_name: Player name to look up
-        injuries: Dict of injury statuses
+        injuries: Prebuilt InjuryIndex (preferred when matching many players),
+                  or a dict of injury statuses
 
     Returns:
         Injury status or None if not found
     """
+    # Nothing to match against (e.g. both injury sources failed)
+    if not (injuries.exact if isinstance(injuries, InjuryIndex) else injuries):
+        return None
+
+    if not isinstance(injuries, InjuryIndex):
+        injuries = build_injury_index(injuries)
+
+    # Repeat lookups against the same index are answered from its cache
+    cache = injuries._match_cache
+    if player_name not in cache:
+        cache[player_name] = _match_uncached(player_name, injuries)
+    return cache[player_name]
+
+
+def _match_uncached(player_name: str, injuries: InjuryIndex) -> str | None:
+    """Run the four matching tiers against an index."""
     # Tier 1: Exact match
-    if player_name in injuries:
-        return injuries[player_name]
+    if player_name in injuries.exact:
+        return injuries.exact[player_name]
 
     # Tier 2: Normalized match (accents, periods, hyphens, case)
     normalized = normalize_player_name(player_name)
-
-    for inj_player, status in injuries.items():
-        if normalize_player_name(inj_player) == normalized:
-            return status
+    if normalized in injuries.normalized:
+        return injuries.normalized[normalized]
 
     # Tier 3: Suffix-stripped match (Jr/Sr/II/III/IV removed)
     stripped = _strip_suffix(normalized)
-    for inj_player, status in injuries.items():
-        inj_stripped = _strip_suffix(normalize_player_name(inj_player))
-        if stripped == inj_stripped:
-            return status
+    if stripped in injuries.stripped:
+        return injuries.stripped[stripped]
 
     # Tier 4: Partial match (for names like "LeBron James" vs "James, LeBron")
     player_parts = set(normalized.split())
-    for inj_player, status in injuries.items():
-        inj_parts = set(normalize_player_name(inj_player).split())
+    min_overlap = min(2, len(player_parts))
+    for inj_parts, status in injuries.parts:
         # If most parts match, consider it a match
-        if len(player_parts & inj_parts) >= min(2, len(player_parts)):
+        if len(player_parts & inj_parts) >= min_overlap:
             return status
 
     return None
@@ -1,12 +1,15 @@
 """Best defender matchup analysis."""
 
+from collections import defaultdict
 from dataclasses import dataclass
+from datetime import date
 
+import pandas as pd
 from nba_api.stats.endpoints import LeagueDashPlayerStats
 from nba_api.stats.static import teams
 
-from . import get_current_season
-from .nba_config import nba_api_call
+from . import disk_cache, get_current_season
+from .nba_config import NBA_CACHE_TTL, nba_api_call
 
 
 # Defender quality tiers and their factors
@@ -17,12 +20,15 @@ ELITE_DEFENDER_FACTOR = 0.85  # -15% penalty
 GOOD_DEFENDER_FACTOR = 0.93  # -7% penalty
 AVERAGE_DEFENDER_FACTOR = 1.00  # No penalty
 
+# Team abbreviations by team ID (built once at import)
+_TEAM_ABBREV: dict[int, str] = {t["id"]: t["abbreviation"] for t in teams.get_teams()}
+
 # Cache for defender stats (populated once per run)
 _defender_stats_cache: dict[int, list["DefenderStats"]] | None = None
 _defender_rankings_cache: list["DefenderStats"] | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class DefenderStats:
     """Defensive statistics for a player."""
 
@@ -40,17 +46,25 @@ class DefenderStats:
 
 def get_team_abbrev(team_id: int) -> str:
     """Get team abbreviation from team ID."""
-    for team in teams.get_teams():
-        if team["id"] == team_id:
-            return team["abbreviation"]
-    return str(team_id)
+    return _TEAM_ABBREV.get(team_id, str(team_id))
+
 
+def _stat_column(df: pd.DataFrame, column: str, default: float) -> pd.Series:
+    """Get a stat column as floats, with missing or zero values replaced by default."""
+    if column not in df:
+        return pd.Series(default, index=df.index, dtype="float64")
+    values = pd.to_numeric(df[column], errors="coerce")
+    return values.where(values.notna() & (values != 0), default).astype("float64")
 
-def _calculate_composite_score(stats: dict) -> float:
+
+def _calculate_composite_scores(
+    drtg: pd.Series, dws: pd.Series, gp: pd.Series, stl: pd.Series, blk: pd.Series
+) -> pd.Series:
     """
     Calculate a composite defensive score for ranking defenders.
 
-    Higher score = better defender.
+    Higher score = better defender. Takes whole stat columns (one score
+    per row) with missing values already replaced by their defaults.
 
     Components:
     - Inverted defensive rating (lower DRTG = better)
@@ -59,25 +73,18 @@ def _calculate_composite_score(stats: dict) -> float:
     """
     # Defensive rating (lower is better, typical range: 100-120)
     # Invert so higher = better, normalize around 110
-    drtg = stats.get("DEF_RATING", 110) or 110
-    drtg_score = max(0, (120 - drtg) / 20)  # 0-1 scale, 100 DRTG = 1.0
+    drtg_score = ((120 - drtg) / 20).clip(lower=0)  # 0-1 scale, 100 DRTG = 1.0
 
     # Defensive Win Shares (higher is better, typical range: 0-0.15 per game estimate)
-    dws = stats.get("DEF_WS", 0) or 0
     # DWS is season total, approximate to per-game value
-    games = stats.get("GP", 1) or 1
-    dws_per_game = dws / games if games > 0 else 0
-    dws_score = min(1.0, dws_per_game / 0.1)  # 0-1 scale
+    dws_per_game = dws / gp.clip(lower=1)
+    dws_score = (dws_per_game / 0.1).clip(upper=1.0)  # 0-1 scale
 
     # Steals + Blocks (higher is better)
-    stl = stats.get("STL", 0) or 0
-    blk = stats.get("BLK", 0) or 0
-    stl_blk_score = min(1.0, (stl + blk) / 3)  # 0-1 scale, 3+ stl+blk = max
+    stl_blk_score = ((stl + blk) / 3).clip(upper=1.0)  # 0-1 scale, 3+ stl+blk = max
 
     # Weighted composite
-    composite = (drtg_score * 0.4) + (dws_score * 0.3) + (stl_blk_score * 0.3)
-
-    return composite
+    return (drtg_score * 0.4) + (dws_score * 0.3) + (stl_blk_score * 0.3)
 
 
 def fetch_defender_stats(season: str | None = None) -> tuple[dict[int, list[DefenderStats]], list[DefenderStats]]:
@@ -97,11 +104,19 @@ def fetch_defender_stats(season: str | None = None) -> tuple[dict[int, list[Defe
     if season is None:
         season = get_current_season()
 
+    # Defender rankings change at most once a day: reuse today's result across runs
+    cache_key = f"defenders_{season}_{date.today().isoformat()}"
+    cached = disk_cache.load(cache_key)
+    if cached is not None:
+        _defender_stats_cache, _defender_rankings_cache = cached
+        return cached
+
     try:
         # Fetch player defense stats
         player_stats = nba_api_call(
             LeagueDashPlayerStats,
             critical=False,
+            cache_ttl=NBA_CACHE_TTL,
             season=season,
             measure_type_detailed_defense="Defense",
             per_mode_detailed="PerGame",
@@ -109,66 +124,68 @@ def fetch_defender_stats(season: str | None = None) -> tuple[dict[int, list[Defe
         if player_stats is None:
             print("Warning: Could not fetch defender stats (all retries exhausted)")
             return {}, []
-        df = player_stats.get_data_frames()[0]
+        # Build the frame straight from the raw result set
+        result_set = player_stats.get_dict()["resultSets"][0]
+        df = pd.DataFrame(result_set["rowSet"], columns=result_set["headers"])
 
         if df.empty:
             print("Warning: No player defense stats available")
             return {}, []
 
-        # Build defender list with composite scores
-        all_defenders = []
-
-        for _, row in df.iterrows():
-            stats = row.to_dict()
+        # Skip players with minimal playing time (less than 15 min/game)
+        df = df[_stat_column(df, "MIN", 0) >= 15].copy()
 
-            # Skip players with minimal playing time
-            min_played = stats.get("MIN", 0) or 0
-            if min_played < 15:  # Less than 15 min/game
-                continue
+        # Extract each stat column once, with defaults for missing values
+        df["DEF_RATING"] = _stat_column(df, "DEF_RATING", 110)
+        df["DEF_WS"] = _stat_column(df, "DEF_WS", 0)
+        df["STL"] = _stat_column(df, "STL", 0)
+        df["BLK"] = _stat_column(df, "BLK", 0)
 
-            composite = _calculate_composite_score(stats)
-
-            defender = DefenderStats(
-                player_id=row["PLAYER_ID"],
-                player_name=row["PLAYER_NAME"],
-                team_id=row["TEAM_ID"],
-                team_abbrev=get_team_abbrev(row["TEAM_ID"]),
-                defensive_rating=stats.get("DEF_RATING", 110) or 110,
-                defensive_ws=stats.get("DEF_WS", 0) or 0,
-                stl=stats.get("STL", 0) or 0,
-                blk=stats.get("BLK", 0) or 0,
+        # Score every defender at once, then rank (highest = best defender)
+        df["COMPOSITE"] = _calculate_composite_scores(
+            df["DEF_RATING"], df["DEF_WS"], _stat_column(df, "GP", 1), df["STL"], df["BLK"]
+        )
+        df = df.sort_values("COMPOSITE", ascending=False, kind="stable")
+        team_abbrevs = df["TEAM_ID"].map(_TEAM_ABBREV).fillna(df["TEAM_ID"].astype(str))
+
+        all_defenders = [
+            DefenderStats(
+                player_id=player_id,
+                player_name=player_name,
+                team_id=team_id,
+                team_abbrev=team_abbrev,
+                defensive_rating=drtg,
+                defensive_ws=dws,
+                stl=stl,
+                blk=blk,
                 composite_score=composite,
-                league_rank=0,  # Will be set after sorting
+                league_rank=rank,
             )
-            all_defenders.append(defender)
-
-        # Sort by composite score (highest = best defender)
-        all_defenders.sort(key=lambda x: x.composite_score, reverse=True)
-
-        # Assign league ranks
-        for i, defender in enumerate(all_defenders):
-            all_defenders[i] = DefenderStats(
-                player_id=defender.player_id,
-                player_name=defender.player_name,
-                team_id=defender.team_id,
-                team_abbrev=defender.team_abbrev,
-                defensive_rating=defender.defensive_rating,
-                defensive_ws=defender.defensive_ws,
-                stl=defender.stl,
-                blk=defender.blk,
-                composite_score=defender.composite_score,
-                league_rank=i + 1,
+            for rank, (player_id, player_name, team_id, team_abbrev, drtg, dws, stl, blk, composite) in enumerate(
+                zip(
+                    df["PLAYER_ID"].tolist(),
+                    df["PLAYER_NAME"].tolist(),
+                    df["TEAM_ID"].tolist(),
+                    team_abbrevs.tolist(),
+                    df["DEF_RATING"].tolist(),
+                    df["DEF_WS"].tolist(),
+                    df["STL"].tolist(),
+                    df["BLK"].tolist(),
+                    df["COMPOSITE"].tolist(),
+                ),
+                start=1,
             )
+        ]
 
-        # Group by team
-        team_defenders: dict[int, list[DefenderStats]] = {}
+        # Group by team (each team list stays in league rank order)
+        grouped: defaultdict[int, list[DefenderStats]] = defaultdict(list)
         for defender in all_defenders:
-            if defender.team_id not in team_defenders:
-                team_defenders[defender.team_id] = []
-            team_defenders[defender.team_id].append(defender)
+            grouped[defender.team_id].append(defender)
+        team_defenders = dict(grouped)
 
         _defender_stats_cache = team_defenders
         _defender_rankings_cache = all_defenders
+        disk_cache.save(cache_key, (team_defenders, all_defenders))
 
         return team_defenders, all_defenders
 
@@ -227,7 +244,8 @@ def get_defender_factor(opponent_team_id: int, season: str | None = None) -> tup
 
 
 def clear_cache():
-    """Clear the defender stats cache."""
+    """Clear the defender stats cache (in memory and on disk)."""
     global _defender_stats_cache, _defender_rankings_cache
     _defender_stats_cache = None
     _defender_rankings_cache = None
+    disk_cache.delete("defenders_")
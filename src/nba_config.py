@@ -1,9 +1,14 @@
 """Centralized NBA API configuration and retry wrapper."""
 
+import hashlib
 import logging
 import os
+import threading
 import time
 
+import requests
+from nba_api.stats.library.http import NBAStatsHTTP, NBAStatsResponse
+from requests.adapters import HTTPAdapter
 from requests.exceptions import ConnectionError, ReadTimeout
 from tenacity import (
     before_sleep_log,
@@ -12,6 +17,9 @@ from tenacity import (
     stop_after_attempt,
     wait_exponential,
 )
+from urllib3.util.retry import Retry
+
+from . import disk_cache
 
 logger = logging.getLogger(__name__)
 
@@ -20,17 +28,120 @@ NBA_TIMEOUT = int(os.environ.get("NBA_TIMEOUT", "60"))
 NBA_PROXY = os.environ.get("NBA_PROXY") or None
 NBA_MAX_RETRIES = int(os.environ.get("NBA_MAX_RETRIES", "3"))
 NBA_RATE_LIMIT_SLEEP = float(os.environ.get("NBA_RATE_LIMIT_SLEEP", "1.0"))
+NBA_CACHE_TTL = int(os.environ.get("NBA_CACHE_TTL", str(12 * 60 * 60)))
+NBA_FETCH_WORKERS = int(os.environ.get("NBA_FETCH_WORKERS", "6"))  # Concurrent per-player fetches
 
 # Exceptions worth retrying
 RETRYABLE_EXCEPTIONS = (ReadTimeout, ConnectionError, TimeoutError)
 
 
+# Bounds for the adaptive spacing between calls
+NBA_RATE_LIMIT_MIN_SLEEP = float(os.environ.get("NBA_RATE_LIMIT_MIN_SLEEP", "0.3"))
+NBA_RATE_LIMIT_MAX_SLEEP = float(os.environ.get("NBA_RATE_LIMIT_MAX_SLEEP", "10.0"))
+
+# Start time of the most recent NBA API call (monotonic clock)
+_last_call = 0.0
+# Current spacing between calls, adapted to how the API responds
+_interval = NBA_RATE_LIMIT_SLEEP
+_rate_limit_lock = threading.Lock()
+
+
 def rate_limit():
-    """Sleep between NBA API calls to avoid rate limiting."""
-    time.sleep(NBA_RATE_LIMIT_SLEEP)
+    """
+    Space NBA API calls at least the current interval apart.
+
+    The interval starts at NBA_RATE_LIMIT_SLEEP and adapts to the API
+    (see _record_success / _record_throttle). Time already spent since the
+    previous call started (e.g. waiting on a slow response) counts toward
+    the interval, so only the remainder is slept. Thread-safe: each caller
+    reserves the next free slot under the lock, then sleeps outside it.
+    """
+    global _last_call
+    with _rate_limit_lock:
+        now = time.monotonic()
+        _last_call = max(now, _last_call + _interval)
+        wait = _last_call - now
+    if wait > 0:
+        time.sleep(wait)
+
+
+def _record_success():
+    """Shrink the call interval by 10% after a successful request (down to the minimum)."""
+    global _interval
+    with _rate_limit_lock:
+        _interval = max(NBA_RATE_LIMIT_MIN_SLEEP, _interval * 0.9)
+
+
+def _record_throttle():
+    """Double the call interval after a timeout or dropped connection (up to the maximum)."""
+    global _interval
+    with _rate_limit_lock:
+        _interval = min(NBA_RATE_LIMIT_MAX_SLEEP, max(_interval, NBA_RATE_LIMIT_MIN_SLEEP) * 2)
+
+
+class _ParsedResponse(NBAStatsResponse):
+    """NBAStatsResponse that decodes its JSON body once.
+
+    nba_api calls json.loads on every get_dict(), so an endpoint's body is
+    decoded once by load_response() and again for each get_dict() by our
+    callers. Installed as the response class for every stats request.
+    """
+
+    def get_dict(self):
+        if not hasattr(self, "_dict"):
+            self._dict = super().get_dict()
+        return self._dict
+
+
+NBAStatsHTTP.nba_response = _ParsedResponse
 
 
-def nba_api_call(endpoint_class, critical=True, **kwargs):
+def _build_session() -> requests.Session:
+    """
+    Build the HTTP session shared by every stats.nba.com request.
+
+    The pool is sized for concurrent per-player fetches, and throttling
+    or server errors are retried with backoff at the connection level.
+    Read timeouts are left to nba_api_call's retry loop.
+    """
+    retry = Retry(
+        total=3,
+        read=0,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",),
+        raise_on_status=False,  # Hand the last response back to nba_api
+    )
+    adapter = HTTPAdapter(pool_connections=NBA_FETCH_WORKERS, pool_maxsize=NBA_FETCH_WORKERS, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+NBAStatsHTTP.set_session(_build_session())
+
+
+def _response_cache_key(endpoint_class, kwargs) -> str:
+    """Build a disk cache key from the endpoint name and its request parameters."""
+    params = sorted((k, v) for k, v in kwargs.items() if k not in ("timeout", "proxy"))
+    digest = hashlib.sha1(repr(params).encode()).hexdigest()[:16]
+    return f"nba_{endpoint_class.__name__}_{digest}"
+
+
+def _load_cached_endpoint(endpoint_class, key, max_age, kwargs):
+    """Rebuild an endpoint from a cached raw response, or None on miss."""
+    raw = disk_cache.load(key, max_age=max_age)
+    if raw is None:
+        return None
+
+    endpoint = endpoint_class(get_request=False, **kwargs)
+    endpoint.nba_response = _ParsedResponse(response=raw, status_code=200, url=None)
+    endpoint.load_response()
+    return endpoint
+
+
+def nba_api_call(endpoint_class, critical=True, cache_ttl=None, **kwargs):
     """
     Call an NBA API endpoint with retry logic, timeout, and optional proxy.
 
@@ -38,6 +149,8 @@ def nba_api_call(endpoint_class, critical=True, **kwargs):
         endpoint_class: The nba_api endpoint class (e.g., ScoreboardV2)
         critical: If True, raise after all retries exhausted.
                   If False, return None after all retries exhausted.
+        cache_ttl: If set, reuse the raw response from the disk cache for this
+                   many seconds (for endpoints whose data is stable within a day).
         **kwargs: Arguments passed to the endpoint constructor.
 
     Returns:
@@ -46,6 +159,12 @@ def nba_api_call(endpoint_class, critical=True, **kwargs):
     Raises:
         Exception: If critical=True and all retries are exhausted.
     """
+    if cache_ttl:
+        key = _response_cache_key(endpoint_class, kwargs)
+        cached = _load_cached_endpoint(endpoint_class, key, cache_ttl, kwargs)
+        if cached is not None:
+            return cached
+
     rate_limit()
 
     kwargs.setdefault("timeout", NBA_TIMEOUT)
@@ -60,10 +179,18 @@ def nba_api_call(endpoint_class, critical=True, **kwargs):
         reraise=True,
     )
     def _call():
-        return endpoint_class(**kwargs)
+        # stats.nba.com throttles by stalling or dropping connections (429s are
+        # retried by the HTTP adapter), so those are the signal to back off
+        try:
+            endpoint = endpoint_class(**kwargs)
+        except RETRYABLE_EXCEPTIONS:
+            _record_throttle()
+            raise
+        _record_success()
+        return endpoint
 
     try:
-        return _call()
+        endpoint = _call()
     except RETRYABLE_EXCEPTIONS as e:
         if critical:
             raise
@@ -74,3 +201,8 @@ def nba_api_call(endpoint_class, critical=True, **kwargs):
             e,
         )
         return None
+
+    if cache_ttl:
+        disk_cache.save(key, endpoint.nba_response.get_response())
+
+    return endpoint
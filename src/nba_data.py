@@ -1,25 +1,43 @@
 """Fetch NBA schedule and player stats via nba_api."""
 
 import re
-from datetime import datetime
+from datetime import date as date_type, datetime
 from zoneinfo import ZoneInfo
 
 import pandas as pd
 from nba_api.stats.endpoints import (
-    CommonTeamRoster,
+    CommonAllPlayers,
+    LeagueDashPlayerStats,
     PlayerGameLog,
     ScoreboardV2,
 )
 from nba_api.stats.static import players, teams
 
-from . import get_current_season
-from .nba_config import nba_api_call
-from .ttfl import calculate_ttfl_from_game_log
+from . import disk_cache, get_current_season
+from .nba_config import NBA_CACHE_TTL, nba_api_call
+from .ttfl import calculate_ttfl, calculate_ttfl_batch
 
 # Timezone constants
 TZ_EST = ZoneInfo("America/New_York")
 TZ_PARIS = ZoneInfo("Europe/Paris")
 
+# Scoreboard responses are reused briefly (game times rarely change within the hour)
+SCOREBOARD_CACHE_TTL = 15 * 60
+
+# Tip-off time in GAME_STATUS_TEXT (e.g. "7:00 pm ET")
+_GAME_TIME_RE = re.compile(r"(\d{1,2}:\d{2}\s*[ap]m)\s*ET", re.IGNORECASE)
+
+# Static lookup tables (built once at import)
+_TEAM_ABBREV: dict[int, str] = {t["id"]: t["abbreviation"] for t in teams.get_teams()}
+_ACTIVE_PLAYERS: tuple[tuple[str, int], ...] = tuple(
+    (p["full_name"].lower(), p["id"]) for p in players.get_active_players()
+)
+# Reversed so the first player with a given name wins, as in a linear scan
+_ACTIVE_BY_LOWER_NAME: dict[str, int] = dict(reversed(_ACTIVE_PLAYERS))
+
+# Current rosters for the whole league (populated once per run)
+_current_players_cache: list[dict] | None = None
+
 
 def get_todays_games(date: str | None = None) -> list[dict]:
     """
@@ -31,36 +49,39 @@ def get_todays_games(date: str | None = None) -> list[dict]:
     Returns:
         List of games: [{"game_id": "...", "home_team": "LAL", "away_team": "BOS", ...}, ...]
     """
-    if date is None:
-        date = datetime.now().strftime("%Y-%m-%d")
-
     # Convert to MM/DD/YYYY format for nba_api
-    date_obj = datetime.strptime(date, "%Y-%m-%d")
+    date_obj = date_type.today() if date is None else date_type.fromisoformat(date)
     game_date = date_obj.strftime("%m/%d/%Y")
 
-    scoreboard = nba_api_call(ScoreboardV2, critical=True, game_date=game_date)
-    games_df = scoreboard.get_data_frames()[0]  # GameHeader
+    scoreboard = nba_api_call(
+        ScoreboardV2, critical=True, cache_ttl=SCOREBOARD_CACHE_TTL, game_date=game_date
+    )
+    game_header = scoreboard.get_dict()["resultSets"][0]  # GameHeader
+    columns = {header: i for i, header in enumerate(game_header["headers"])}
+    id_col, home_col, away_col = columns["GAME_ID"], columns["HOME_TEAM_ID"], columns["VISITOR_TEAM_ID"]
+    status_col, date_col = columns.get("GAME_STATUS_TEXT"), columns.get("GAME_DATE_EST")
 
     games = []
-    for _, row in games_df.iterrows():
+    for row in game_header["rowSet"]:
+        game_status_text = row[status_col] if status_col is not None else ""
         game_data = {
-            "game_id": row["GAME_ID"],
-            "home_team_id": row["HOME_TEAM_ID"],
-            "away_team_id": row["VISITOR_TEAM_ID"],
-            "game_status": row.get("GAME_STATUS_TEXT", ""),
+            "game_id": row[id_col],
+            "home_team_id": row[home_col],
+            "away_team_id": row[away_col],
+            "game_status": game_status_text,
         }
 
         # Parse game time by combining date from GAME_DATE_EST and time from GAME_STATUS_TEXT
         # GAME_DATE_EST only has the date (midnight), actual time is in GAME_STATUS_TEXT (e.g. "7:00 pm ET")
-        game_date_est = row.get("GAME_DATE_EST")
-        game_status_text = str(row.get("GAME_STATUS_TEXT", "")).strip()
+        game_date_est = row[date_col] if date_col is not None else None
+        game_status_text = str(game_status_text).strip()
         game_data["game_time_utc"] = None
 
         if game_date_est:
             try:
-                base_date = datetime.strptime(str(game_date_est), "%Y-%m-%dT%H:%M:%S")
+                base_date = datetime.fromisoformat(str(game_date_est))
                 # Try parsing time from GAME_STATUS_TEXT (e.g. "7:00 pm ET", "10:00 pm ET")
-                time_match = re.match(r"(\d{1,2}:\d{2}\s*[ap]m)\s*ET", game_status_text, re.IGNORECASE)
+                time_match = _GAME_TIME_RE.match(game_status_text)
                 if time_match:
                     time_part = datetime.strptime(time_match.group(1).strip(), "%I:%M %p")
                     game_dt = base_date.replace(hour=time_part.hour, minute=time_part.minute)
@@ -93,40 +114,83 @@ def get_earliest_game_time(games: list[dict]) -> datetime | None:
 
 def get_team_abbrev(team_id: int) -> str:
     """Get team abbreviation from team ID."""
-    for team in teams.get_teams():
-        if team["id"] == team_id:
-            return team["abbreviation"]
-    return str(team_id)
+    return _TEAM_ABBREV.get(team_id, str(team_id))
+
+
+def _fetch_current_players(season: str | None = None) -> list[dict]:
+    """
+    Get every player on a current NBA roster (one API call, cached per run).
+
+    Returns:
+        List of players: [{"id": 123, "name": "LeBron James", "team_id": 1610612747, "team": "LAL"}, ...]
+    """
+    global _current_players_cache
+
+    if _current_players_cache is not None:
+        return _current_players_cache
+
+    if season is None:
+        season = get_current_season()
+
+    all_players = nba_api_call(
+        CommonAllPlayers,
+        critical=True,
+        cache_ttl=NBA_CACHE_TTL,
+        is_only_current_season=1,
+        season=season,
+    )
+    result_set = all_players.get_dict()["resultSets"][0]
+    columns = {header: i for i, header in enumerate(result_set["headers"])}
+    id_col, name_col = columns["PERSON_ID"], columns["DISPLAY_FIRST_LAST"]
+    team_col, abbrev_col = columns["TEAM_ID"], columns["TEAM_ABBREVIATION"]
+
+    _current_players_cache = [
+        {
+            "id": row[id_col],
+            "name": row[name_col],
+            "team_id": row[team_col],
+            "team": row[abbrev_col] or get_team_abbrev(row[team_col]),
+        }
+        for row in result_set["rowSet"]
+        if row[team_col]  # Free agents have TEAM_ID 0
+    ]
+    return _current_players_cache
 
 
 def get_players_for_teams(team_ids: list[int]) -> list[dict]:
     """
     Get all players from the given teams.
 
+    Uses a single CommonAllPlayers call for the whole league, then
+    filters locally.
+
     Args:
         team_ids: List of NBA team IDs
 
     Returns:
         List of players: [{"id": 123, "name": "LeBron James", "team_id": 1610612747}, ...]
     """
-    all_players = []
+    try:
+        current_players = _fetch_current_players()
+    except Exception as e:
+        print(f"Warning: Could not fetch current rosters: {e}")
+        return []
+
+    wanted = set(team_ids)
+    return [dict(player) for player in current_players if player["team_id"] in wanted]
+
 
-    for team_id in team_ids:
-        try:
-            roster = nba_api_call(CommonTeamRoster, critical=True, team_id=team_id)
-            roster_df = roster.get_data_frames()[0]
+def clear_cache():
+    """Clear the in-memory league roster cache."""
+    global _current_players_cache
+    _current_players_cache = None
 
-            for _, row in roster_df.iterrows():
-                all_players.append({
-                    "id": row["PLAYER_ID"],
-                    "name": row["PLAYER"],
-                    "team_id": team_id,
-                    "team": get_team_abbrev(team_id),
-                })
-        except Exception as e:
-            print(f"Warning: Could not fetch roster for team {team_id}: {e}")
 
-    return all_players
+def _column_values(df: pd.DataFrame, column: str) -> list:
+    """Get a column as a list of Python values (None when the column is missing)."""
+    if column not in df:
+        return [None] * len(df)
+    return df[column].tolist()
 
 
 def get_player_game_logs(player_id: int, season: str | None = None, last_n: int = 10) -> list[dict]:
@@ -144,6 +208,12 @@ def get_player_game_logs(player_id: int, season: str | None = None, last_n: int
     if season is None:
         season = get_current_season()
 
+    # Game logs only change once a player has played: reuse today's result across runs
+    cache_key = f"gamelog_{season}_{player_id}_{last_n}_{date_type.today().isoformat()}"
+    cached = disk_cache.load(cache_key)
+    if cached is not None:
+        return cached
+
     try:
         game_log = nba_api_call(PlayerGameLog, critical=False, player_id=player_id, season=season)
         if game_log is None:
@@ -151,25 +221,35 @@ def get_player_game_logs(player_id: int, season: str | None = None, last_n: int
         df = game_log.get_data_frames()[0]
 
         if df.empty:
+            disk_cache.save(cache_key, [])
             return []
 
-        # Get last N games
+        # Get last N games, scoring them all at once
         df = df.head(last_n)
-
-        games = []
-        for _, row in df.iterrows():
-            game_stats = row.to_dict()
-            ttfl_score = calculate_ttfl_from_game_log(game_stats)
-            games.append({
-                "game_date": game_stats.get("GAME_DATE"),
-                "matchup": game_stats.get("MATCHUP"),
-                "pts": game_stats.get("PTS"),
-                "reb": game_stats.get("REB"),
-                "ast": game_stats.get("AST"),
-                "min": game_stats.get("MIN"),
+        ttfl_scores = calculate_ttfl_batch(df).tolist()
+
+        games = [
+            {
+                "game_date": game_date,
+                "matchup": matchup,
+                "pts": pts,
+                "reb": reb,
+                "ast": ast,
+                "min": minutes,
                 "ttfl_score": ttfl_score,
-            })
-
+            }
+            for game_date, matchup, pts, reb, ast, minutes, ttfl_score in zip(
+                _column_values(df, "GAME_DATE"),
+                _column_values(df, "MATCHUP"),
+                _column_values(df, "PTS"),
+                _column_values(df, "REB"),
+                _column_values(df, "AST"),
+                _column_values(df, "MIN"),
+                ttfl_scores,
+            )
+        ]
+
+        disk_cache.save(cache_key, games)
         return games
 
     except Exception as e:
@@ -218,41 +298,73 @@ def get_player_average_ttfl(player_id: int, season: str | None = None, last_n: i
     return sum(ttfl_scores) / len(ttfl_scores)
 
 
+def get_league_average_ttfl(season: str | None = None, last_n: int = 10) -> dict[int, tuple[float, int]]:
+    """
+    Get every player's average TTFL over their last N games in one API call.
+
+    The TTFL formula is linear in the box score stats, so applying it to
+    per-game averages gives the average TTFL score directly. Use this when
+    the per-game sequence (trend, consistency) is not needed.
+
+    Args:
+        season: NBA season (e.g., "2024-25")
+        last_n: Number of recent games to average
+
+    Returns:
+        Dict mapping player_id to (average TTFL, games played),
+        or an empty dict if the stats are unavailable
+    """
+    if season is None:
+        season = get_current_season()
+
+    try:
+        player_stats = nba_api_call(
+            LeagueDashPlayerStats,
+            critical=False,
+            cache_ttl=NBA_CACHE_TTL,
+            season=season,
+            last_n_games=last_n,
+            per_mode_detailed="PerGame",
+        )
+        if player_stats is None:
+            return {}
+
+        result_set = player_stats.get_dict()["resultSets"][0]
+        headers = result_set["headers"]
+        averages = {}
+        for row in result_set["rowSet"]:
+            stats = dict(zip(headers, row))
+            averages[stats["PLAYER_ID"]] = (float(calculate_ttfl(stats)), int(stats.get("GP") or 0))
+        return averages
+
+    except Exception as e:
+        print(f"Warning: Could not fetch league averages: {e}")
+        return {}
+
+
 def find_player_id(name: str) -> int | None:
     """Find player ID by name (fuzzy match)."""
-    all_players = players.get_active_players()
+    name_lower = name.lower()
 
     # Exact match first
-    for p in all_players:
-        if p["full_name"].lower() == name.lower():
-            return p["id"]
+    if name_lower in _ACTIVE_BY_LOWER_NAME:
+        return _ACTIVE_BY_LOWER_NAME[name_lower]
 
     # Partial match
-    name_lower = name.lower()
-    for p in all_players:
-        if name_lower in p["full_name"].lower():
-            return p["id"]
+    for full_name, player_id in _ACTIVE_PLAYERS:
+        if name_lower in full_name:
+            return player_id
 
     return None
 
 
-def get_opponent_team_id(player_team_id: int, games: list[dict]) -> int | None:
-    """
-    Get the opponent team ID for a player based on tonight's games.
-
-    Args:
-        player_team_id: The player's team ID
-        games: List of games from get_todays_games()
-
-    Returns:
-        Opponent team ID, or None if team is not playing
-    """
+def _opponents_by_team(games: list[dict]) -> dict[int, int]:
+    """Map each team playing in games to its opponent (first game wins)."""
+    team_to_opp: dict[int, int] = {}
     for game in games:
-        if game["home_team_id"] == player_team_id:
-            return game["away_team_id"]
-        elif game["away_team_id"] == player_team_id:
-            return game["home_team_id"]
-    return None
+        team_to_opp.setdefault(game["home_team_id"], game["away_team_id"])
+        team_to_opp.setdefault(game["away_team_id"], game["home_team_id"])
+    return team_to_opp
 
 
 def get_players_playing_tonight(date: str | None = None) -> tuple[list[dict], list[dict]]:
@@ -272,16 +384,13 @@ def get_players_playing_tonight(date: str | None = None) -> tuple[list[dict], li
     if not games:
         return [], []
 
-    # Collect all team IDs
-    team_ids = set()
-    for game in games:
-        team_ids.add(game["home_team_id"])
-        team_ids.add(game["away_team_id"])
+    # Map every team playing tonight to its opponent
+    team_to_opp = _opponents_by_team(games)
 
-    players = get_players_for_teams(list(team_ids))
+    players = get_players_for_teams(list(team_to_opp))
 
     # Add opponent team ID to each player
     for player in players:
-        player["opponent_team_id"] = get_opponent_team_id(player["team_id"], games)
+        player["opponent_team_id"] = team_to_opp.get(player["team_id"])
 
     return players, games
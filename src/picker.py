@@ -1,22 +1,39 @@
 """Main recommendation logic for TTFL picks."""
 
+import heapq
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 
 from .defense_stats import get_defense_factor
-from .form_analysis import FormAnalysis, analyze_form, calculate_form_score
-from .injuries import get_dnp_risk, get_injury_report, get_injury_status_display, match_player_injury
+from .form_analysis import FormAnalysis, analyze_form, calculate_form_score, simple_form
+from .injuries import (
+    build_injury_index,
+    get_dnp_risk,
+    get_injury_report,
+    get_injury_status_display,
+    match_player_injury,
+)
 from .matchups import get_defender_factor
+from .nba_config import NBA_FETCH_WORKERS
 from .nba_data import (
+    get_league_average_ttfl,
     get_player_ttfl_scores,
     get_players_playing_tonight,
     get_team_abbrev,
 )
 from .ttfl_client import get_locked_players
 
+# Players averaging less than this are skipped (likely bench players)
+MIN_AVG_TTFL = 10
+
+# Players whose bulk average is below this skip the game log fetch entirely
+# (the margin under MIN_AVG_TTFL absorbs differences between the two sources)
+PREFILTER_AVG_TTFL = 8
+
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PlayerRecommendation:
-    """A player recommendation with all relevant data."""
+    """A player recommendation with all relevant data (immutable: use dataclasses.replace)."""
 
     name: str
     team: str
@@ -107,6 +124,38 @@ def calculate_final_score(
     return final_score
 
 
+def apply_league_averages(
+    eligible: list[tuple],
+    league_averages: dict[int, tuple[float, int]],
+    use_form: bool,
+) -> tuple[list[tuple], dict[int, tuple[float, int]]]:
+    """
+    Use the bulk league averages to skip per-player game log fetches.
+
+    Without form analysis the bulk average is all a player needs. With it,
+    players whose bulk average is below PREFILTER_AVG_TTFL (likely bench
+    players) are dropped before their game logs are fetched.
+
+    Args:
+        eligible: Candidate entries, each starting with the player dict
+        league_averages: player_id -> (avg TTFL, games played)
+        use_form: Whether scores will come from form analysis of game logs
+
+    Returns:
+        Tuple of (eligible, simple_averages): the remaining entries, and
+        player_id -> (avg, games) for players scored from the bulk average
+        alone (empty when form analysis is on)
+    """
+    if not use_form:
+        return eligible, league_averages
+
+    kept = [
+        entry for entry in eligible
+        if league_averages.get(entry[0]["id"], (PREFILTER_AVG_TTFL,))[0] >= PREFILTER_AVG_TTFL
+    ]
+    return kept, {}
+
+
 def get_recommendations(
     cookie_file: str,
     date: str | None = None,
@@ -144,6 +193,7 @@ def get_recommendations(
     print("Fetching injury report...")
     injuries = get_injury_report()
     print(f"  Found {len(injuries)} players with injury status")
+    injury_index = build_injury_index(injuries)
 
     print("Fetching tonight's games...")
     players, games = get_players_playing_tonight(date)
@@ -168,55 +218,82 @@ def get_recommendations(
         print("  Defender rankings loaded")
 
     recommendations = []
-    total = len(players)
-
-    print(f"Calculating TTFL scores for {total} players...")
-
-    for i, player in enumerate(players, 1):
-        if i % 20 == 0:
-            print(f"  Progress: {i}/{total}")
+    eligible = []
+    locked_cf = {locked.casefold() for locked in locked_players}
 
+    for player in players:
         player_name = player["name"]
-        player_id = player["id"]
-        team = player["team"]
-        opponent_team_id = player.get("opponent_team_id")
-        opponent_team = get_team_abbrev(opponent_team_id) if opponent_team_id else "?"
+
+        # Skip players whose team has no game tonight
+        if not player.get("opponent_team_id"):
+            continue
 
         # Check if locked
-        is_locked = player_name in locked_players or any(
-            locked.lower() == player_name.lower() for locked in locked_players
-        )
+        is_locked = player_name.casefold() in locked_cf
 
         # Skip locked players unless explicitly included
         if is_locked and not include_locked:
             continue
 
         # Get injury status
-        injury_status = match_player_injury(player_name, injuries)
+        injury_status = match_player_injury(player_name, injury_index)
         dnp_risk = get_dnp_risk(injury_status)
 
         # Skip OUT players unless explicitly included
         if dnp_risk >= 1.0 and not include_risky:
             continue
 
-        # Get TTFL scores for form analysis
-        ttfl_scores = get_player_ttfl_scores(player_id)
+        eligible.append((player, is_locked, injury_status, dnp_risk))
 
-        if not ttfl_scores:
-            continue
+    eligible, simple_averages = apply_league_averages(eligible, get_league_average_ttfl(), use_form)
+
+    total = len(eligible)
+    print(f"Calculating TTFL scores for {total} players...")
+
+    log_ids = [player["id"] for player, *_ in eligible if player["id"] not in simple_averages]
+
+    # Game logs are network-bound: fetch them concurrently (rate_limit still spaces requests)
+    with ThreadPoolExecutor(max_workers=NBA_FETCH_WORKERS) as executor:
+        fetched_scores = dict(zip(log_ids, executor.map(get_player_ttfl_scores, log_ids)))
+
+    # Matchup factors depend only on the opponent: compute them once per team
+    opp_factors: dict[int, tuple[float, float, str | None]] = {}
 
-        # Analyze form
-        form_analysis = analyze_form(ttfl_scores)
+    for i, (player, is_locked, injury_status, dnp_risk) in enumerate(eligible, 1):
+        if i % 20 == 0:
+            print(f"  Progress: {i}/{total}")
+
+        player_name = player["name"]
+        player_id = player["id"]
+        team = player["team"]
+        opponent_team_id = player["opponent_team_id"]
+        opponent_team = get_team_abbrev(opponent_team_id)
+
+        if player_id in simple_averages:
+            avg_ttfl, games_played = simple_averages[player_id]
+            form_analysis = simple_form(avg_ttfl)
+        else:
+            ttfl_scores = fetched_scores[player_id]
+            if not ttfl_scores:
+                continue
+
+            # Analyze form
+            form_analysis = analyze_form(ttfl_scores)
+            games_played = len(ttfl_scores)
         avg_ttfl = form_analysis.simple_avg
 
         # Skip players with very low average (likely bench players)
-        if avg_ttfl < 10:
+        if avg_ttfl < MIN_AVG_TTFL:
             continue
 
         # Get defense factors
-        if use_defense and opponent_team_id:
-            defense_factor = get_defense_factor(opponent_team_id)
-            defender_factor, best_defender = get_defender_factor(opponent_team_id)
+        if use_defense:
+            if opponent_team_id not in opp_factors:
+                opp_factors[opponent_team_id] = (
+                    get_defense_factor(opponent_team_id),
+                    *get_defender_factor(opponent_team_id),
+                )
+            defense_factor, defender_factor, best_defender = opp_factors[opponent_team_id]
         else:
             defense_factor = 1.0
             defender_factor = 1.0
@@ -249,14 +326,12 @@ def get_recommendations(
             injury_status=injury_status,
             dnp_risk=dnp_risk,
             is_locked=is_locked,
-            games_played=len(ttfl_scores),
+            games_played=games_played,
         )
         recommendations.append(rec)
 
-    # Sort by adjusted score (highest first)
-    recommendations.sort(key=lambda x: x.adjusted_score, reverse=True)
-
-    return recommendations[:top_n]
+    # Top N by adjusted score (highest first), without sorting the whole list
+    return heapq.nlargest(top_n, recommendations, key=lambda x: x.adjusted_score)
 
 
 def format_recommendations(
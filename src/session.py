@@ -1,14 +1,21 @@
 """TTFL Session - centralized data fetching and caching."""
 
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
 from datetime import datetime, timedelta
 
 from .defense_stats import fetch_team_defense_stats, get_defense_factor
-from .form_analysis import analyze_form
-from .injuries import get_dnp_risk, get_injury_report, match_player_injury
+from .form_analysis import FormAnalysis, analyze_form_batch, simple_form
+from .injuries import build_injury_index, get_dnp_risk, get_injury_report, match_player_injury
 from .matchups import fetch_defender_stats, get_defender_factor
-from .nba_data import get_player_ttfl_scores, get_players_playing_tonight, get_team_abbrev
-from .picker import PlayerRecommendation, calculate_final_score
+from .nba_config import NBA_FETCH_WORKERS
+from .nba_data import (
+    get_league_average_ttfl,
+    get_player_ttfl_scores,
+    get_players_playing_tonight,
+    get_team_abbrev,
+)
+from .picker import MIN_AVG_TTFL, PlayerRecommendation, apply_league_averages, calculate_final_score
 from .playoffs import (
     elimination_tier,
     expected_remaining_games,
@@ -72,9 +79,17 @@ class TTFLSession:
 
         # Caches
         self._locked_players: set[str] = set()
+        self._locked_cf: frozenset[str] = frozenset()  # Casefolded locked names
         self._injuries: dict[str, str] = {}
+        self._injury_index = build_injury_index({})
         self._ttfl_cache: dict[int, list[float]] = {}
+        self._form_cache: dict[int, FormAnalysis] = {}  # player_id -> form of cached TTFL scores
         self._players_cache: dict[str, tuple[list, list]] = {}  # date -> (players, games)
+        self._league_averages: dict[int, tuple[float, int]] | None = None  # player_id -> (avg, games)
+        self._ranked_cache: dict[tuple, list[PlayerRecommendation]] = {}  # (date, options) -> ranked recs
+
+        # Games behind the last get_recommendations call (for the Discord digest)
+        self.last_games: list = []
 
         # Fetch shared data
         self._fetch_shared_data()
@@ -85,31 +100,47 @@ class TTFLSession:
             print(msg)
 
     def _fetch_shared_data(self):
-        """Fetch all data that doesn't change day-to-day."""
-        # Locked players
+        """Fetch all data that doesn't change day-to-day.
+
+        Locks, injuries, team defense and defender rankings come from
+        independent endpoints, so they are fetched concurrently: startup
+        waits for the slowest source instead of the sum of all four.
+        """
         if self.ignore_locks:
-            self._locked_players = set()
             self._log("Skipping lock check (--ignore-locks)")
         else:
             self._log("Fetching locked players from TTFL...")
-            self._locked_players = get_locked_players(self.cookie_file)
+        self._log("Fetching injury report, team defense stats and defender rankings...")
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            locked_future = None
+            if not self.ignore_locks:
+                locked_future = executor.submit(get_locked_players, self.cookie_file)
+            injuries_future = executor.submit(get_injury_report)
+            # Defense stats (these cache globally in their modules)
+            defense_future = executor.submit(fetch_team_defense_stats)
+            defenders_future = executor.submit(fetch_defender_stats)
+
+        # Locked players
+        if locked_future is not None:
+            self._locked_players = locked_future.result()
             self._log(f"  Found {len(self._locked_players)} locked players")
+        else:
+            self._locked_players = set()
+        self._locked_cf = frozenset(name.casefold() for name in self._locked_players)
 
         # Injury report
-        self._log("Fetching injury report...")
-        self._injuries = get_injury_report()
+        self._injuries = injuries_future.result()
+        self._injury_index = build_injury_index(self._injuries)
         self._log(f"  Found {len(self._injuries)} players with injury status")
 
-        # Defense stats (these cache globally in their modules)
-        self._log("Fetching team defense stats...")
-        defense_stats = fetch_team_defense_stats()
+        defense_stats = defense_future.result()
         if defense_stats:
             self._log(f"  Team defense stats loaded ({len(defense_stats)} teams)")
         else:
             self._log("  Warning: Team defense stats unavailable (will use neutral factors)")
 
-        self._log("Fetching defender rankings...")
-        team_defenders, all_defenders = fetch_defender_stats()
+        team_defenders, all_defenders = defenders_future.result()
         if all_defenders:
             self._log(f"  Defender rankings loaded ({len(all_defenders)} players)")
         else:
@@ -121,6 +152,27 @@ class TTFLSession:
             self._ttfl_cache[player_id] = get_player_ttfl_scores(player_id)
         return self._ttfl_cache[player_id]
 
+    def prefetch_player_ttfl(self, player_ids: list[int]):
+        """Fetch TTFL scores for every uncached player concurrently."""
+        missing = list(dict.fromkeys(pid for pid in player_ids if pid not in self._ttfl_cache))
+        if not missing:
+            return
+
+        # Game logs are network-bound: overlap requests (rate_limit still spaces them)
+        with ThreadPoolExecutor(max_workers=NBA_FETCH_WORKERS) as executor:
+            for player_id, scores in zip(missing, executor.map(get_player_ttfl_scores, missing)):
+                self._ttfl_cache[player_id] = scores
+
+    def get_league_averages(self) -> dict[int, tuple[float, int]]:
+        """Get every player's recent average TTFL (one bulk call, cached)."""
+        if self._league_averages is None:
+            self._league_averages = get_league_average_ttfl()
+        return self._league_averages
+
+    def get_injury_status(self, player_name: str) -> str | None:
+        """Match a player against the injury report (cached by the index)."""
+        return match_player_injury(player_name, self._injury_index)
+
     def get_players_for_date(self, date: str | None = None) -> tuple[list, list]:
         """Get players and games for a date with caching."""
         if date is None:
@@ -142,7 +194,7 @@ class TTFLSession:
     def get_notable_injuries(self, date: str | None = None) -> list[InjuredPlayer]:
         """Get notable injuries (OUT/Doubtful) for tonight's games.
 
-        Reuses cached player and injury data — no additional HTTP calls.
+        Reuses cached player, injury and match data — no additional HTTP calls.
 
         Returns:
             Players with dnp_risk >= 0.75, sorted: OUT first, then Doubtful, then alphabetical.
@@ -156,7 +208,7 @@ class TTFLSession:
             opponent_team_id = player.get("opponent_team_id")
             opponent_team = get_team_abbrev(opponent_team_id) if opponent_team_id else "?"
 
-            injury_status = match_player_injury(player_name, self._injuries)
+            injury_status = self.get_injury_status(player_name)
             dnp_risk = get_dnp_risk(injury_status)
 
             if dnp_risk >= 0.75:
@@ -200,66 +252,126 @@ class TTFLSession:
         if date is None:
             date = datetime.now().strftime("%Y-%m-%d")
 
-        players, games = self.get_players_for_date(date)
+        self.last_games = self.get_players_for_date(date)[1]
 
-        if not players:
-            return []
+        # Scoring only depends on the date and options: extra locks just filter the ranking
+        key = (date, include_risky, include_locked, use_form, use_defense)
+        if key not in self._ranked_cache:
+            self._ranked_cache[key] = self._rank_players(date, include_risky, include_locked, use_form, use_defense)
+        ranked = self._ranked_cache[key]
 
-        # Combine real locks with any extra locks (for planning)
-        all_locked = self._locked_players.copy()
-        if extra_locks:
-            all_locked |= extra_locks
+        if not extra_locks:
+            return ranked[:top_n]
 
+        extra_cf = {locked.casefold() for locked in extra_locks}
         recommendations = []
-        total = len(players)
+        for rec in ranked:
+            if rec.name.casefold() in extra_cf:
+                # Skip locked players unless explicitly included
+                if not include_locked:
+                    continue
+                rec = replace(rec, is_locked=True)
+            recommendations.append(rec)
+            if len(recommendations) == top_n:
+                break
+
+        return recommendations
+
+    def _rank_players(
+        self,
+        date: str,
+        include_risky: bool,
+        include_locked: bool,
+        use_form: bool,
+        use_defense: bool,
+    ) -> list[PlayerRecommendation]:
+        """Score every eligible player for a date, highest adjusted score first."""
+        players, _ = self.get_players_for_date(date)
 
-        self._log(f"Calculating TTFL scores for {total} players...")
+        if not players:
+            return []
 
-        for i, player in enumerate(players, 1):
-            if i % 50 == 0:
-                self._log(f"  Progress: {i}/{total}")
+        recommendations = []
+        eligible = []
 
+        for player in players:
             player_name = player["name"]
-            player_id = player["id"]
-            team = player["team"]
-            opponent_team_id = player.get("opponent_team_id")
-            opponent_team = get_team_abbrev(opponent_team_id) if opponent_team_id else "?"
+
+            # Skip players whose team has no game tonight
+            if not player.get("opponent_team_id"):
+                continue
 
             # Check if locked
-            is_locked = player_name in all_locked or any(
-                locked.lower() == player_name.lower() for locked in all_locked
-            )
+            is_locked = player_name.casefold() in self._locked_cf
 
             # Skip locked players unless explicitly included
             if is_locked and not include_locked:
                 continue
 
             # Get injury status
-            injury_status = match_player_injury(player_name, self._injuries)
+            injury_status = self.get_injury_status(player_name)
             dnp_risk = get_dnp_risk(injury_status)
 
             # Skip OUT players unless explicitly included
             if dnp_risk >= 1.0 and not include_risky:
                 continue
 
+            eligible.append((player, is_locked, injury_status, dnp_risk))
+
+        eligible, simple_averages = apply_league_averages(eligible, self.get_league_averages(), use_form)
+
+        self._log(f"Calculating TTFL scores for {len(eligible)} players...")
+        self.prefetch_player_ttfl([player["id"] for player, *_ in eligible if player["id"] not in simple_averages])
+
+        candidates = []
+        score_ids = []
+        score_lists = []
+        for player, is_locked, injury_status, dnp_risk in eligible:
+            if player["id"] in simple_averages:
+                avg_ttfl, games_played = simple_averages[player["id"]]
+                candidates.append((player, is_locked, injury_status, dnp_risk, games_played, simple_form(avg_ttfl)))
+                continue
+
             # Get TTFL scores (cached)
-            ttfl_scores = self.get_player_ttfl(player_id)
+            ttfl_scores = self.get_player_ttfl(player["id"])
 
             if not ttfl_scores:
                 continue
 
-            # Analyze form
-            form_analysis = analyze_form(ttfl_scores)
+            candidates.append((player, is_locked, injury_status, dnp_risk, len(ttfl_scores), None))
+            if player["id"] not in self._form_cache:
+                score_ids.append(player["id"])
+                score_lists.append(ttfl_scores)
+
+        # Analyze form for every uncached player with game logs in one batch
+        # (scores are fixed for the session, so later dates reuse the result)
+        self._form_cache.update(zip(score_ids, analyze_form_batch(score_lists)))
+
+        # Matchup factors depend only on the opponent: compute them once per team
+        opp_factors: dict[int, tuple[float, float, str | None]] = {}
+
+        for player, is_locked, injury_status, dnp_risk, games_played, form_analysis in candidates:
+            player_name = player["name"]
+            player_id = player["id"]
+            if form_analysis is None:
+                form_analysis = self._form_cache[player_id]
+            team = player["team"]
+            opponent_team_id = player["opponent_team_id"]
+            opponent_team = get_team_abbrev(opponent_team_id)
             avg_ttfl = form_analysis.simple_avg
 
             # Skip players with very low average
-            if avg_ttfl < 10:
+            if avg_ttfl < MIN_AVG_TTFL:
                 continue
 
             # Get defense factors
-            if use_defense and opponent_team_id:
-                defense_factor = get_defense_factor(opponent_team_id)
-                defender_factor, best_defender = get_defender_factor(opponent_team_id)
+            if use_defense:
+                if opponent_team_id not in opp_factors:
+                    opp_factors[opponent_team_id] = (
+                        get_defense_factor(opponent_team_id),
+                        *get_defender_factor(opponent_team_id),
+                    )
+                defense_factor, defender_factor, best_defender = opp_factors[opponent_team_id]
             else:
                 defense_factor = 1.0
                 defender_factor = 1.0
@@ -308,7 +420,7 @@ class TTFLSession:
                 injury_status=injury_status,
                 dnp_risk=dnp_risk,
                 is_locked=is_locked,
-                games_played=len(ttfl_scores),
+                games_played=games_played,
                 seed=seed,
                 championship_odds=champ_odds,
                 scarcity_factor=player_scarcity,
@@ -320,7 +432,7 @@ class TTFLSession:
         # Sort by adjusted score (highest first)
         recommendations.sort(key=lambda x: x.adjusted_score, reverse=True)
 
-        return recommendations[:top_n]
+        return recommendations
 
     def plan_picks(self, days: int = 7) -> list[DayPlan]:
         """
@@ -337,12 +449,10 @@ class TTFLSession:
         """
         simulated_locks: set[str] = set()
         plans = []
-        today = datetime.now()
-
-        for day_offset in range(days):
-            current_date = today + timedelta(days=day_offset)
-            date_str = current_date.strftime("%Y-%m-%d")
+        today = datetime.now().date()
+        date_strs = [(today + timedelta(days=day_offset)).isoformat() for day_offset in range(days)]
 
+        for date_str in date_strs:
             self._log(f"\n📅 Planning for {date_str}...")
 
             # Get recommendations excluding simulated locks
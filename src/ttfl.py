@@ -1,5 +1,16 @@
 """TTFL score calculation from NBA box score stats."""
 
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+
+# Box score columns in the order calculate_ttfl_batch reads them
+TTFL_STAT_COLUMNS = ["PTS", "REB", "AST", "STL", "BLK", "FGM", "FG3M", "FTM", "FGA", "FG3A", "FTA", "TOV"]
+
+# Fetches every stat in one call (KeyError if any is missing)
+_get_stats = itemgetter(*TTFL_STAT_COLUMNS)
+
 
 def calculate_ttfl(stats: dict) -> int:
     """
@@ -15,21 +26,13 @@ def calculate_ttfl(stats: dict) -> int:
     Returns:
         TTFL score as integer
     """
-    # Positive contributions
-    pts = stats.get("PTS", 0) or 0
-    reb = stats.get("REB", 0) or 0
-    ast = stats.get("AST", 0) or 0
-    stl = stats.get("STL", 0) or 0
-    blk = stats.get("BLK", 0) or 0
-    fgm = stats.get("FGM", 0) or 0
-    fg3m = stats.get("FG3M", 0) or 0
-    ftm = stats.get("FTM", 0) or 0
-
-    # Negative contributions (misses and turnovers)
-    fga = stats.get("FGA", 0) or 0
-    fg3a = stats.get("FG3A", 0) or 0
-    fta = stats.get("FTA", 0) or 0
-    tov = stats.get("TOV", 0) or 0
+    try:
+        values = _get_stats(stats)
+    except KeyError:
+        values = tuple(stats.get(column) for column in TTFL_STAT_COLUMNS)
+    if None in values:
+        values = tuple(value or 0 for value in values)
+    pts, reb, ast, stl, blk, fgm, fg3m, ftm, fga, fg3a, fta, tov = values
 
     fg_miss = fga - fgm
     fg3_miss = fg3a - fg3m
@@ -41,25 +44,21 @@ def calculate_ttfl(stats: dict) -> int:
     return positive - negative
 
 
-def calculate_ttfl_from_game_log(game_log: dict) -> int:
+def calculate_ttfl_batch(df: pd.DataFrame) -> np.ndarray:
     """
-    Calculate TTFL from nba_api game log format.
+    Calculate TTFL scores for every row of a box score DataFrame at once.
+
+    Same formula as calculate_ttfl, applied column-wise (missing columns
+    and values count as 0).
 
-    The game log from nba_api has slightly different column names.
+    Args:
+        df: DataFrame with nba_api box score columns (e.g. a PlayerGameLog)
+
+    Returns:
+        Integer array of TTFL scores, one per row
     """
-    # Map nba_api column names to our expected format
-    stats = {
-        "PTS": game_log.get("PTS"),
-        "REB": game_log.get("REB"),
-        "AST": game_log.get("AST"),
-        "STL": game_log.get("STL"),
-        "BLK": game_log.get("BLK"),
-        "FGM": game_log.get("FGM"),
-        "FGA": game_log.get("FGA"),
-        "FG3M": game_log.get("FG3M"),
-        "FG3A": game_log.get("FG3A"),
-        "FTM": game_log.get("FTM"),
-        "FTA": game_log.get("FTA"),
-        "TOV": game_log.get("TOV"),
-    }
-    return calculate_ttfl(stats)
+    c = df.reindex(columns=TTFL_STAT_COLUMNS, fill_value=0).fillna(0).to_numpy(dtype=np.int64)
+    positive = c[:, :8].sum(axis=1)
+    # FGA - FGM, FG3A - FG3M, FTA - FTM, TOV
+    negative = (c[:, 8] - c[:, 5]) + (c[:, 9] - c[:, 6]) + (c[:, 10] - c[:, 7]) + c[:, 11]
+    return positive - negative
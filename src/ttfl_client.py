@@ -1,33 +1,96 @@
 """Client to fetch pick history from TTFL website."""
 
-import http.cookiejar
-from datetime import datetime, timedelta
+import hashlib
+import os
+import sys
+from datetime import date, datetime, timedelta
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from . import disk_cache
+
+# Shared HTTP session so the TLS connection is kept alive between requests
+_session = requests.Session()
+_session.mount(
+    "https://",
+    HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=Retry(total=3, backoff_factor=0.3)),
+)
+
+# Parsed pick history is reused for this long (short, so a pick made today
+# shows up as locked on the next run)
+PICK_HISTORY_MAX_AGE = 5 * 60
+
+
+# History table stat columns: (key, cell index)
+_STAT_COLS = (
+    ("pts", 2),
+    ("reb", 3),
+    ("ast", 4),
+    ("stl", 5),
+    ("blk", 6),
+    ("ftm", 7),
+    ("fgm", 8),
+    ("fg3m", 9),
+    ("malus", 10),
+)
+
+
+# Line prefix for HttpOnly cookies in Netscape cookie files
+_HTTP_ONLY_PREFIX = "#HttpOnly_"
+
+
+def _history_cache_key(cookie_file: str) -> str:
+    """Build a cache key from the cookie file's path and modification time."""
+    path = os.path.abspath(cookie_file)
+    fingerprint = f"{path}:{os.stat(path).st_mtime_ns}"
+    return f"pick_history_{hashlib.sha1(fingerprint.encode()).hexdigest()[:16]}"
 
 
 def load_cookies(cookie_file: str) -> dict[str, str]:
-    """Load cookies from Netscape cookie file format."""
-    cj = http.cookiejar.MozillaCookieJar(cookie_file)
-    cj.load(ignore_discard=True, ignore_expires=True)
+    """
+    Load cookies from Netscape cookie file format.
 
+    Each cookie line has seven tab-separated fields:
+    domain, include subdomains, path, secure, expiry, name, value.
+    Expiry is ignored, as the site decides whether the session is still valid.
+    """
     cookies = {}
-    for cookie in cj:
-        cookies[cookie.name] = cookie.value
+    with open(cookie_file, encoding="utf-8") as f:
+        for line in f:
+            # curl marks HttpOnly cookies with a comment-like prefix
+            if line.startswith(_HTTP_ONLY_PREFIX):
+                line = line[len(_HTTP_ONLY_PREFIX):]
+            elif line.startswith("#") or not line.strip():
+                continue
+
+            fields = line.rstrip("\r\n").split("\t")
+            if len(fields) >= 7:
+                cookies[fields[5]] = fields[6]
     return cookies
 
 
-def get_pick_history(cookie_file: str) -> list[dict]:
+def get_pick_history(cookie_file: str, parse_stats: bool = True) -> list[dict]:
     """
     Fetch pick history from TTFL website.
 
     Args:
         cookie_file: Path to Netscape-format cookie file
+        parse_stats: If False, skip the per-pick box score ("stats" is None)
 
     Returns:
         List of picks: [{"date": "2025-01-21", "player": "Luka Dončić", "score": 69, "locked": True}, ...]
     """
+    # Logging in again rewrites the cookie file, which also changes the key
+    cache_key = _history_cache_key(cookie_file)
+    if not parse_stats:
+        cache_key += "_nostats"
+    cached = disk_cache.load(cache_key, max_age=PICK_HISTORY_MAX_AGE)
+    if cached is not None:
+        return cached
+
     cookies = load_cookies(cookie_file)
 
     url = "https://fantasy.trashtalk.co/?tpl=historique"
@@ -35,40 +98,49 @@ def get_pick_history(cookie_file: str) -> list[dict]:
         "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
     }
 
-    response = requests.get(url, cookies=cookies, headers=headers)
+    response = _session.get(url, cookies=cookies, headers=headers)
     response.raise_for_status()
 
-    return parse_history_html(response.text)
+    picks = parse_history_html(response.text, parse_stats=parse_stats)
+    disk_cache.save(cache_key, picks)
+    return picks
 
 
-def parse_history_html(html: str) -> list[dict]:
+def parse_history_html(html: str, parse_stats: bool = True) -> list[dict]:
     """Parse the history page HTML to extract pick data."""
-    soup = BeautifulSoup(html, "html.parser")
+    # Only the tables matter: skip building the rest of the page
+    soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer("table"))
+
+    return [
+        pick
+        for cells in _history_rows(soup)
+        if (pick := parse_history_row(cells, parse_stats=parse_stats))
+    ]
 
-    picks = []
 
+def _history_rows(soup: BeautifulSoup):
+    """Yield the cells of every table row long enough to hold a pick."""
     # Find the history table
     # Columns: Date, Joueur, Pts, Reb, Ast, Stl, Blk, Ftm, Fgm, Fg3m, Malus, Score, [Bonus x2]
-    tables = soup.find_all("table")
-
-    for table in tables:
-        rows = table.find_all("tr")
-        for row in rows:
+    for table in soup.find_all("table"):
+        # Rows may sit under <thead>/<tbody>; cells are always direct children
+        for row in table.descendants:
+            if row.name != "tr":
+                continue
             # TTFL uses mix of th and td elements
-            cells = row.find_all(["td", "th"])
+            cells = [node for node in row.children if node.name in ("td", "th")]
             # Need at least 12 columns (Date through Score)
             if len(cells) >= 12:
-                pick = parse_history_row(cells)
-                if pick:
-                    picks.append(pick)
-
-    return picks
+                yield cells
 
 
-def parse_history_row(cells) -> dict | None:
+def parse_history_row(cells, parse_stats: bool = True) -> dict | None:
     """
     Parse a table row to extract pick information.
 
+    With parse_stats=False the stat columns are not read and "stats" is None
+    (lock checks only need the date, player and locked flag).
+
     Expected columns (0-indexed):
     0: Date (YYYY-MM-DD)
     1: Joueur (player name)
@@ -85,13 +157,14 @@ def parse_history_row(cells) -> dict | None:
     12: Bonus x2 / locked status (oui/non) - optional
     """
     try:
-        date_text = cells[0].get_text(strip=True)
-        player_name = cells[1].get_text(strip=True)
+        # Names and dates repeat across a season's history: share one string each
+        date_text = sys.intern(cells[0].get_text(strip=True))
+        player_name = sys.intern(cells[1].get_text(strip=True))
         score_text = cells[11].get_text(strip=True)
 
         # Validate date format (YYYY-MM-DD)
         try:
-            datetime.strptime(date_text, "%Y-%m-%d")
+            date.fromisoformat(date_text)
         except ValueError:
             # Skip header rows or invalid dates
             return None
@@ -109,21 +182,12 @@ def parse_history_row(cells) -> dict | None:
             locked = lock_text == "oui"
 
         # Extract stats for verification/debugging
-        stats = {}
-        try:
-            stats = {
-                "pts": int(cells[2].get_text(strip=True)),
-                "reb": int(cells[3].get_text(strip=True)),
-                "ast": int(cells[4].get_text(strip=True)),
-                "stl": int(cells[5].get_text(strip=True)),
-                "blk": int(cells[6].get_text(strip=True)),
-                "ftm": int(cells[7].get_text(strip=True)),
-                "fgm": int(cells[8].get_text(strip=True)),
-                "fg3m": int(cells[9].get_text(strip=True)),
-                "malus": int(cells[10].get_text(strip=True)),
-            }
-        except (ValueError, IndexError):
-            pass
+        stats = None
+        if parse_stats:
+            try:
+                stats = {key: int(cells[i].get_text(strip=True)) for key, i in _STAT_COLS}
+            except (ValueError, IndexError):
+                stats = {}
 
         return {
             "date": date_text,
@@ -147,19 +211,16 @@ def get_locked_players(cookie_file: str, lock_days: int = 30) -> set[str]:
     Returns:
         Set of locked player names
     """
-    picks = get_pick_history(cookie_file)
+    picks = get_pick_history(cookie_file, parse_stats=False)
 
     cutoff_date = datetime.now() - timedelta(days=lock_days)
-    locked = set()
+    return {pick["player"] for pick in picks if _is_locked(pick, cutoff_date)}
 
-    for pick in picks:
-        try:
-            pick_date = datetime.strptime(pick["date"], "%Y-%m-%d")
-            if pick_date >= cutoff_date:
-                locked.add(pick["player"])
-        except (ValueError, KeyError):
-            # If we can't parse the date, check the locked flag
-            if pick.get("locked"):
-                locked.add(pick["player"])
-
-    return locked
+
+def _is_locked(pick: dict, cutoff_date: datetime) -> bool:
+    """Check whether a pick is still locked: picked after the cutoff."""
+    try:
+        return datetime.fromisoformat(pick["date"]) >= cutoff_date
+    except (ValueError, KeyError):
+        # If we can't parse the date, check the locked flag
+        return bool(pick.get("locked"))
@@ -1,12 +1,61 @@
 """Shared fixtures for TTFL Picker tests."""
 
-import pytest
+from types import MappingProxyType
 
+import pytest
 
-@pytest.fixture
+from src.injuries import _strip_suffix, get_dnp_risk, normalize_player_name
+from src.picker import PlayerRecommendation
+
+
+@pytest.fixture(autouse=True)
+def isolated_disk_cache(tmp_path, monkeypatch):
+    """Point the on-disk cache at a per-test temp directory."""
+    monkeypatch.setattr("src.disk_cache.CACHE_DIR", tmp_path / "cache")
+
+
+@pytest.fixture(autouse=True)
+def cleared_injury_caches():
+    """Start every test with empty memoized name and DNP risk lookups."""
+    normalize_player_name.cache_clear()
+    _strip_suffix.cache_clear()
+    get_dnp_risk.cache_clear()
+
+
+# Neutral recommendation: healthy, unlocked, stable form, average matchup
+_RECOMMENDATION_DEFAULTS = MappingProxyType({
+    "name": "Test Player",
+    "team": "TM1",
+    "player_id": 1,
+    "opponent_team": "OPP",
+    "avg_ttfl": 40.0,
+    "weighted_avg": 40.0,
+    "trend_factor": 1.0,
+    "trend_direction": "stable",
+    "consistency_factor": 1.0,
+    "defense_factor": 1.0,
+    "best_defender": None,
+    "defender_factor": 1.0,
+    "adjusted_score": 40.0,
+    "injury_status": None,
+    "dnp_risk": 0.0,
+    "is_locked": False,
+    "games_played": 10,
+})
+
+
+@pytest.fixture(scope="session")
+def make_recommendation():
+    """Factory for PlayerRecommendation: pass only the fields a test cares about."""
+    def _make(**overrides):
+        return PlayerRecommendation(**{**_RECOMMENDATION_DEFAULTS, **overrides})
+    return _make
+
+
+@pytest.fixture(scope="session")
 def sample_game_stats():
     """Standard NBA game stats."""
-    return {
+    return MappingProxyType({
         "PTS": 25,
         "REB": 8,
         "AST": 6,
@@ -19,13 +68,13 @@ def sample_game_stats():
         "FTM": 2,
         "FTA": 3,
         "TOV": 3,
-    }
+    })
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def perfect_shooting_stats():
     """Perfect shooting game - no misses."""
-    return {
+    return MappingProxyType({
         "PTS": 30,
         "REB": 5,
         "AST": 10,
@@ -38,13 +87,13 @@ def perfect_shooting_stats():
         "FTM": 2,
         "FTA": 2,  # 100% FT
         "TOV": 1,
-    }
+    })
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def turnover_heavy_stats():
     """High turnover game."""
-    return {
+    return MappingProxyType({
         "PTS": 20,
         "REB": 4,
         "AST": 8,
@@ -57,46 +106,102 @@ def turnover_heavy_stats():
         "FTM": 6,
         "FTA": 8,
         "TOV": 7,
-    }
+    })
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_ttfl_scores():
     """10 games of TTFL scores (most recent first)."""
-    return [45, 38, 42, 35, 50, 28, 44, 39, 41, 36]
+    return (45, 38, 42, 35, 50, 28, 44, 39, 41, 36)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def hot_streak_scores():
     """Scores showing upward trend (most recent first)."""
-    return [55, 50, 45, 40, 35, 30, 28, 25, 22, 20]
+    return (55, 50, 45, 40, 35, 30, 28, 25, 22, 20)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def cold_streak_scores():
     """Scores showing downward trend (most recent first)."""
-    return [20, 25, 30, 35, 40, 45, 48, 50, 52, 55]
+    return (20, 25, 30, 35, 40, 45, 48, 50, 52, 55)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def consistent_scores():
     """Low variance scores."""
-    return [40, 41, 39, 40, 42, 38, 41, 40, 39, 40]
+    return (40, 41, 39, 40, 42, 38, 41, 40, 39, 40)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def inconsistent_scores():
     """High variance scores."""
-    return [60, 20, 55, 15, 65, 25, 50, 10, 70, 30]
+    return (60, 20, 55, 15, 65, 25, 50, 10, 70, 30)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_injuries():
     """Sample injury report dict."""
-    return {
+    return MappingProxyType({
         "LeBron James": "Questionable",
         "Stephen Curry": "Out",
         "Kevin Durant": "Probable",
         "Giannis Antetokounmpo": "Day-To-Day",
         "Luka Doncic": "Doubtful",
-    }
+    })
+
+
+@pytest.fixture(scope="session")
+def espn_injury_html():
+    """ESPN injury table HTML."""
+    # ESPN columns: NAME | POS | EST. RETURN DATE | STATUS | COMMENT
+    return """
+    <html>
+    <body>
+    <table>
+        <tr>
+            <td>LeBron James</td>
+            <td>PF</td>
+            <td>Feb 10</td>
+            <td>Questionable</td>
+            <td>Ankle soreness</td>
+        </tr>
+        <tr>
+            <td>Stephen Curry</td>
+            <td>PG</td>
+            <td>Feb 15</td>
+            <td>Out</td>
+            <td>Knee injury</td>
+        </tr>
+    </table>
+    </body>
+    </html>
+    """
+
+
+@pytest.fixture(scope="session")
+def cbs_injury_html():
+    """CBS Sports injury table HTML."""
+    # CBS columns: NAME | POS | DATE | INJURY | STATUS
+    return """
+    <html>
+    <body>
+    <table>
+        <tr class="TableBase-row">
+            <td><a href="/player">Kevin Durant</a></td>
+            <td>SF</td>
+            <td>Feb 10</td>
+            <td>Knee</td>
+            <td>Probable</td>
+        </tr>
+        <tr class="TableBase-bodyRow">
+            <td><a href="/player">Giannis Antetokounmpo</a></td>
+            <td>PF</td>
+            <td>Feb 12</td>
+            <td>Back</td>
+            <td>Day-To-Day</td>
+        </tr>
+    </table>
+    </body>
+    </html>
+    """
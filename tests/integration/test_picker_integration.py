@@ -1,10 +1,13 @@
 """Integration tests for the picker module."""
 
+from types import SimpleNamespace
+from unittest.mock import DEFAULT, patch
+
 import pytest
-from unittest.mock import patch, MagicMock
 
 from src.picker import get_recommendations, PlayerRecommendation
 from src.form_analysis import FormAnalysis
+from src.session import TTFLSession
 
 
 class TestGetRecommendationsIntegration:
@@ -80,42 +83,42 @@ class TestGetRecommendationsIntegration:
             203081: [42, 38, 45, 36, 40, 37, 43, 39, 41, 38],  # Lillard
         }
 
-    def _get_ttfl_scores(self, player_id, mock_ttfl_scores):
-        """Helper to get TTFL scores by player_id."""
-        return mock_ttfl_scores.get(player_id, [])
-
-    @patch("src.matchups.fetch_defender_stats")
-    @patch("src.defense_stats.fetch_team_defense_stats")
-    @patch("src.picker.get_defender_factor")
-    @patch("src.picker.get_defense_factor")
-    @patch("src.picker.get_player_ttfl_scores")
-    @patch("src.picker.get_players_playing_tonight")
-    @patch("src.picker.get_injury_report")
-    @patch("src.picker.get_locked_players")
-    def test_full_pipeline(
-        self,
-        mock_get_locked,
-        mock_get_injuries,
-        mock_get_players,
-        mock_get_ttfl,
-        mock_get_defense_factor,
-        mock_get_defender_factor,
-        mock_fetch_defense_stats,
-        mock_fetch_defender_stats,
-        mock_locked_players,
-        mock_injuries,
-        mock_players,
-        mock_games,
-        mock_ttfl_scores,
-    ):
+    @pytest.fixture
+    def picker_mocks(self, mock_players, mock_games, mock_ttfl_scores):
+        """
+        Patch every external call made by get_recommendations.
+
+        Defaults: no locks, no injuries, tonight's mock players, their mock
+        TTFL scores, neutral matchups and no bulk averages (every player goes
+        through game logs). Tests override return values as needed.
+        """
+        with (
+            patch.multiple(
+                "src.picker",
+                get_locked_players=DEFAULT,
+                get_injury_report=DEFAULT,
+                get_players_playing_tonight=DEFAULT,
+                get_player_ttfl_scores=DEFAULT,
+                get_league_average_ttfl=DEFAULT,
+                get_defense_factor=DEFAULT,
+                get_defender_factor=DEFAULT,
+            ) as mocks,
+            patch("src.matchups.fetch_defender_stats"),
+            patch("src.defense_stats.fetch_team_defense_stats"),
+        ):
+            mocks["get_locked_players"].return_value = set()
+            mocks["get_injury_report"].return_value = {}
+            mocks["get_players_playing_tonight"].return_value = (mock_players, mock_games)
+            mocks["get_player_ttfl_scores"].side_effect = lambda pid: mock_ttfl_scores.get(pid, [])
+            mocks["get_league_average_ttfl"].return_value = {}
+            mocks["get_defense_factor"].return_value = 1.0
+            mocks["get_defender_factor"].return_value = (1.0, None)
+            yield SimpleNamespace(**mocks)
+
+    def test_full_pipeline(self, picker_mocks, mock_locked_players, mock_injuries):
         """Test the full recommendation pipeline with all mocks."""
-        # Setup mocks
-        mock_get_locked.return_value = mock_locked_players
-        mock_get_injuries.return_value = mock_injuries
-        mock_get_players.return_value = (mock_players, mock_games)
-        mock_get_ttfl.side_effect = lambda pid: mock_ttfl_scores.get(pid, [])
-        mock_get_defense_factor.return_value = 1.0
-        mock_get_defender_factor.return_value = (1.0, None)
+        picker_mocks.get_locked_players.return_value = mock_locked_players
+        picker_mocks.get_injury_report.return_value = mock_injuries
 
         # Call get_recommendations
         recommendations = get_recommendations(
@@ -144,38 +147,10 @@ class TestGetRecommendationsIntegration:
         lebron = next(r for r in recommendations if r.name == "LeBron James")
         assert lebron.dnp_risk == 0.40
 
-    @patch("src.matchups.fetch_defender_stats")
-    @patch("src.defense_stats.fetch_team_defense_stats")
-    @patch("src.picker.get_defender_factor")
-    @patch("src.picker.get_defense_factor")
-    @patch("src.picker.get_player_ttfl_scores")
-    @patch("src.picker.get_players_playing_tonight")
-    @patch("src.picker.get_injury_report")
-    @patch("src.picker.get_locked_players")
-    def test_include_locked(
-        self,
-        mock_get_locked,
-        mock_get_injuries,
-        mock_get_players,
-        mock_get_ttfl,
-        mock_get_defense_factor,
-        mock_get_defender_factor,
-        mock_fetch_defense_stats,
-        mock_fetch_defender_stats,
-        mock_locked_players,
-        mock_injuries,
-        mock_players,
-        mock_games,
-        mock_ttfl_scores,
-    ):
+    def test_include_locked(self, picker_mocks, mock_locked_players, mock_injuries):
         """Test including locked players in recommendations."""
-        # Setup mocks
-        mock_get_locked.return_value = mock_locked_players
-        mock_get_injuries.return_value = mock_injuries
-        mock_get_players.return_value = (mock_players, mock_games)
-        mock_get_ttfl.side_effect = lambda pid: mock_ttfl_scores.get(pid, [])
-        mock_get_defense_factor.return_value = 1.0
-        mock_get_defender_factor.return_value = (1.0, None)
+        picker_mocks.get_locked_players.return_value = mock_locked_players
+        picker_mocks.get_injury_report.return_value = mock_injuries
 
         recommendations = get_recommendations(
             cookie_file="dummy_cookies.txt",
@@ -190,38 +165,10 @@ class TestGetRecommendationsIntegration:
         lillard = next(r for r in recommendations if r.name == "Damian Lillard")
         assert lillard.is_locked is True
 
-    @patch("src.matchups.fetch_defender_stats")
-    @patch("src.defense_stats.fetch_team_defense_stats")
-    @patch("src.picker.get_defender_factor")
-    @patch("src.picker.get_defense_factor")
-    @patch("src.picker.get_player_ttfl_scores")
-    @patch("src.picker.get_players_playing_tonight")
-    @patch("src.picker.get_injury_report")
-    @patch("src.picker.get_locked_players")
-    def test_include_risky(
-        self,
-        mock_get_locked,
-        mock_get_injuries,
-        mock_get_players,
-        mock_get_ttfl,
-        mock_get_defense_factor,
-        mock_get_defender_factor,
-        mock_fetch_defense_stats,
-        mock_fetch_defender_stats,
-        mock_locked_players,
-        mock_injuries,
-        mock_players,
-        mock_games,
-        mock_ttfl_scores,
-    ):
+    def test_include_risky(self, picker_mocks, mock_locked_players, mock_injuries):
         """Test including risky (OUT) players in recommendations."""
-        # Setup mocks
-        mock_get_locked.return_value = mock_locked_players
-        mock_get_injuries.return_value = mock_injuries
-        mock_get_players.return_value = (mock_players, mock_games)
-        mock_get_ttfl.side_effect = lambda pid: mock_ttfl_scores.get(pid, [])
-        mock_get_defense_factor.return_value = 1.0
-        mock_get_defender_factor.return_value = (1.0, None)
+        picker_mocks.get_locked_players.return_value = mock_locked_players
+        picker_mocks.get_injury_report.return_value = mock_injuries
 
         recommendations = get_recommendations(
             cookie_file="dummy_cookies.txt",
@@ -237,34 +184,10 @@ class TestGetRecommendationsIntegration:
         assert curry.dnp_risk == 1.0
         assert curry.adjusted_score == 0.0
 
-    @patch("src.matchups.fetch_defender_stats")
-    @patch("src.defense_stats.fetch_team_defense_stats")
-    @patch("src.picker.get_defender_factor")
-    @patch("src.picker.get_defense_factor")
-    @patch("src.picker.get_player_ttfl_scores")
-    @patch("src.picker.get_players_playing_tonight")
-    @patch("src.picker.get_injury_report")
-    def test_ignore_locks(
-        self,
-        mock_get_injuries,
-        mock_get_players,
-        mock_get_ttfl,
-        mock_get_defense_factor,
-        mock_get_defender_factor,
-        mock_fetch_defense_stats,
-        mock_fetch_defender_stats,
-        mock_injuries,
-        mock_players,
-        mock_games,
-        mock_ttfl_scores,
-    ):
+    def test_ignore_locks(self, picker_mocks, mock_locked_players, mock_injuries):
         """Test that ignore_locks skips fetching locked players."""
-        # Setup mocks (no mock for get_locked_players)
-        mock_get_injuries.return_value = mock_injuries
-        mock_get_players.return_value = (mock_players, mock_games)
-        mock_get_ttfl.side_effect = lambda pid: mock_ttfl_scores.get(pid, [])
-        mock_get_defense_factor.return_value = 1.0
-        mock_get_defender_factor.return_value = (1.0, None)
+        picker_mocks.get_locked_players.return_value = mock_locked_players
+        picker_mocks.get_injury_report.return_value = mock_injuries
 
         recommendations = get_recommendations(
             cookie_file="dummy_cookies.txt",
@@ -274,24 +197,15 @@ class TestGetRecommendationsIntegration:
         )
 
         # All non-OUT players should be available
+        picker_mocks.get_locked_players.assert_not_called()
         player_names = [r.name for r in recommendations]
         assert "Damian Lillard" in player_names
         lillard = next(r for r in recommendations if r.name == "Damian Lillard")
         assert lillard.is_locked is False
 
-    @patch("src.picker.get_locked_players")
-    @patch("src.picker.get_injury_report")
-    @patch("src.picker.get_players_playing_tonight")
-    def test_no_games_returns_empty(
-        self,
-        mock_get_players,
-        mock_get_injuries,
-        mock_get_locked,
-    ):
+    def test_no_games_returns_empty(self, picker_mocks):
         """Test that no games returns empty recommendations."""
-        mock_get_locked.return_value = set()
-        mock_get_injuries.return_value = {}
-        mock_get_players.return_value = ([], [])
+        picker_mocks.get_players_playing_tonight.return_value = ([], [])
 
         recommendations = get_recommendations(
             cookie_file="dummy_cookies.txt",
@@ -301,36 +215,8 @@ class TestGetRecommendationsIntegration:
 
         assert len(recommendations) == 0
 
-    @patch("src.matchups.fetch_defender_stats")
-    @patch("src.defense_stats.fetch_team_defense_stats")
-    @patch("src.picker.get_defender_factor")
-    @patch("src.picker.get_defense_factor")
-    @patch("src.picker.get_player_ttfl_scores")
-    @patch("src.picker.get_players_playing_tonight")
-    @patch("src.picker.get_injury_report")
-    @patch("src.picker.get_locked_players")
-    def test_recommendations_sorted_by_score(
-        self,
-        mock_get_locked,
-        mock_get_injuries,
-        mock_get_players,
-        mock_get_ttfl,
-        mock_get_defense_factor,
-        mock_get_defender_factor,
-        mock_fetch_defense_stats,
-        mock_fetch_defender_stats,
-        mock_players,
-        mock_games,
-        mock_ttfl_scores,
-    ):
+    def test_recommendations_sorted_by_score(self, picker_mocks):
         """Test that recommendations are sorted by adjusted score."""
-        mock_get_locked.return_value = set()
-        mock_get_injuries.return_value = {}
-        mock_get_players.return_value = (mock_players, mock_games)
-        mock_get_ttfl.side_effect = lambda pid: mock_ttfl_scores.get(pid, [])
-        mock_get_defense_factor.return_value = 1.0
-        mock_get_defender_factor.return_value = (1.0, None)
-
         recommendations = get_recommendations(
             cookie_file="dummy_cookies.txt",
             date="2025-01-25",
@@ -341,36 +227,8 @@ class TestGetRecommendationsIntegration:
         scores = [r.adjusted_score for r in recommendations]
         assert scores == sorted(scores, reverse=True)
 
-    @patch("src.matchups.fetch_defender_stats")
-    @patch("src.defense_stats.fetch_team_defense_stats")
-    @patch("src.picker.get_defender_factor")
-    @patch("src.picker.get_defense_factor")
-    @patch("src.picker.get_player_ttfl_scores")
-    @patch("src.picker.get_players_playing_tonight")
-    @patch("src.picker.get_injury_report")
-    @patch("src.picker.get_locked_players")
-    def test_top_n_limit(
-        self,
-        mock_get_locked,
-        mock_get_injuries,
-        mock_get_players,
-        mock_get_ttfl,
-        mock_get_defense_factor,
-        mock_get_defender_factor,
-        mock_fetch_defense_stats,
-        mock_fetch_defender_stats,
-        mock_players,
-        mock_games,
-        mock_ttfl_scores,
-    ):
+    def test_top_n_limit(self, picker_mocks):
         """Test that top_n limits the number of recommendations."""
-        mock_get_locked.return_value = set()
-        mock_get_injuries.return_value = {}
-        mock_get_players.return_value = (mock_players, mock_games)
-        mock_get_ttfl.side_effect = lambda pid: mock_ttfl_scores.get(pid, [])
-        mock_get_defense_factor.return_value = 1.0
-        mock_get_defender_factor.return_value = (1.0, None)
-
         recommendations = get_recommendations(
             cookie_file="dummy_cookies.txt",
             date="2025-01-25",
@@ -378,3 +236,59 @@ class TestGetRecommendationsIntegration:
         )
 
         assert len(recommendations) <= 2
+
+    def test_matchup_factors_computed_once_per_opponent(self, picker_mocks, mock_players, mock_games, mock_ttfl_scores):
+        """Test teammates facing the same opponent share one factor lookup."""
+        teammate = {"name": "Anthony Davis", "id": 203076, "team": "LAL", "opponent_team_id": 1610612744}
+        picker_mocks.get_players_playing_tonight.return_value = ([*mock_players, teammate], mock_games)
+        picker_mocks.get_player_ttfl_scores.side_effect = lambda pid: mock_ttfl_scores.get(pid, [40] * 10)
+        picker_mocks.get_defense_factor.return_value = 1.1
+        picker_mocks.get_defender_factor.return_value = (0.93, "Draymond Green")
+
+        recommendations = get_recommendations(cookie_file="dummy_cookies.txt", date="2025-01-25", top_n=10)
+
+        opponents = [call.args[0] for call in picker_mocks.get_defense_factor.call_args_list]
+        assert opponents.count(1610612744) == 1
+        davis = next(r for r in recommendations if r.name == "Anthony Davis")
+        assert davis.defense_factor == 1.1
+        assert davis.best_defender == "Draymond Green"
+
+    def test_low_bulk_average_skips_game_log_fetch(self, picker_mocks):
+        """Test bench players ruled out by the bulk averages are never fetched."""
+        picker_mocks.get_league_average_ttfl.return_value = {203081: (4.0, 10), 203999: (57.0, 10)}
+
+        recommendations = get_recommendations(cookie_file="dummy_cookies.txt", date="2025-01-25")
+
+        fetched = {call.args[0] for call in picker_mocks.get_player_ttfl_scores.call_args_list}
+        assert 203081 not in fetched  # Lillard: bulk average below the prefilter
+        assert 203999 in fetched  # Jokic: still analyzed from his game logs
+        assert "Damian Lillard" not in [r.name for r in recommendations]
+
+    def test_session_prefilters_like_get_recommendations(self, picker_mocks, mock_players, mock_games):
+        """Test both rankers drop the same players for the same bulk averages."""
+        averages = {203081: (4.0, 10), 201142: (7.9, 10), 203999: (57.0, 10)}
+        picker_mocks.get_league_average_ttfl.return_value = averages
+        get_recommendations(cookie_file="dummy_cookies.txt", date="2025-01-25", use_defense=False)
+        picker_fetched = {call.args[0] for call in picker_mocks.get_player_ttfl_scores.call_args_list}
+
+        with patch.object(TTFLSession, "_fetch_shared_data"):
+            session = TTFLSession(verbose=False)
+        session._players_cache["2025-01-25"] = (mock_players, mock_games)
+        session._league_averages = averages
+        with patch("src.session.get_player_ttfl_scores", return_value=[]) as mock_fetch:
+            session._rank_players("2025-01-25", False, False, True, False)
+        session_fetched = {call.args[0] for call in mock_fetch.call_args_list}
+
+        assert session_fetched == picker_fetched == {2544, 201939, 203999}
+
+    def test_players_without_opponent_not_fetched(self, picker_mocks, mock_games):
+        """Test players whose team is idle are skipped before any game log fetch."""
+        idle = {"name": "Idle Player", "id": 1, "team": "CHA", "opponent_team_id": None}
+        picker_mocks.get_players_playing_tonight.return_value = ([idle], mock_games)
+
+        recommendations = get_recommendations(
+            cookie_file="dummy_cookies.txt", date="2025-01-25", use_defense=False
+        )
+
+        assert recommendations == []
+        picker_mocks.get_player_ttfl_scores.assert_not_called()
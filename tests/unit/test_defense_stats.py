@@ -0,0 +1,160 @@
+"""Tests for team defense stats."""
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src import defense_stats
+from src.defense_stats import (
+    MAX_DEFENSE_ADJUSTMENT,
+    _calculate_estimated_ttfl_allowed,
+    _result_set_columns,
+    fetch_team_defense_stats,
+    get_defense_factor,
+)
+
+
+def _team_row(team_id, team_name, opp_pts):
+    """Build an opponent stats row where only OPP_PTS varies between teams."""
+    return {
+        "TEAM_ID": team_id,
+        "TEAM_NAME": team_name,
+        "OPP_PTS": opp_pts,
+        "OPP_REB": 44.0,
+        "OPP_AST": 25.0,
+        "OPP_FGM": 40.0,
+        "OPP_FGA": 88.0,
+        "OPP_FG3M": 12.0,
+        "OPP_FG3A": 35.0,
+        "OPP_FTM": 18.0,
+        "OPP_FTA": 23.0,
+        "OPP_TOV": 14.0,
+    }
+
+
+def _result_set(rows):
+    """Build a raw nba_api result set from row dicts."""
+    headers = list(rows[0])
+    return {"headers": headers, "rowSet": [[row[h] for h in headers] for row in rows]}
+
+
+@pytest.fixture(autouse=True)
+def clear_defense_cache():
+    """Reset the module-level cache around each test."""
+    defense_stats.clear_cache()
+    yield
+    defense_stats.clear_cache()
+
+
+class TestCalculateEstimatedTTFLAllowed:
+    """Tests for _calculate_estimated_ttfl_allowed."""
+
+    def test_per_team_estimate(self):
+        """Test the estimate matches the TTFL formula spread over 5 players."""
+        columns = _result_set_columns(_result_set([_team_row(1, "A", 110.0)]))
+        # positive = 110 + 44 + 25 + 40 + 12 + 18 + 15 = 264
+        # negative = 14 + 48 + 23 + 5 = 90
+        assert _calculate_estimated_ttfl_allowed(columns)[0] == pytest.approx(174 / 5)
+
+    def test_missing_values_count_as_zero(self):
+        """Test NaN stats are treated as 0."""
+        columns = _result_set_columns(_result_set([_team_row(1, "A", None)]))
+        assert _calculate_estimated_ttfl_allowed(columns)[0] == pytest.approx(64 / 5)
+
+
+class TestFetchTeamDefenseStats:
+    """Tests for fetch_team_defense_stats with a mocked endpoint."""
+
+    def _mock_endpoint(self, rows):
+        endpoint = MagicMock()
+        endpoint.get_dict.return_value = {"resultSets": [_result_set(rows)]}
+        return endpoint
+
+    def test_factors_relative_to_league_average(self):
+        """Test weak defenses get >1 factors and strong defenses <1."""
+        rows = [
+            _team_row(1610612747, "Los Angeles Lakers", 120.0),
+            _team_row(1610612738, "Boston Celtics", 100.0),
+        ]
+        with patch("src.defense_stats.nba_api_call", return_value=self._mock_endpoint(rows)):
+            result = fetch_team_defense_stats("2025-26")
+
+        assert result[1610612747].defense_factor > 1.0
+        assert result[1610612738].defense_factor < 1.0
+        assert result[1610612747].team_abbrev == "LAL"
+        assert result[1610612738].team_name == "Boston Celtics"
+
+    def test_factors_are_capped(self):
+        """Test defense factors stay within +/- MAX_DEFENSE_ADJUSTMENT."""
+        rows = [
+            _team_row(1, "Sieve", 400.0),
+            _team_row(2, "Wall", 0.0),
+        ]
+        with patch("src.defense_stats.nba_api_call", return_value=self._mock_endpoint(rows)):
+            result = fetch_team_defense_stats("2025-26")
+
+        assert result[1].defense_factor == pytest.approx(1.0 + MAX_DEFENSE_ADJUSTMENT)
+        assert result[2].defense_factor == pytest.approx(1.0 - MAX_DEFENSE_ADJUSTMENT)
+
+    def test_reuses_disk_cache_across_runs(self):
+        """Test a fresh process (empty memory cache) is served from disk."""
+        rows = [_team_row(1610612747, "Los Angeles Lakers", 110.0)]
+        with patch("src.defense_stats.nba_api_call", return_value=self._mock_endpoint(rows)):
+            first = fetch_team_defense_stats("2025-26")
+
+        defense_stats._defense_stats_cache = None
+        with patch("src.defense_stats.nba_api_call") as mock_call:
+            second = fetch_team_defense_stats("2025-26")
+
+        mock_call.assert_not_called()
+        assert second == first
+
+    def test_empty_result_set_returns_empty(self):
+        """Test a result set with no rows yields an empty mapping."""
+        endpoint = MagicMock()
+        endpoint.get_dict.return_value = {"resultSets": [{"headers": ["TEAM_ID"], "rowSet": []}]}
+        with patch("src.defense_stats.nba_api_call", return_value=endpoint):
+            assert fetch_team_defense_stats("2025-26") == {}
+
+    def test_endpoint_failure_returns_empty(self):
+        """Test exhausted retries yield an empty mapping."""
+        with patch("src.defense_stats.nba_api_call", return_value=None):
+            assert fetch_team_defense_stats("2025-26") == {}
+
+
+class TestGetDefenseFactor:
+    """Tests for get_defense_factor lookups."""
+
+    @pytest.fixture(autouse=True)
+    def loaded_stats(self):
+        rows = [
+            _team_row(1610612747, "Los Angeles Lakers", 120.0),
+            _team_row(1610612738, "Boston Celtics", 100.0),
+        ]
+        endpoint = MagicMock()
+        endpoint.get_dict.return_value = {"resultSets": [_result_set(rows)]}
+        with patch("src.defense_stats.nba_api_call", return_value=endpoint):
+            return fetch_team_defense_stats("2025-26")
+
+    def test_single_lookup_matches_stats(self, loaded_stats):
+        assert get_defense_factor(1610612747) == loaded_stats[1610612747].defense_factor
+
+    def test_unknown_team_defaults_to_neutral(self):
+        assert get_defense_factor(42) == 1.0
+
+
+class TestConcurrentFetch:
+    """Tests for thread-safety of fetch_team_defense_stats."""
+
+    def test_concurrent_callers_share_one_fetch(self):
+        rows = [_team_row(1610612747, "Los Angeles Lakers", 110.0)]
+        endpoint = MagicMock()
+        endpoint.get_dict.return_value = {"resultSets": [_result_set(rows)]}
+
+        with patch("src.defense_stats.nba_api_call", return_value=endpoint) as mock_call:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(lambda _: fetch_team_defense_stats("2025-26"), range(8)))
+
+        mock_call.assert_called_once()
+        assert all(result is results[0] for result in results)
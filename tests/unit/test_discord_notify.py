@@ -1,106 +1,102 @@
 """Tests for Discord notification functions."""
 
+from dataclasses import replace
 from datetime import datetime
+from itertools import cycle
+from unittest.mock import MagicMock, patch
 from zoneinfo import ZoneInfo
 
 import pytest
+from discord_webhook import DiscordEmbed
 
 from src.discord_notify import (
+    MAX_EMBED_CHARS_PER_MESSAGE,
+    MAX_EMBEDS_PER_MESSAGE,
+    _batch_embeds,
     _build_injuries_embed,
     _build_picks_embed,
+    _classify_matchup,
     _format_detailed_pick,
-    _get_matchup_emoji,
     _get_risk_emoji,
     _get_trend_emoji,
+    post_to_discord,
 )
-from src.picker import PlayerRecommendation
 from src.session import InjuredPlayer
 
 
-class TestGetMatchupEmoji:
-    """Tests for _get_matchup_emoji function."""
+class TestClassifyMatchup:
+    """Tests for _classify_matchup function."""
 
-    def test_great_matchup(self):
-        """Test great matchup emoji (weak defense)."""
-        assert _get_matchup_emoji(1.15, 1.0) == "🟢"
-
-    def test_neutral_matchup(self):
-        """Test neutral matchup emoji."""
-        assert _get_matchup_emoji(1.0, 1.0) == "🟡"
-
-    def test_tough_matchup(self):
-        """Test tough matchup emoji."""
-        assert _get_matchup_emoji(0.95, 0.98) == "🟠"
-
-    def test_very_tough_matchup(self):
-        """Test very tough matchup emoji (elite defense + defender)."""
-        assert _get_matchup_emoji(0.90, 0.85) == "🔴"
+    @pytest.mark.parametrize(
+        ("defense_factor", "defender_factor", "expected"),
+        [
+            pytest.param(1.15, 1.0, ("🟢", "Weak defense"), id="weak"),
+            pytest.param(1.0, 1.0, ("🟡", "Average defense"), id="average"),
+            pytest.param(0.95, 0.98, ("🟠", "Tough defense"), id="tough"),
+            pytest.param(0.90, 0.85, ("🔴", "Very tough defense"), id="elite-defense-and-defender"),
+        ],
+    )
+    def test_matchup_tier(self, defense_factor, defender_factor, expected):
+        """Test the combined defense factor maps to the right tier."""
+        assert _classify_matchup(defense_factor * defender_factor) == expected
 
 
 class TestGetTrendEmoji:
     """Tests for _get_trend_emoji function."""
 
-    def test_hot_trend(self):
-        """Test hot trend emoji."""
-        assert _get_trend_emoji("hot") == "🔥"
-
-    def test_cold_trend(self):
-        """Test cold trend emoji."""
-        assert _get_trend_emoji("cold") == "❄️"
-
-    def test_stable_trend(self):
-        """Test stable trend returns empty string."""
-        assert _get_trend_emoji("stable") == ""
+    @pytest.mark.parametrize(
+        ("direction", "expected"),
+        [
+            pytest.param("hot", "🔥", id="hot"),
+            pytest.param("cold", "❄️", id="cold"),
+            pytest.param("stable", "", id="stable"),
+        ],
+    )
+    def test_trend_emoji(self, direction, expected):
+        """Test each form direction's emoji (stable has none)."""
+        assert _get_trend_emoji(direction) == expected
 
 
 class TestGetRiskEmoji:
     """Tests for _get_risk_emoji function."""
 
-    def test_out_risk(self):
-        """Test OUT player emoji."""
-        assert _get_risk_emoji(1.0) == "🚫"
-
-    def test_high_risk(self):
-        """Test high risk (doubtful) emoji."""
-        assert _get_risk_emoji(0.75) == "⛔"
-        assert _get_risk_emoji(0.5) == "⛔"
-
-    def test_moderate_risk(self):
-        """Test moderate risk (questionable) emoji."""
-        assert _get_risk_emoji(0.4) == "⚠️"
-        assert _get_risk_emoji(0.1) == "⚠️"
-
-    def test_no_risk(self):
-        """Test healthy player returns empty string."""
-        assert _get_risk_emoji(0.0) == ""
+    @pytest.mark.parametrize(
+        ("dnp_risk", "expected"),
+        [
+            pytest.param(1.0, "🚫", id="out"),
+            pytest.param(0.75, "⛔", id="doubtful"),
+            pytest.param(0.5, "⛔", id="high-risk-boundary"),
+            pytest.param(0.4, "⚠️", id="questionable"),
+            pytest.param(0.1, "⚠️", id="probable"),
+            pytest.param(0.0, "", id="healthy"),
+        ],
+    )
+    def test_risk_emoji(self, dnp_risk, expected):
+        """Test each DNP risk tier's emoji (healthy has none)."""
+        assert _get_risk_emoji(dnp_risk) == expected
+
+
+@pytest.fixture(scope="module")
+def sample_rec(make_recommendation):
+    """Sample recommendation shared by the module (tests derive variants with replace)."""
+    return make_recommendation(
+        name="De'Aaron Fox",
+        team="SAC",
+        player_id=1628368,
+        opponent_team="UTA",
+        avg_ttfl=38.0,
+        weighted_avg=40.5,
+        trend_factor=1.08,
+        trend_direction="hot",
+        consistency_factor=0.92,
+        defense_factor=1.12,
+        adjusted_score=42.3,
+    )
 
 
 class TestFormatDetailedPick:
     """Tests for _format_detailed_pick function."""
 
-    @pytest.fixture
-    def sample_rec(self):
-        """Create a sample recommendation."""
-        return PlayerRecommendation(
-            name="De'Aaron Fox",
-            team="SAC",
-            player_id=1628368,
-            opponent_team="UTA",
-            avg_ttfl=38.0,
-            weighted_avg=40.5,
-            trend_factor=1.08,
-            trend_direction="hot",
-            consistency_factor=0.92,
-            defense_factor=1.12,
-            best_defender=None,
-            defender_factor=1.0,
-            adjusted_score=42.3,
-            injury_status=None,
-            dnp_risk=0.0,
-            is_locked=False,
-            games_played=10,
-        )
-
     def test_detailed_format_healthy(self, sample_rec):
         """Test detailed format for healthy player (no status line)."""
         result = _format_detailed_pick(11, sample_rec)
@@ -115,77 +111,97 @@ class TestFormatDetailedPick:
 
     def test_detailed_format_with_injury(self, sample_rec):
         """Test detailed format with injury."""
-        sample_rec.injury_status = "Questionable"
-        sample_rec.dnp_risk = 0.4
-        result = _format_detailed_pick(11, sample_rec)
+        rec = replace(sample_rec, injury_status="Questionable", dnp_risk=0.4)
+        result = _format_detailed_pick(11, rec)
         assert "Questionable" in result
         assert "40%" in result
 
+    def test_detailed_format_line_layout(self, sample_rec):
+        """Test the status line comes last and no blank lines are emitted."""
+        assert len(_format_detailed_pick(11, sample_rec).split("\n")) == 3
+
+        rec = replace(sample_rec, injury_status="Out", dnp_risk=1.0)
+        lines = _format_detailed_pick(11, rec).split("\n")
+        assert len(lines) == 4
+        assert lines[-1] == "🚫 OUT"
+
     def test_detailed_format_with_defender(self, sample_rec):
         """Test detailed format with elite defender."""
-        sample_rec.best_defender = "Rudy Gobert"
-        sample_rec.defender_factor = 0.88
-        sample_rec.defense_factor = 0.90
+        rec = replace(sample_rec, best_defender="Rudy Gobert", defender_factor=0.88, defense_factor=0.90)
         # Combined = 0.792, which is < 0.90 = "Very tough defense"
-        result = _format_detailed_pick(11, sample_rec)
+        result = _format_detailed_pick(11, rec)
         assert "Rudy Gobert" in result
         assert "Very tough defense" in result
 
     def test_detailed_format_cold_streak(self, sample_rec):
         """Test detailed format with cold streak."""
-        sample_rec.trend_direction = "cold"
-        sample_rec.trend_factor = 0.88
-        result = _format_detailed_pick(11, sample_rec)
+        rec = replace(sample_rec, trend_direction="cold", trend_factor=0.88)
+        result = _format_detailed_pick(11, rec)
         assert "❄️" in result
 
     def test_detailed_format_stable(self, sample_rec):
         """Test detailed format with stable form."""
-        sample_rec.trend_direction = "stable"
-        result = _format_detailed_pick(11, sample_rec)
+        rec = replace(sample_rec, trend_direction="stable")
+        result = _format_detailed_pick(11, rec)
         assert "➡️ Stable" in result
 
 
+# Per-player values that repeat along the sample ranking
+_TEAM_CYCLE = ("TM1", "TM2")
+_TREND_CYCLE = ((1.05, "hot"), (0.95, "cold"), (1.0, "stable"))
+_DEFENSE_CYCLE = (1.1, 1.0, 1.0, 1.0)
+
+
+@pytest.fixture(scope="module")
+def sample_recommendations(make_recommendation):
+    """Create sample recommendations list (shared by the module: read-only)."""
+    rows = zip(range(25), cycle(_TEAM_CYCLE), cycle(_TREND_CYCLE), cycle(_DEFENSE_CYCLE))
+    return [
+        make_recommendation(
+            name=f"Player {i+1}",
+            team=team,
+            player_id=1000 + i,
+            avg_ttfl=50.0 - i * 0.5,
+            weighted_avg=52.0 - i * 0.5,
+            trend_factor=trend_factor,
+            trend_direction=trend_direction,
+            consistency_factor=0.95,
+            defense_factor=defense_factor,
+            adjusted_score=55.0 - i,
+            injury_status="Questionable" if i == 5 else None,
+            dnp_risk=0.4 if i == 5 else 0.0,
+        )
+        for i, team, (trend_factor, trend_direction), defense_factor in rows
+    ]
+
+
+@pytest.fixture(scope="module")
+def first_picks_embed(sample_recommendations):
+    """Embed for picks 1-10 without game time, rendered once (read-only)."""
+    return _build_picks_embed(sample_recommendations, 1, 10, "2025-02-04")
+
+
+@pytest.fixture(scope="module")
+def second_picks_embed(sample_recommendations):
+    """Embed for picks 11-20 without game time, rendered once (read-only)."""
+    return _build_picks_embed(sample_recommendations, 11, 20, "2025-02-04")
+
+
 class TestBuildPicksEmbed:
     """Tests for _build_picks_embed function."""
 
-    @pytest.fixture
-    def sample_recommendations(self):
-        """Create sample recommendations list."""
-        recs = []
-        for i in range(25):
-            recs.append(PlayerRecommendation(
-                name=f"Player {i+1}",
-                team="TM1" if i % 2 == 0 else "TM2",
-                player_id=1000 + i,
-                opponent_team="OPP",
-                avg_ttfl=50.0 - i * 0.5,
-                weighted_avg=52.0 - i * 0.5,
-                trend_factor=1.05 if i % 3 == 0 else (0.95 if i % 3 == 1 else 1.0),
-                trend_direction="hot" if i % 3 == 0 else ("cold" if i % 3 == 1 else "stable"),
-                consistency_factor=0.95,
-                defense_factor=1.1 if i % 4 == 0 else 1.0,
-                best_defender=None,
-                defender_factor=1.0,
-                adjusted_score=55.0 - i,
-                injury_status="Questionable" if i == 5 else None,
-                dnp_risk=0.4 if i == 5 else 0.0,
-                is_locked=False,
-                games_played=10,
-            ))
-        return recs
-
-    def test_builds_first_embed(self, sample_recommendations):
+    def test_builds_first_embed(self, first_picks_embed):
         """Test building embed for picks 1-10."""
-        embed = _build_picks_embed(sample_recommendations, 1, 10, "2025-02-04")
+        embed = first_picks_embed
         assert embed is not None
         assert "TTFL 2025-02-04" in embed.title
         assert "Picks #1-10" in embed.title
         # Should have 10 fields (one per pick)
         assert len(embed.fields) == 10
 
-    def test_builds_second_embed(self, sample_recommendations):
+    def test_builds_second_embed(self, second_picks_embed):
         """Test building embed for picks 11-20."""
-        embed = _build_picks_embed(sample_recommendations, 11, 20, "2025-02-04")
+        embed = second_picks_embed
         assert embed is not None
         assert "Picks #11-20" in embed.title
         # No date in subsequent messages
@@ -205,11 +221,9 @@ class TestBuildPicksEmbed:
         assert len(embed.fields) == 5
         assert "Picks #21-25" in embed.title
 
-    def test_different_colors(self, sample_recommendations):
+    def test_different_colors(self, first_picks_embed, second_picks_embed):
         """Test that different ranges get different colors."""
-        embed1 = _build_picks_embed(sample_recommendations, 1, 10, "2025-02-04")
-        embed2 = _build_picks_embed(sample_recommendations, 11, 20, "2025-02-04")
-        assert embed1.color != embed2.color
+        assert first_picks_embed.color != second_picks_embed.color
 
     def test_first_embed_with_game_time(self, sample_recommendations):
         """Test first embed shows deadline when game time is provided."""
@@ -222,11 +236,10 @@ class TestBuildPicksEmbed:
         assert "01h00" in embed.description
         assert "Paris time" in embed.description
 
-    def test_first_embed_no_game_time(self, sample_recommendations):
+    def test_first_embed_no_game_time(self, first_picks_embed):
         """Test first embed without game time has no description."""
-        embed = _build_picks_embed(sample_recommendations, 1, 10, "2025-02-04")
-        assert embed is not None
-        assert embed.description is None
+        assert first_picks_embed is not None
+        assert first_picks_embed.description is None
 
     def test_second_embed_no_game_time(self, sample_recommendations):
         """Test second embed never shows game time."""
@@ -283,3 +296,131 @@ class TestBuildInjuriesEmbed:
         assert embed is not None
         assert len(embed.fields) == 1
         assert "Doubtful (1)" in embed.fields[0]["name"]
+
+    def test_skips_lower_risk_players(self):
+        """Test Questionable/Probable players are left out of the embed."""
+        injuries = [
+            InjuredPlayer("Luka Doncic", "DAL", "PHX", "Doubtful", 0.75),
+            InjuredPlayer("LeBron James", "LAL", "GSW", "Questionable", 0.5),
+            InjuredPlayer("Kevin Durant", "PHX", "DAL", "Probable", 0.1),
+        ]
+        embed = _build_injuries_embed(injuries, "2025-02-04")
+        assert len(embed.fields) == 1
+        assert "Doubtful (1)" in embed.fields[0]["name"]
+        assert "LeBron James" not in embed.fields[0]["value"]
+
+
+class TestPostToDiscord:
+    """Tests for post_to_discord with a mocked webhook."""
+
+    @pytest.fixture
+    def recommendations(self, make_recommendation):
+        """Create 15 recommendations (two pick batches)."""
+        return [
+            make_recommendation(name=f"Player {i+1}", player_id=1000 + i, adjusted_score=50.0 - i)
+            for i in range(15)
+        ]
+
+    @pytest.fixture
+    def mock_webhook(self):
+        """Patch DiscordWebhook and record embeds in send order."""
+        sent = []
+
+        def make_webhook(**kwargs):
+            webhook = MagicMock()
+            webhook.embeds = []
+            webhook.add_embed.side_effect = webhook.embeds.append
+
+            def execute(remove_embeds=False):
+                sent.append([embed.title for embed in webhook.embeds])
+                if remove_embeds:
+                    webhook.embeds.clear()
+                return MagicMock(status_code=200)
+
+            webhook.execute.side_effect = execute
+            return webhook
+
+        with patch("src.discord_notify.DiscordWebhook", side_effect=make_webhook):
+            yield sent
+
+    def test_requires_webhook_url(self, recommendations, monkeypatch):
+        """Test a missing webhook URL raises ValueError."""
+        monkeypatch.delenv("DISCORD_WEBHOOK_URL", raising=False)
+        monkeypatch.delenv("DISCORD_TTFL", raising=False)
+        with pytest.raises(ValueError):
+            post_to_discord(recommendations, "2025-02-04")
+
+    def test_sends_picks_then_injuries_in_order(self, recommendations, mock_webhook):
+        """Test pick batches are posted in rank order, injuries last."""
+        injuries = [InjuredPlayer("Stephen Curry", "GSW", "LAL", "Out", 1.0)]
+        result = post_to_discord(
+            recommendations, "2025-02-04", webhook_url="https://example.test/hook",
+            notable_injuries=injuries,
+        )
+
+        assert result is True
+        titles = [title for batch in mock_webhook for title in batch]
+        assert len(titles) == 3
+        assert "Picks #1-10" in titles[0]
+        assert "Picks #11-15" in titles[1]
+        assert "Notable Injuries" in titles[2]
+
+    def test_batches_embeds_into_one_message(self, recommendations, mock_webhook):
+        """Test small posts go out as a single webhook request."""
+        post_to_discord(recommendations, "2025-02-04", webhook_url="https://example.test/hook")
+        assert len(mock_webhook) == 1
+        assert len(mock_webhook[0]) == 2
+
+    def test_caps_at_fifty_picks(self, recommendations, mock_webhook):
+        """Test only the top 50 picks are posted, in batches of 10."""
+        many = recommendations * 4  # 60 picks
+        post_to_discord(many, "2025-02-04", webhook_url="https://example.test/hook")
+
+        titles = [title for batch in mock_webhook for title in batch]
+        assert len(titles) == 5
+        assert "Picks #41-50" in titles[-1]
+
+    def test_reuses_one_webhook_client(self, recommendations):
+        """Test a multi-message post builds a single DiscordWebhook."""
+        many = recommendations * 4  # 60 picks -> more than one message
+        with patch("src.discord_notify.DiscordWebhook") as mock_cls:
+            mock_cls.return_value.execute.return_value = MagicMock(status_code=200)
+            post_to_discord(many, "2025-02-04", webhook_url="https://example.test/hook")
+
+        mock_cls.assert_called_once()
+        mock_cls.return_value.execute.assert_called_with(remove_embeds=True)
+
+    def test_returns_false_on_http_error(self, recommendations):
+        """Test a non-200 response marks the post as failed."""
+        with patch("src.discord_notify.DiscordWebhook") as mock_cls:
+            mock_cls.return_value.execute.return_value = MagicMock(status_code=500)
+            result = post_to_discord(recommendations, "2025-02-04", webhook_url="https://example.test/hook")
+        assert result is False
+
+    def test_empty_recommendations_returns_false(self, mock_webhook):
+        """Test nothing is sent without recommendations."""
+        assert post_to_discord([], "2025-02-04", webhook_url="https://example.test/hook") is False
+        assert mock_webhook == []
+
+
+class TestBatchEmbeds:
+    """Tests for _batch_embeds packing."""
+
+    def test_respects_embed_count_limit(self):
+        """Test no message carries more than MAX_EMBEDS_PER_MESSAGE embeds."""
+        embeds = [DiscordEmbed(title=f"E{i}") for i in range(MAX_EMBEDS_PER_MESSAGE + 2)]
+        batches = _batch_embeds(embeds)
+        assert [len(b) for b in batches] == [MAX_EMBEDS_PER_MESSAGE, 2]
+
+    def test_respects_character_limit(self):
+        """Test embeds are split when their combined text exceeds Discord's limit."""
+        big = MAX_EMBED_CHARS_PER_MESSAGE // 2 + 1
+        embeds = [DiscordEmbed(title=f"E{i}", description="x" * big) for i in range(3)]
+        batches = _batch_embeds(embeds)
+        assert [len(b) for b in batches] == [1, 1, 1]
+
+    def test_preserves_order(self):
+        """Test packing keeps the original embed order."""
+        embeds = [DiscordEmbed(title=f"E{i}") for i in range(5)]
+        flattened = [e.title for batch in _batch_embeds(embeds) for e in batch]
+        assert flattened == ["E0", "E1", "E2", "E3", "E4"]
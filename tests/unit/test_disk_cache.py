@@ -0,0 +1,48 @@
+"""Tests for the on-disk cache."""
+
+import os
+import time
+
+from src import disk_cache
+
+
+class TestDiskCache:
+    """Tests for load/save/delete."""
+
+    def test_round_trip(self):
+        """Test a saved value loads back unchanged."""
+        disk_cache.save("defense_2025-26_2025-02-05", {1: 1.1, 2: 0.9})
+        assert disk_cache.load("defense_2025-26_2025-02-05") == {1: 1.1, 2: 0.9}
+
+    def test_missing_key_returns_none(self):
+        """Test a cache miss returns None."""
+        assert disk_cache.load("nothing_here") is None
+
+    def test_expired_entry_returns_none(self):
+        """Test entries older than max_age are ignored."""
+        disk_cache.save("old", [1, 2, 3])
+        path = disk_cache.cache_path("old")
+        an_hour_ago = time.time() - 3600
+        os.utime(path, (an_hour_ago, an_hour_ago))
+
+        assert disk_cache.load("old", max_age=60) is None
+        assert disk_cache.load("old", max_age=7200) == [1, 2, 3]
+
+    def test_corrupt_file_returns_none(self):
+        """Test an unreadable file is treated as a miss."""
+        path = disk_cache.cache_path("corrupt")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"not a pickle")
+        assert disk_cache.load("corrupt") is None
+
+    def test_delete_by_prefix(self):
+        """Test delete removes only matching keys."""
+        disk_cache.save("defense_a", 1)
+        disk_cache.save("defense_b", 2)
+        disk_cache.save("defenders_a", 3)
+
+        disk_cache.delete("defense_")
+
+        assert disk_cache.load("defense_a") is None
+        assert disk_cache.load("defense_b") is None
+        assert disk_cache.load("defenders_a") == 3
@@ -6,10 +6,12 @@ from src.form_analysis import (
     GAME_WEIGHTS,
     FormAnalysis,
     analyze_form,
+    analyze_form_batch,
     calculate_consistency_factor,
     calculate_form_score,
     calculate_trend_factor,
     calculate_weighted_average,
+    simple_form,
 )
 
 
@@ -207,6 +209,44 @@ class TestAnalyzeForm:
         assert result.trend_factor < 1.0
 
 
+class TestAnalyzeFormBatch:
+    """Tests for analyze_form_batch function."""
+
+    @pytest.fixture
+    def score_lists(self, sample_ttfl_scores, hot_streak_scores, cold_streak_scores, inconsistent_scores):
+        return [
+            sample_ttfl_scores,
+            hot_streak_scores,
+            cold_streak_scores,
+            inconsistent_scores,
+            list(range(50, 38, -1)),  # More games than weights
+            [30, 35],  # Too few games for trend/consistency
+            [0, 0, 0],  # Zero mean
+            [],
+        ]
+
+    def test_matches_scalar_analysis(self, score_lists):
+        """Test each row matches analyze_form on the same scores."""
+        for scores, batch in zip(score_lists, analyze_form_batch(score_lists)):
+            expected = analyze_form(scores)
+            assert batch.weighted_avg == pytest.approx(expected.weighted_avg)
+            assert batch.trend_factor == pytest.approx(expected.trend_factor)
+            assert batch.trend_direction == expected.trend_direction
+            assert batch.consistency_factor == pytest.approx(expected.consistency_factor)
+            assert batch.simple_avg == pytest.approx(expected.simple_avg)
+
+    def test_matches_scalar_helpers(self, score_lists):
+        """Test each row matches the calculate_* helpers on the same scores."""
+        for scores, batch in zip(score_lists, analyze_form_batch(score_lists)):
+            assert batch.weighted_avg == pytest.approx(calculate_weighted_average(scores))
+            assert (batch.trend_factor, batch.trend_direction) == pytest.approx(calculate_trend_factor(scores))
+            assert batch.consistency_factor == pytest.approx(calculate_consistency_factor(scores))
+
+    def test_empty_batch(self):
+        """Test an empty batch returns no results."""
+        assert analyze_form_batch([]) == []
+
+
 class TestCalculateFormScore:
     """Tests for calculate_form_score function."""
 
@@ -250,3 +290,16 @@ class TestCalculateFormScore:
 
         result = calculate_form_score(analysis)
         assert result == 45.0
+
+
+class TestSimpleForm:
+    """Tests for simple_form function."""
+
+    def test_neutral_factors(self):
+        """Test an average-only analysis has no trend or consistency adjustment."""
+        result = simple_form(32.5)
+        assert result.weighted_avg == 32.5
+        assert result.simple_avg == 32.5
+        assert result.trend_factor == 1.0
+        assert result.trend_direction == "stable"
+        assert result.consistency_factor == 1.0
@@ -1,10 +1,18 @@
 """Tests for injury functions."""
 
+from types import MappingProxyType
+from unittest.mock import patch
+
 import pytest
+import requests
+import responses
 
 from src.injuries import (
+    _fetch_page,
     _strip_suffix,
+    build_injury_index,
     get_dnp_risk,
+    get_injury_report,
     get_injury_status_display,
     match_player_injury,
     normalize_player_name,
@@ -16,61 +24,48 @@ from src.injuries import (
 class TestGetDnpRisk:
     """Tests for get_dnp_risk function."""
 
-    def test_out_status(self):
-        """Test OUT status returns 100% risk."""
-        assert get_dnp_risk("Out") == 1.0
-        assert get_dnp_risk("out") == 1.0
-        assert get_dnp_risk("OUT") == 1.0
-
-    def test_doubtful_status(self):
-        """Test Doubtful status returns 75% risk."""
-        assert get_dnp_risk("Doubtful") == 0.75
-        assert get_dnp_risk("doubtful") == 0.75
-
-    def test_questionable_status(self):
-        """Test Questionable status returns 40% risk."""
-        assert get_dnp_risk("Questionable") == 0.40
-        assert get_dnp_risk("questionable") == 0.40
-
-    def test_probable_status(self):
-        """Test Probable status returns 10% risk."""
-        assert get_dnp_risk("Probable") == 0.10
-        assert get_dnp_risk("probable") == 0.10
-
-    def test_available_status(self):
-        """Test Available status returns 0% risk."""
-        assert get_dnp_risk("Available") == 0.0
-        assert get_dnp_risk("available") == 0.0
-
-    def test_day_to_day_status(self):
-        """Test Day-to-Day status returns 30% risk."""
-        assert get_dnp_risk("Day-To-Day") == 0.30
-        assert get_dnp_risk("day-to-day") == 0.30
-
-    def test_gtd_status(self):
-        """Test GTD (Game-Time Decision) status returns 30% risk."""
-        assert get_dnp_risk("GTD") == 0.30
-        assert get_dnp_risk("gtd") == 0.30
-
-    def test_none_status(self):
-        """Test None status returns 0% risk."""
-        assert get_dnp_risk(None) == 0.0
-
-    def test_unknown_status(self):
-        """Test unknown status returns 0% risk."""
-        assert get_dnp_risk("Unknown") == 0.0
-        assert get_dnp_risk("Something else") == 0.0
-
-    def test_partial_match(self):
-        """Test partial matching of status strings."""
-        assert get_dnp_risk("Listed as Out") == 1.0
-        assert get_dnp_risk("Questionable - ankle") == 0.40
-        assert get_dnp_risk("Probable to play") == 0.10
-
-    def test_whitespace_handling(self):
-        """Test that whitespace is stripped."""
-        assert get_dnp_risk("  Out  ") == 1.0
-        assert get_dnp_risk(" Questionable ") == 0.40
+    @pytest.mark.parametrize(
+        ("status", "expected"),
+        [
+            # Exact statuses, any case
+            ("Out", 1.0),
+            ("out", 1.0),
+            ("OUT", 1.0),
+            ("Doubtful", 0.75),
+            ("doubtful", 0.75),
+            ("Questionable", 0.40),
+            ("questionable", 0.40),
+            ("Probable", 0.10),
+            ("probable", 0.10),
+            ("Available", 0.0),
+            ("available", 0.0),
+            ("Day-To-Day", 0.30),
+            ("day-to-day", 0.30),
+            ("GTD", 0.30),  # Game-time decision
+            ("gtd", 0.30),
+            # No or unknown status
+            (None, 0.0),
+            ("Unknown", 0.0),
+            ("Something else", 0.0),
+            # Partial matches
+            ("Listed as Out", 1.0),
+            ("Questionable - ankle", 0.40),
+            ("Probable to play", 0.10),
+            # The most specific status wins over a shorter substring
+            # ("without" contains "out", but "available" is the real status)
+            ("Available without restriction", 0.0),
+            ("Game time decision (out last game)", 0.30),
+            # Equally specific statuses: the table's order decides
+            ("Doubtful, probable by Friday", 0.75),
+            # Whitespace is stripped
+            ("  Out  ", 1.0),
+            (" Questionable ", 0.40),
+        ],
+        ids=repr,
+    )
+    def test_dnp_risk(self, status, expected):
+        """Test each status maps to its DNP probability."""
+        assert get_dnp_risk(status) == expected
 
 
 class TestGetInjuryStatusDisplay:
@@ -80,62 +75,62 @@ class TestGetInjuryStatusDisplay:
         """Test display for healthy player."""
         assert get_injury_status_display(None) == "✓"
 
-    def test_out_status(self):
-        """Test display for OUT player."""
-        result = get_injury_status_display("Out")
-        assert "Out" in result
-
-    def test_questionable_status(self):
-        """Test display for Questionable player."""
-        result = get_injury_status_display("Questionable")
-        assert "Questionable" in result
-
-    def test_probable_status(self):
-        """Test display for Probable player."""
-        result = get_injury_status_display("Probable")
-        assert "Probable" in result
+    @pytest.mark.parametrize("status", ["Out", "Questionable", "Probable"])
+    def test_status_shown(self, status):
+        """Test display for an injured player includes the status."""
+        assert status in get_injury_status_display(status)
 
 
 class TestNormalizePlayerName:
     """Tests for normalize_player_name function."""
 
-    def test_basic_name(self):
-        """Test basic name normalization."""
-        assert normalize_player_name("LeBron James") == "lebron james"
-
-    def test_accented_characters(self):
-        """Test removing accents."""
-        assert normalize_player_name("Nikola Jokić") == "nikola jokic"
-        assert normalize_player_name("José Alvarado") == "jose alvarado"
-        assert normalize_player_name("Luka Dončić") == "luka doncic"
-
-    def test_whitespace(self):
-        """Test whitespace handling."""
-        assert normalize_player_name("  LeBron  James  ") == "lebron james"
-
-    def test_case_insensitive(self):
-        """Test case is lowered."""
-        assert normalize_player_name("STEPHEN CURRY") == "stephen curry"
-        assert normalize_player_name("Kevin Durant") == "kevin durant"
-
-    def test_special_characters(self):
-        """Test handling of special characters."""
-        assert normalize_player_name("O.G. Anunoby") == "og anunoby"
-
-    def test_periods_stripped(self):
-        """Test periods are removed."""
-        assert normalize_player_name("Jr.") == "jr"
-        assert normalize_player_name("P.J. Washington") == "pj washington"
-
-    def test_hyphens_to_spaces(self):
-        """Test hyphens are replaced with spaces."""
-        assert normalize_player_name("Shai Gilgeous-Alexander") == "shai gilgeous alexander"
-        assert normalize_player_name("Day-To-Day") == "day to day"
-
-    def test_apostrophes_stripped(self):
-        """Test apostrophes are removed."""
-        assert normalize_player_name("De'Aaron Fox") == "deaaron fox"
-        assert normalize_player_name("De\u2019Aaron Fox") == "deaaron fox"
+    @pytest.mark.parametrize(
+        ("name", "expected"),
+        [
+            ("LeBron James", "lebron james"),
+            # Accents removed
+            ("Nikola Jokić", "nikola jokic"),
+            ("José Alvarado", "jose alvarado"),
+            ("Luka Dončić", "luka doncic"),
+            # Whitespace collapsed
+            ("  LeBron  James  ", "lebron james"),
+            # Case lowered
+            ("STEPHEN CURRY", "stephen curry"),
+            ("Kevin Durant", "kevin durant"),
+            # Periods stripped
+            ("O.G. Anunoby", "og anunoby"),
+            ("Jr.", "jr"),
+            ("P.J. Washington", "pj washington"),
+            # Hyphens become spaces
+            ("Shai Gilgeous-Alexander", "shai gilgeous alexander"),
+            ("Day-To-Day", "day to day"),
+            # Apostrophes stripped, straight or curly
+            ("De'Aaron Fox", "deaaron fox"),
+            ("De\u2019Aaron Fox", "deaaron fox"),
+        ],
+        ids=repr,
+    )
+    def test_normalize(self, name, expected):
+        """Test each name normalizes to its matching key."""
+        assert normalize_player_name(name) == expected
+
+
+class TestNameCaches:
+    """Tests for memoized name normalization."""
+
+    def test_repeated_calls_hit_cache(self):
+        """Test the same name is only normalized once."""
+        normalize_player_name("Luka Dončić")
+        normalize_player_name("Luka Dončić")
+        info = normalize_player_name.cache_info()
+        assert info.hits == 1
+        assert info.misses == 1
+
+    def test_each_test_starts_with_empty_caches(self):
+        """Test the conftest fixture clears results memoized by earlier tests."""
+        assert normalize_player_name.cache_info().currsize == 0
+        assert _strip_suffix.cache_info().currsize == 0
+        assert get_dnp_risk.cache_info().currsize == 0
 
 
 class TestStripSuffix:
@@ -167,106 +162,104 @@ class TestStripSuffix:
 class TestMatchPlayerInjury:
     """Tests for match_player_injury function."""
 
-    def test_exact_match(self, sample_injuries):
-        """Test exact name match."""
-        result = match_player_injury("LeBron James", sample_injuries)
-        assert result == "Questionable"
-
-    def test_case_insensitive_match(self, sample_injuries):
-        """Test case-insensitive matching."""
-        result = match_player_injury("lebron james", sample_injuries)
-        assert result == "Questionable"
-
-    def test_normalized_match(self):
-        """Test matching with accented characters."""
-        injuries = {"Nikola Jokić": "Out"}
-        result = match_player_injury("Nikola Jokic", injuries)
-        assert result == "Out"
-
-    def test_partial_match(self, sample_injuries):
-        """Test partial name matching."""
-        # Should match "LeBron James" with enough common parts
-        result = match_player_injury("James LeBron", sample_injuries)
-        assert result == "Questionable"
-
-    def test_no_match(self, sample_injuries):
-        """Test no match found."""
-        result = match_player_injury("Michael Jordan", sample_injuries)
-        assert result is None
-
-    def test_empty_injuries(self):
-        """Test with empty injuries dict."""
-        result = match_player_injury("LeBron James", {})
-        assert result is None
-
-    def test_single_name_match(self):
-        """Test that single names need at least 2 parts to match partially."""
-        injuries = {"James Harden": "Out"}
-        # "Harden" alone shouldn't match due to minimum parts requirement
-        result = match_player_injury("Harden", injuries)
-        # With only 1 part, partial matching requires len(player_parts) to be >= 2
-        # min(2, len(player_parts)) = min(2, 1) = 1, so it should match
-        assert result == "Out"
-
-    def test_suffix_mismatch(self):
-        """Test matching when one source has suffix and other doesn't."""
-        injuries = {"Jaren Jackson Jr.": "Out"}
-        result = match_player_injury("Jaren Jackson", injuries)
-        assert result == "Out"
-
-    def test_suffix_mismatch_reverse(self):
-        """Test matching when player has suffix but injury report doesn't."""
-        injuries = {"Jaren Jackson": "Out"}
-        result = match_player_injury("Jaren Jackson Jr.", injuries)
-        assert result == "Out"
-
-    def test_period_mismatch(self):
-        """Test matching O.G. vs OG."""
-        injuries = {"O.G. Anunoby": "Questionable"}
-        result = match_player_injury("OG Anunoby", injuries)
-        assert result == "Questionable"
-
-    def test_hyphen_mismatch(self):
-        """Test matching hyphenated vs non-hyphenated names."""
-        injuries = {"Shai Gilgeous-Alexander": "Day-To-Day"}
-        result = match_player_injury("Shai Gilgeous Alexander", injuries)
-        assert result == "Day-To-Day"
+    @pytest.mark.parametrize(
+        ("query", "expected"),
+        [
+            pytest.param("LeBron James", "Questionable", id="exact"),
+            pytest.param("lebron james", "Questionable", id="case-insensitive"),
+            # Enough common name parts match "LeBron James"
+            pytest.param("James LeBron", "Questionable", id="partial"),
+            pytest.param("Michael Jordan", None, id="no-match"),
+        ],
+    )
+    def test_match(self, sample_injuries, query, expected):
+        """Test matching against the sample injury report."""
+        assert match_player_injury(query, sample_injuries) == expected
+
+    @pytest.mark.parametrize(
+        ("query", "injuries", "expected"),
+        [
+            pytest.param("Nikola Jokic", {"Nikola Jokić": "Out"}, "Out", id="accents"),
+            pytest.param("LeBron James", {}, None, id="empty-report"),
+            # With only 1 part, partial matching needs min(2, 1) = 1 common part
+            pytest.param("Harden", {"James Harden": "Out"}, "Out", id="single-name"),
+            pytest.param("Jaren Jackson", {"Jaren Jackson Jr.": "Out"}, "Out", id="suffix-in-report"),
+            pytest.param("Jaren Jackson Jr.", {"Jaren Jackson": "Out"}, "Out", id="suffix-in-query"),
+            pytest.param("OG Anunoby", {"O.G. Anunoby": "Questionable"}, "Questionable", id="periods"),
+            pytest.param(
+                "Shai Gilgeous Alexander",
+                {"Shai Gilgeous-Alexander": "Day-To-Day"},
+                "Day-To-Day",
+                id="hyphen",
+            ),
+        ],
+    )
+    def test_name_variants(self, query, injuries, expected):
+        """Test matching when the two sources spell the name differently."""
+        assert match_player_injury(query, injuries) == expected
+
+    def test_empty_injuries_skip_normalization(self):
+        """Test an empty report short-circuits before any name work."""
+        with patch("src.injuries.normalize_player_name") as mock_normalize:
+            assert match_player_injury("LeBron James", {}) is None
+            assert match_player_injury("LeBron James", build_injury_index({})) is None
+
+        mock_normalize.assert_not_called()
+
+
+class TestBuildInjuryIndex:
+    """Tests for build_injury_index function."""
+
+    def test_index_matches_same_as_dict(self, sample_injuries):
+        """Test lookups through a prebuilt index match the dict form."""
+        index = build_injury_index(sample_injuries)
+        for name in ["LeBron James", "lebron james", "James LeBron", "Luka Dončić", "Michael Jordan"]:
+            assert match_player_injury(name, index) == match_player_injury(name, sample_injuries)
+
+    def test_first_player_wins_on_collision(self):
+        """Test the earliest report entry wins when two names normalize alike."""
+        injuries = {"Gary Trent Jr.": "Out", "Gary Trent Sr.": "Probable"}
+        index = build_injury_index(injuries)
+        assert match_player_injury("Gary Trent", index) == "Out"
+
+    def test_repeat_lookups_use_index_cache(self, sample_injuries):
+        """Test a repeated lookup skips normalization entirely."""
+        index = build_injury_index(sample_injuries)
+        assert match_player_injury("James LeBron", index) == match_player_injury("James LeBron", sample_injuries)
+
+        with patch("src.injuries.normalize_player_name") as mock_normalize:
+            status = match_player_injury("James LeBron", index)
+
+        mock_normalize.assert_not_called()
+        assert status == index._match_cache["James LeBron"]
+
+
+@pytest.fixture(scope="session")
+def espn_injury_parsed(espn_injury_html):
+    """ESPN injury table parsed once for the whole session."""
+    return MappingProxyType(parse_espn_injuries(espn_injury_html))
+
+
+@pytest.fixture(scope="session")
+def cbs_injury_parsed(cbs_injury_html):
+    """CBS Sports injury table parsed once for the whole session."""
+    return MappingProxyType(parse_cbssports_injuries(cbs_injury_html))
 
 
 class TestParseEspnInjuries:
     """Tests for parse_espn_injuries function."""
 
-    def test_parse_table_format(self):
+    @pytest.mark.parametrize(
+        ("player", "status"),
+        [("LeBron James", "Questionable"), ("Stephen Curry", "Out")],
+    )
+    def test_parse_table_format(self, espn_injury_parsed, player, status):
         """Test parsing ESPN injury table HTML."""
-        # ESPN columns: NAME | POS | EST. RETURN DATE | STATUS | COMMENT
-        html = """
-        <html>
-        <body>
-        <table>
-            <tr>
-                <td>LeBron James</td>
-                <td>PF</td>
-                <td>Feb 10</td>
-                <td>Questionable</td>
-                <td>Ankle soreness</td>
-            </tr>
-            <tr>
-                <td>Stephen Curry</td>
-                <td>PG</td>
-                <td>Feb 15</td>
-                <td>Out</td>
-                <td>Knee injury</td>
-            </tr>
-        </table>
-        </body>
-        </html>
-        """
-        result = parse_espn_injuries(html)
+        assert espn_injury_parsed[player] == status
 
-        assert "LeBron James" in result
-        assert result["LeBron James"] == "Questionable"
-        assert "Stephen Curry" in result
-        assert result["Stephen Curry"] == "Out"
+    def test_parse_only_table_players(self, espn_injury_parsed):
+        """Test only the injured players' rows are kept."""
+        assert len(espn_injury_parsed) == 2
 
     def test_parse_empty_html(self):
         """Test parsing empty HTML."""
@@ -283,37 +276,17 @@ class TestParseEspnInjuries:
 class TestParseCbssportsInjuries:
     """Tests for parse_cbssports_injuries function."""
 
-    def test_parse_table_format(self):
+    @pytest.mark.parametrize(
+        ("player", "status"),
+        [("Kevin Durant", "Probable"), ("Giannis Antetokounmpo", "Day-To-Day")],
+    )
+    def test_parse_table_format(self, cbs_injury_parsed, player, status):
         """Test parsing CBS Sports injury table HTML."""
-        # CBS columns: NAME | POS | DATE | INJURY | STATUS
-        html = """
-        <html>
-        <body>
-        <table>
-            <tr class="TableBase-row">
-                <td><a href="/player">Kevin Durant</a></td>
-                <td>SF</td>
-                <td>Feb 10</td>
-                <td>Knee</td>
-                <td>Probable</td>
-            </tr>
-            <tr class="TableBase-bodyRow">
-                <td><a href="/player">Giannis Antetokounmpo</a></td>
-                <td>PF</td>
-                <td>Feb 12</td>
-                <td>Back</td>
-                <td>Day-To-Day</td>
-            </tr>
-        </table>
-        </body>
-        </html>
-        """
-        result = parse_cbssports_injuries(html)
+        assert cbs_injury_parsed[player] == status
 
-        assert "Kevin Durant" in result
-        assert result["Kevin Durant"] == "Probable"
-        assert "Giannis Antetokounmpo" in result
-        assert result["Giannis Antetokounmpo"] == "Day-To-Day"
+    def test_parse_only_table_players(self, cbs_injury_parsed):
+        """Test only the injured players' rows are kept."""
+        assert len(cbs_injury_parsed) == 2
 
     def test_parse_empty_html(self):
         """Test parsing empty HTML."""
@@ -337,3 +310,65 @@ class TestParseCbssportsInjuries:
         """
         result = parse_cbssports_injuries(html)
         assert result == {}
+
+
+class TestGetInjuryReport:
+    """Tests for get_injury_report merging."""
+
+    @patch("src.injuries.fetch_cbssports_injuries")
+    @patch("src.injuries.fetch_espn_injuries")
+    def test_espn_takes_precedence(self, mock_espn, mock_cbs):
+        """Test CBS only fills in players ESPN does not list."""
+        mock_espn.return_value = {"LeBron James": "Questionable"}
+        mock_cbs.return_value = {"LeBron James": "Out", "Stephen Curry": "Doubtful"}
+
+        result = get_injury_report()
+
+        assert result == {"LeBron James": "Questionable", "Stephen Curry": "Doubtful"}
+
+    @patch("src.injuries.fetch_cbssports_injuries")
+    @patch("src.injuries.fetch_espn_injuries")
+    def test_one_source_down(self, mock_espn, mock_cbs):
+        """Test a failing source (empty dict) does not affect the other."""
+        mock_espn.return_value = {}
+        mock_cbs.return_value = {"Stephen Curry": "Out"}
+
+        assert get_injury_report() == {"Stephen Curry": "Out"}
+
+
+class TestFetchPage:
+    """Tests for the cached/conditional injury page fetch."""
+
+    URL = "https://www.espn.com/nba/injuries"
+
+    @responses.activate
+    def test_fresh_copy_skips_request(self):
+        """Test a recently fetched page is served from disk."""
+        responses.add(responses.GET, self.URL, body="<table></table>", headers={"ETag": '"v1"'})
+
+        first = _fetch_page(self.URL, {}, "injuries_test")
+        second = _fetch_page(self.URL, {}, "injuries_test")
+
+        assert first == second == "<table></table>"
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_not_modified_reuses_cached_body(self):
+        """Test a stale copy is revalidated and reused on 304."""
+        responses.add(responses.GET, self.URL, body="<table>v1</table>", headers={"ETag": '"v1"'})
+        responses.add(responses.GET, self.URL, status=304)
+
+        _fetch_page(self.URL, {}, "injuries_test")
+        with patch("src.injuries.INJURY_PAGE_MAX_AGE", 0):
+            html = _fetch_page(self.URL, {}, "injuries_test")
+
+        assert html == "<table>v1</table>"
+        assert responses.calls[1].request.headers["If-None-Match"] == '"v1"'
+
+    @responses.activate
+    def test_http_error_raises(self):
+        """Test error statuses propagate to the caller."""
+        responses.add(responses.GET, self.URL, status=503)
+
+        with pytest.raises(requests.HTTPError):
+            _fetch_page(self.URL, {}, "injuries_test")
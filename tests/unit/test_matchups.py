@@ -0,0 +1,149 @@
+"""Tests for best defender matchup analysis."""
+
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+
+from src import matchups
+from src.matchups import (
+    AVERAGE_DEFENDER_FACTOR,
+    ELITE_DEFENDER_FACTOR,
+    _calculate_composite_scores,
+    _stat_column,
+    fetch_defender_stats,
+    get_defender_factor,
+)
+
+
+def _result_set(rows):
+    """Build a raw nba_api result set from row dicts."""
+    headers = list(rows[0])
+    return {"headers": headers, "rowSet": [[row[h] for h in headers] for row in rows]}
+
+
+def _player_row(player_id, team_id, def_rating=110.0, def_ws=1.0, gp=50, stl=1.0, blk=0.5, minutes=30.0):
+    """Build a LeagueDashPlayerStats (Defense) row."""
+    return {
+        "PLAYER_ID": player_id,
+        "PLAYER_NAME": f"Player {player_id}",
+        "TEAM_ID": team_id,
+        "MIN": minutes,
+        "DEF_RATING": def_rating,
+        "DEF_WS": def_ws,
+        "GP": gp,
+        "STL": stl,
+        "BLK": blk,
+    }
+
+
+@pytest.fixture(autouse=True)
+def clear_defender_cache():
+    """Reset the module-level cache around each test."""
+    matchups.clear_cache()
+    yield
+    matchups.clear_cache()
+
+
+class TestCalculateCompositeScores:
+    """Tests for _calculate_composite_scores."""
+
+    def test_composite_formula(self):
+        """Test the weighted drtg / dws / stl+blk blend."""
+        scores = _calculate_composite_scores(
+            pd.Series([105.0]), pd.Series([2.5]), pd.Series([50.0]), pd.Series([1.5]), pd.Series([0.0])
+        )
+        # drtg_score = 0.75, dws_score = 0.5, stl_blk_score = 0.5
+        assert scores[0] == pytest.approx(0.75 * 0.4 + 0.5 * 0.3 + 0.5 * 0.3)
+
+    def test_missing_values_use_defaults(self):
+        """Test NaN/zero stats fall back to neutral defaults."""
+        df = pd.DataFrame([_player_row(1, 1, def_rating=None, def_ws=None, gp=0, stl=None, blk=None)])
+        scores = _calculate_composite_scores(
+            _stat_column(df, "DEF_RATING", 110),
+            _stat_column(df, "DEF_WS", 0),
+            _stat_column(df, "GP", 1),
+            _stat_column(df, "STL", 0),
+            _stat_column(df, "BLK", 0),
+        )
+        # DEF_RATING defaults to 110 -> 0.5; everything else contributes 0
+        assert scores[0] == pytest.approx(0.5 * 0.4)
+
+
+class TestFetchDefenderStats:
+    """Tests for fetch_defender_stats with a mocked endpoint."""
+
+    def _mock_endpoint(self, rows):
+        endpoint = MagicMock()
+        endpoint.get_dict.return_value = {"resultSets": [_result_set(rows)]}
+        return endpoint
+
+    def test_ranks_and_groups_defenders(self):
+        """Test defenders are ranked league-wide and grouped by team."""
+        rows = [
+            _player_row(1, 1610612747, def_rating=115.0),
+            _player_row(2, 1610612738, def_rating=100.0),
+            _player_row(3, 1610612747, def_rating=105.0),
+        ]
+        with patch("src.matchups.nba_api_call", return_value=self._mock_endpoint(rows)):
+            team_defenders, all_defenders = fetch_defender_stats("2025-26")
+
+        assert [d.player_id for d in all_defenders] == [2, 3, 1]
+        assert [d.league_rank for d in all_defenders] == [1, 2, 3]
+        assert [d.player_id for d in team_defenders[1610612747]] == [3, 1]
+        assert all_defenders[0].team_abbrev == "BOS"
+
+    def test_unknown_team_id_abbrev_falls_back_to_id(self):
+        """Test defenders on unknown teams keep the raw ID as abbreviation."""
+        rows = [_player_row(1, 42)]
+        with patch("src.matchups.nba_api_call", return_value=self._mock_endpoint(rows)):
+            _, all_defenders = fetch_defender_stats("2025-26")
+
+        assert all_defenders[0].team_abbrev == "42"
+
+    def test_skips_low_minutes(self):
+        """Test players under 15 minutes per game are excluded."""
+        rows = [_player_row(1, 1610612747), _player_row(2, 1610612747, minutes=10.0)]
+        with patch("src.matchups.nba_api_call", return_value=self._mock_endpoint(rows)):
+            _, all_defenders = fetch_defender_stats("2025-26")
+
+        assert [d.player_id for d in all_defenders] == [1]
+
+    def test_reuses_disk_cache_across_runs(self):
+        """Test a fresh process (empty memory cache) is served from disk."""
+        rows = [_player_row(1, 1610612747), _player_row(2, 1610612738)]
+        with patch("src.matchups.nba_api_call", return_value=self._mock_endpoint(rows)):
+            first = fetch_defender_stats("2025-26")
+
+        matchups._defender_stats_cache = None
+        matchups._defender_rankings_cache = None
+        with patch("src.matchups.nba_api_call") as mock_call:
+            second = fetch_defender_stats("2025-26")
+
+        mock_call.assert_not_called()
+        assert second == first
+        # Team lists still share objects with the league-wide ranking
+        team_defenders, all_defenders = second
+        assert any(d is all_defenders[0] for d in team_defenders[all_defenders[0].team_id])
+
+    def test_endpoint_failure_returns_empty(self):
+        """Test exhausted retries yield empty results."""
+        with patch("src.matchups.nba_api_call", return_value=None):
+            assert fetch_defender_stats("2025-26") == ({}, [])
+
+
+class TestGetDefenderFactor:
+    """Tests for get_defender_factor."""
+
+    def test_elite_defender_penalty(self):
+        """Test a top-20 defender applies the elite factor."""
+        rows = [_player_row(1, 1610612738, def_rating=100.0)]
+        endpoint = MagicMock()
+        endpoint.get_dict.return_value = {"resultSets": [_result_set(rows)]}
+        with patch("src.matchups.nba_api_call", return_value=endpoint):
+            assert get_defender_factor(1610612738) == (ELITE_DEFENDER_FACTOR, "Player 1")
+
+    def test_unknown_team_is_neutral(self):
+        """Test a team without ranked defenders has no penalty."""
+        with patch("src.matchups.nba_api_call", return_value=None):
+            assert get_defender_factor(42) == (AVERAGE_DEFENDER_FACTOR, None)
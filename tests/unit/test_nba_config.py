@@ -1,139 +1,290 @@
 """Tests for NBA API retry wrapper."""
 
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
 import pytest
 from requests.exceptions import ConnectionError, ReadTimeout
+from tenacity import wait_none
 
-from src.nba_config import nba_api_call
+from src import nba_config
+from src.nba_config import nba_api_call, rate_limit
 
 
-class FakeEndpoint:
-    """Mock NBA API endpoint class."""
+def make_endpoint(error: Exception | None = None, failures: float = float("inf")) -> type:
+    """
+    Build a stub NBA API endpoint class.
 
-    def __init__(self, **kwargs):
-        self.kwargs = kwargs
+    Instantiating it raises `error` on the first `failures` calls (every call
+    by default), then records its kwargs. Each class counts its own calls.
+    """
 
-    def get_data_frames(self):
-        return [MagicMock()]
+    class StubEndpoint:
+        calls = 0
 
+        def __init__(self, **kwargs):
+            StubEndpoint.calls += 1
+            if error is not None and StubEndpoint.calls <= failures:
+                raise error
+            self.kwargs = kwargs
 
-class FakeEndpointTimeout(FakeEndpoint):
-    """Endpoint that raises ReadTimeout on first N calls, then succeeds."""
+    return StubEndpoint
 
-    call_count = 0
-    fail_count = 1
 
-    def __init__(self, **kwargs):
-        FakeEndpointTimeout.call_count += 1
-        if FakeEndpointTimeout.call_count <= FakeEndpointTimeout.fail_count:
-            raise ReadTimeout("Connection timed out")
-        super().__init__(**kwargs)
+FakeEndpoint = make_endpoint()
 
 
-class FakeEndpointAlwaysFails:
-    """Endpoint that always raises ReadTimeout."""
-
-    def __init__(self, **kwargs):
-        raise ReadTimeout("Connection timed out")
-
-
-class FakeEndpointConnectionError:
-    """Endpoint that always raises ConnectionError."""
-
-    def __init__(self, **kwargs):
-        raise ConnectionError("Connection refused")
-
-
-@patch("src.nba_config.NBA_RATE_LIMIT_SLEEP", 0)
-@patch("src.nba_config.rate_limit")
 class TestNbaApiCall:
     """Tests for nba_api_call wrapper."""
 
-    def test_successful_call(self, mock_rate_limit):
+    @pytest.fixture(autouse=True)
+    def rate_limit_calls(self, monkeypatch):
+        """Make calls instant (no rate limit, no retry backoff) and count rate limit calls."""
+        calls = []
+        monkeypatch.setattr(nba_config, "_interval", 0.0)
+        monkeypatch.setattr(nba_config, "rate_limit", lambda: calls.append(None))
+        monkeypatch.setattr(nba_config, "wait_exponential", lambda **kwargs: wait_none())
+        return calls
+
+    def test_successful_call(self, rate_limit_calls):
         result = nba_api_call(FakeEndpoint, critical=True, game_date="01/01/2025")
 
         assert result is not None
         assert isinstance(result, FakeEndpoint)
         assert result.kwargs["game_date"] == "01/01/2025"
-        mock_rate_limit.assert_called_once()
+        assert len(rate_limit_calls) == 1
 
-    def test_timeout_injected(self, mock_rate_limit):
+    def test_timeout_injected(self):
         result = nba_api_call(FakeEndpoint, critical=True, season="2024-25")
 
         assert result.kwargs["timeout"] == 60
 
-    @patch("src.nba_config.NBA_TIMEOUT", 120)
-    def test_custom_timeout(self, mock_rate_limit):
+    def test_custom_timeout(self, monkeypatch):
+        monkeypatch.setattr(nba_config, "NBA_TIMEOUT", 120)
         result = nba_api_call(FakeEndpoint, critical=True)
 
         assert result.kwargs["timeout"] == 120
 
-    def test_timeout_not_overridden(self, mock_rate_limit):
+    def test_timeout_not_overridden(self):
         result = nba_api_call(FakeEndpoint, critical=True, timeout=30)
 
         assert result.kwargs["timeout"] == 30
 
-    @patch("src.nba_config.NBA_PROXY", "http://proxy:8080")
-    def test_proxy_injected(self, mock_rate_limit):
+    def test_proxy_injected(self, monkeypatch):
+        monkeypatch.setattr(nba_config, "NBA_PROXY", "http://proxy:8080")
         result = nba_api_call(FakeEndpoint, critical=True)
 
         assert result.kwargs["proxy"] == "http://proxy:8080"
 
-    @patch("src.nba_config.NBA_PROXY", None)
-    def test_no_proxy_when_not_set(self, mock_rate_limit):
+    def test_no_proxy_when_not_set(self, monkeypatch):
+        monkeypatch.setattr(nba_config, "NBA_PROXY", None)
         result = nba_api_call(FakeEndpoint, critical=True)
 
         assert "proxy" not in result.kwargs
 
-    @patch("src.nba_config.NBA_MAX_RETRIES", 3)
-    def test_retry_on_timeout_then_succeed(self, mock_rate_limit):
-        FakeEndpointTimeout.call_count = 0
-        FakeEndpointTimeout.fail_count = 1
+    def test_retry_on_timeout_then_succeed(self, monkeypatch):
+        monkeypatch.setattr(nba_config, "NBA_MAX_RETRIES", 3)
+        endpoint = make_endpoint(ReadTimeout("Connection timed out"), failures=1)
 
-        result = nba_api_call(FakeEndpointTimeout, critical=True)
+        result = nba_api_call(endpoint, critical=True)
 
         assert result is not None
-        assert FakeEndpointTimeout.call_count == 2
+        assert endpoint.calls == 2
 
-    @patch("src.nba_config.NBA_MAX_RETRIES", 3)
-    def test_critical_raises_after_retries_exhausted(self, mock_rate_limit):
+    def test_critical_raises_after_retries_exhausted(self, monkeypatch):
+        monkeypatch.setattr(nba_config, "NBA_MAX_RETRIES", 3)
         with pytest.raises(ReadTimeout):
-            nba_api_call(FakeEndpointAlwaysFails, critical=True)
+            nba_api_call(make_endpoint(ReadTimeout("Connection timed out")), critical=True)
 
-    @patch("src.nba_config.NBA_MAX_RETRIES", 3)
-    def test_non_critical_returns_none_after_retries_exhausted(self, mock_rate_limit):
-        result = nba_api_call(FakeEndpointAlwaysFails, critical=False)
+    def test_non_critical_returns_none_after_retries_exhausted(self, monkeypatch):
+        monkeypatch.setattr(nba_config, "NBA_MAX_RETRIES", 3)
+        result = nba_api_call(make_endpoint(ReadTimeout("Connection timed out")), critical=False)
 
         assert result is None
 
-    @patch("src.nba_config.NBA_MAX_RETRIES", 3)
-    def test_non_critical_connection_error_returns_none(self, mock_rate_limit):
-        result = nba_api_call(FakeEndpointConnectionError, critical=False)
+    def test_non_critical_connection_error_returns_none(self, monkeypatch):
+        monkeypatch.setattr(nba_config, "NBA_MAX_RETRIES", 3)
+        result = nba_api_call(make_endpoint(ConnectionError("Connection refused")), critical=False)
 
         assert result is None
 
-    @patch("src.nba_config.NBA_MAX_RETRIES", 2)
-    def test_retry_on_timeout_then_succeed_with_two_retries(self, mock_rate_limit):
-        FakeEndpointTimeout.call_count = 0
-        FakeEndpointTimeout.fail_count = 1
+    def test_retry_on_timeout_then_succeed_with_two_retries(self, monkeypatch):
+        monkeypatch.setattr(nba_config, "NBA_MAX_RETRIES", 2)
+        endpoint = make_endpoint(ReadTimeout("Connection timed out"), failures=1)
 
-        result = nba_api_call(FakeEndpointTimeout, critical=True)
+        result = nba_api_call(endpoint, critical=True)
 
         assert result is not None
 
-    def test_non_retryable_exception_propagates(self, mock_rate_limit):
-        class BadEndpoint:
-            def __init__(self, **kwargs):
-                raise ValueError("bad argument")
+    @pytest.mark.parametrize("critical", [True, False], ids=["critical", "non-critical"])
+    def test_non_retryable_exception_propagates(self, critical):
+        endpoint = make_endpoint(ValueError("bad argument"))
 
         with pytest.raises(ValueError, match="bad argument"):
-            nba_api_call(BadEndpoint, critical=True)
+            nba_api_call(endpoint, critical=critical)
 
-    def test_non_retryable_exception_propagates_non_critical(self, mock_rate_limit):
-        class BadEndpoint:
-            def __init__(self, **kwargs):
-                raise ValueError("bad argument")
+        assert endpoint.calls == 1
 
-        with pytest.raises(ValueError, match="bad argument"):
-            nba_api_call(BadEndpoint, critical=False)
+
+class _StubResponse:
+    """Raw NBA API response returned by the cached endpoint stub."""
+
+    def get_response(self):
+        return '{"resultSets": []}'
+
+
+def make_cached_endpoint() -> type:
+    """Build an endpoint stub that mimics nba_api's request/response split and counts its requests."""
+
+    class CachedEndpoint:
+        requests_made = 0
+
+        def __init__(self, get_request=True, **kwargs):
+            self.kwargs = kwargs
+            if get_request:
+                CachedEndpoint.requests_made += 1
+                self.nba_response = _StubResponse()
+                self.load_response()
+
+        def load_response(self):
+            self.raw = self.nba_response.get_response()
+
+    return CachedEndpoint
+
+
+class TestNbaApiCallResponseCache:
+    """Tests for the cache_ttl disk cache in nba_api_call."""
+
+    @pytest.fixture(autouse=True)
+    def rate_limit_calls(self, monkeypatch):
+        """Count rate limit calls instead of waiting."""
+        calls = []
+        monkeypatch.setattr(nba_config, "_interval", 0.0)
+        monkeypatch.setattr(nba_config, "rate_limit", lambda: calls.append(None))
+        return calls
+
+    def test_second_call_served_from_disk(self, rate_limit_calls):
+        endpoint = make_cached_endpoint()
+        nba_api_call(endpoint, cache_ttl=3600, team_id=1)
+        result = nba_api_call(endpoint, cache_ttl=3600, team_id=1)
+
+        assert endpoint.requests_made == 1
+        assert result.raw == '{"resultSets": []}'
+        assert len(rate_limit_calls) == 1
+
+    def test_different_params_not_shared(self):
+        endpoint = make_cached_endpoint()
+        nba_api_call(endpoint, cache_ttl=3600, team_id=1)
+        nba_api_call(endpoint, cache_ttl=3600, team_id=2)
+
+        assert endpoint.requests_made == 2
+
+    def test_no_cache_without_ttl(self):
+        endpoint = make_cached_endpoint()
+        nba_api_call(endpoint, team_id=1)
+        nba_api_call(endpoint, team_id=1)
+
+        assert endpoint.requests_made == 2
+
+
+@patch("src.nba_config._interval", 1.0)
+@patch("src.nba_config.time.sleep")
+class TestRateLimit:
+    """Tests for the interval-based rate limiter."""
+
+    def test_sleeps_remaining_interval(self, mock_sleep, monkeypatch):
+        monkeypatch.setattr(nba_config, "_last_call", 100.0)
+        with patch("src.nba_config.time.monotonic", return_value=100.25):
+            rate_limit()
+
+        mock_sleep.assert_called_once_with(pytest.approx(0.75))
+
+    def test_no_sleep_after_slow_call(self, mock_sleep, monkeypatch):
+        monkeypatch.setattr(nba_config, "_last_call", 100.0)
+        with patch("src.nba_config.time.monotonic", return_value=102.0):
+            rate_limit()
+
+        mock_sleep.assert_not_called()
+
+    def test_records_call_time(self, mock_sleep, monkeypatch):
+        monkeypatch.setattr(nba_config, "_last_call", 0.0)
+        with patch("src.nba_config.time.monotonic", return_value=500.0):
+            rate_limit()
+
+        assert nba_config._last_call == 500.0
+
+    def test_concurrent_callers_reserve_successive_slots(self, mock_sleep, monkeypatch):
+        monkeypatch.setattr(nba_config, "_last_call", 0.0)
+        with patch("src.nba_config.time.monotonic", return_value=500.0):
+            rate_limit()
+            rate_limit()
+
+        assert [call.args[0] for call in mock_sleep.call_args_list] == [pytest.approx(1.0)]
+        assert nba_config._last_call == 501.0
+
+    def test_sleeps_outside_lock(self, mock_sleep, monkeypatch):
+        monkeypatch.setattr(nba_config, "_last_call", 100.0)
+        locked = []
+        mock_sleep.side_effect = lambda _: locked.append(nba_config._rate_limit_lock.locked())
+        with patch("src.nba_config.time.monotonic", return_value=100.25):
+            rate_limit()
+
+        assert locked == [False]
+
+
+@patch.multiple(
+    "src.nba_config",
+    NBA_RATE_LIMIT_MIN_SLEEP=0.5,
+    NBA_RATE_LIMIT_MAX_SLEEP=4.0,
+    _interval=1.0,
+    rate_limit=lambda: None,
+    wait_exponential=lambda **kwargs: wait_none(),
+)
+class TestAdaptiveInterval:
+    """Tests for the AIMD adjustment of the call interval."""
+
+    def test_timeout_doubles_then_success_shrinks(self):
+        nba_api_call(make_endpoint(ReadTimeout("Connection timed out"), failures=1), critical=True)
+
+        assert nba_config._interval == pytest.approx(2.0 * 0.9)
+
+    def test_success_shrinks_to_minimum(self):
+        for _ in range(20):
+            nba_api_call(FakeEndpoint, critical=True)
+
+        assert nba_config._interval == 0.5
+
+    def test_throttle_capped_at_maximum(self):
+        for _ in range(5):
+            nba_config._record_throttle()
+
+        assert nba_config._interval == 4.0
+
+
+class TestParsedResponse:
+    """Tests for the decode-once NBA stats response."""
+
+    def test_installed_for_stats_requests(self):
+        from nba_api.stats.library.http import NBAStatsHTTP
+
+        assert NBAStatsHTTP.nba_response is nba_config._ParsedResponse
+
+    def test_body_decoded_once(self):
+        response = nba_config._ParsedResponse(response='{"resultSets": []}', status_code=200, url=None)
+        with patch("nba_api.library.http.json.loads", return_value={"resultSets": []}) as mock_loads:
+            first = response.get_dict()
+            second = response.get_dict()
+
+        assert first is second
+        mock_loads.assert_called_once()
+
+
+class TestSession:
+    """Tests for the shared stats.nba.com session."""
+
+    def test_installed_for_stats_requests(self):
+        from nba_api.stats.library.http import NBAStatsHTTP
+
+        adapter = NBAStatsHTTP.get_session().get_adapter("https://stats.nba.com")
+        assert adapter.max_retries.total == 3
+        assert 429 in adapter.max_retries.status_forcelist
+        assert adapter._pool_maxsize == nba_config.NBA_FETCH_WORKERS
@@ -1,9 +1,18 @@
 """Tests for NBA data functions."""
 
 from datetime import datetime
+from unittest.mock import MagicMock, patch
 from zoneinfo import ZoneInfo
 
-from src.nba_data import get_earliest_game_time
+import pandas as pd
+import pytest
+
+from src import nba_data
+from src.nba_data import get_earliest_game_time, get_player_game_logs, get_players_for_teams
+from src.ttfl import calculate_ttfl
+
+TZ_EST = ZoneInfo("America/New_York")
+TZ_PARIS = ZoneInfo("Europe/Paris")
 
 
 class TestGetEarliestGameTime:
@@ -11,16 +20,15 @@ class TestGetEarliestGameTime:
 
     def test_finds_earliest_time(self):
         """Test finding earliest game time from multiple games."""
-        tz_est = ZoneInfo("America/New_York")
         games = [
-            {"game_id": "1", "game_time_utc": datetime(2025, 2, 5, 19, 0, tzinfo=tz_est)},  # 7pm
-            {"game_id": "2", "game_time_utc": datetime(2025, 2, 5, 21, 30, tzinfo=tz_est)},  # 9:30pm
-            {"game_id": "3", "game_time_utc": datetime(2025, 2, 5, 20, 0, tzinfo=tz_est)},  # 8pm
+            {"game_id": "1", "game_time_utc": datetime(2025, 2, 5, 19, 0, tzinfo=TZ_EST)},  # 7pm
+            {"game_id": "2", "game_time_utc": datetime(2025, 2, 5, 21, 30, tzinfo=TZ_EST)},  # 9:30pm
+            {"game_id": "3", "game_time_utc": datetime(2025, 2, 5, 20, 0, tzinfo=TZ_EST)},  # 8pm
         ]
         result = get_earliest_game_time(games)
         assert result is not None
         # 7pm EST = 1am Paris next day
-        assert result.tzinfo == ZoneInfo("Europe/Paris")
+        assert result.tzinfo == TZ_PARIS
         assert result.hour == 1  # 7pm EST = 1am Paris
 
     def test_returns_none_for_empty_list(self):
@@ -37,21 +45,188 @@ class TestGetEarliestGameTime:
 
     def test_single_game(self):
         """Test with single game."""
-        tz_est = ZoneInfo("America/New_York")
         games = [
-            {"game_id": "1", "game_time_utc": datetime(2025, 2, 5, 19, 30, tzinfo=tz_est)},
+            {"game_id": "1", "game_time_utc": datetime(2025, 2, 5, 19, 30, tzinfo=TZ_EST)},
         ]
         result = get_earliest_game_time(games)
         assert result is not None
-        assert result.tzinfo == ZoneInfo("Europe/Paris")
+        assert result.tzinfo == TZ_PARIS
 
     def test_mixed_games_with_and_without_times(self):
         """Test handles mix of games with and without times."""
-        tz_est = ZoneInfo("America/New_York")
         games = [
             {"game_id": "1", "game_time_utc": None},
-            {"game_id": "2", "game_time_utc": datetime(2025, 2, 5, 22, 0, tzinfo=tz_est)},
+            {"game_id": "2", "game_time_utc": datetime(2025, 2, 5, 22, 0, tzinfo=TZ_EST)},
             {"game_id": "3"},
         ]
         result = get_earliest_game_time(games)
         assert result is not None
+
+
+class TestGetPlayerGameLogs:
+    """Tests for get_player_game_logs disk caching."""
+
+    def _mock_game_log(self, rows):
+        endpoint = MagicMock()
+        endpoint.get_data_frames.return_value = [pd.DataFrame(rows)]
+        return endpoint
+
+    @patch("src.nba_data.nba_api_call")
+    def test_second_call_served_from_disk(self, mock_call, sample_game_stats):
+        """Test a repeat lookup on the same day skips the NBA API."""
+        mock_call.return_value = self._mock_game_log([{**sample_game_stats, "GAME_DATE": "FEB 01, 2025"}])
+
+        first = get_player_game_logs(1, season="2024-25")
+        second = get_player_game_logs(1, season="2024-25")
+
+        assert mock_call.call_count == 1
+        assert second == first
+        assert first[0]["game_date"] == "FEB 01, 2025"
+
+    @patch("src.nba_data.nba_api_call")
+    def test_scores_match_scalar_formula(self, mock_call, sample_game_stats):
+        """Test the column-wise TTFL matches calculate_ttfl row by row."""
+        rows = [
+            {**sample_game_stats, "GAME_DATE": "FEB 01, 2025"},
+            {**sample_game_stats, "PTS": 8, "FGA": 12, "TOV": 5, "GAME_DATE": "JAN 30, 2025"},
+        ]
+        mock_call.return_value = self._mock_game_log(rows)
+
+        games = get_player_game_logs(1, season="2024-25")
+
+        assert [g["ttfl_score"] for g in games] == [calculate_ttfl(row) for row in rows]
+        assert [g["pts"] for g in games] == [sample_game_stats["PTS"], 8]
+
+    @patch("src.nba_data.nba_api_call", return_value=None)
+    def test_failed_fetch_not_cached(self, mock_call):
+        """Test exhausted retries are retried on the next call."""
+        assert get_player_game_logs(1, season="2024-25") == []
+        assert get_player_game_logs(1, season="2024-25") == []
+        assert mock_call.call_count == 2
+
+
+@pytest.fixture
+def clean_roster_cache():
+    nba_data.clear_cache()
+    yield
+    nba_data.clear_cache()
+
+
+@pytest.mark.usefixtures("clean_roster_cache")
+class TestGetPlayersForTeams:
+    """Tests for get_players_for_teams with a mocked CommonAllPlayers."""
+
+    HEADERS = ["PERSON_ID", "DISPLAY_FIRST_LAST", "TEAM_ID", "TEAM_ABBREVIATION"]
+
+    def _mock_all_players(self, rows):
+        endpoint = MagicMock()
+        endpoint.get_dict.return_value = {"resultSets": [{"headers": self.HEADERS, "rowSet": rows}]}
+        return endpoint
+
+    @patch("src.nba_data.nba_api_call")
+    def test_filters_by_team_with_one_call(self, mock_call):
+        """Test every team is served from a single league-wide call."""
+        mock_call.return_value = self._mock_all_players([
+            [1, "LeBron James", 1610612747, "LAL"],
+            [2, "Jayson Tatum", 1610612738, "BOS"],
+            [3, "Free Agent", 0, ""],
+        ])
+
+        lakers = get_players_for_teams([1610612747])
+        both = get_players_for_teams([1610612747, 1610612738])
+
+        assert mock_call.call_count == 1
+        assert lakers == [{"id": 1, "name": "LeBron James", "team_id": 1610612747, "team": "LAL"}]
+        assert [p["name"] for p in both] == ["LeBron James", "Jayson Tatum"]
+
+    @patch("src.nba_data.nba_api_call", side_effect=RuntimeError("boom"))
+    def test_fetch_failure_returns_empty(self, mock_call):
+        """Test a failed roster fetch yields no players."""
+        assert get_players_for_teams([1610612747]) == []
+
+
+class TestLookups:
+    """Tests for the static team and player lookup tables."""
+
+    def test_team_abbrev(self):
+        assert nba_data.get_team_abbrev(1610612747) == "LAL"
+
+    def test_unknown_team_abbrev(self):
+        assert nba_data.get_team_abbrev(123) == "123"
+
+    def test_find_player_id_exact_and_partial(self):
+        assert nba_data.find_player_id("LeBron James") == 2544
+        assert nba_data.find_player_id("lebron") == 2544
+
+    def test_find_player_id_missing(self):
+        assert nba_data.find_player_id("Not A Real Player") is None
+
+
+class TestGetTodaysGames:
+    """Tests for get_todays_games with a mocked scoreboard."""
+
+    @patch("src.nba_data.nba_api_call")
+    def test_parses_game_header(self, mock_call):
+        """Test game rows become dicts with a parsed tip-off time."""
+        scoreboard = MagicMock()
+        scoreboard.get_dict.return_value = {"resultSets": [{
+            "headers": ["GAME_DATE_EST", "GAME_ID", "GAME_STATUS_TEXT", "HOME_TEAM_ID", "VISITOR_TEAM_ID"],
+            "rowSet": [["2025-02-01T00:00:00", "0022400001", "7:30 pm ET", 1610612747, 1610612738]],
+        }]}
+        mock_call.return_value = scoreboard
+
+        games = nba_data.get_todays_games("2025-02-01")
+
+        assert len(games) == 1
+        assert games[0]["home_team_id"] == 1610612747
+        assert games[0]["away_team_id"] == 1610612738
+        assert games[0]["game_time_utc"] == datetime(2025, 2, 1, 19, 30, tzinfo=TZ_EST)
+
+
+class TestGetLeagueAverageTtfl:
+    """Tests for get_league_average_ttfl with a mocked bulk endpoint."""
+
+    @patch("src.nba_data.nba_api_call")
+    def test_ttfl_from_per_game_averages(self, mock_call, sample_game_stats):
+        """Test the TTFL formula applied to averaged stats, keyed by player."""
+        headers = ["PLAYER_ID", "GP", *sample_game_stats]
+        endpoint = MagicMock()
+        endpoint.get_dict.return_value = {
+            "resultSets": [{"headers": headers, "rowSet": [[2544, 9, *sample_game_stats.values()]]}]
+        }
+        mock_call.return_value = endpoint
+
+        averages = nba_data.get_league_average_ttfl(season="2024-25")
+
+        # Averages equal the sample game, so the TTFL matches it (41)
+        assert averages == {2544: (41.0, 9)}
+        assert mock_call.call_args.kwargs["last_n_games"] == 10
+
+    @patch("src.nba_data.nba_api_call", return_value=None)
+    def test_unavailable_returns_empty(self, mock_call):
+        assert nba_data.get_league_average_ttfl(season="2024-25") == {}
+
+
+class TestGetPlayersPlayingTonight:
+    """Tests for get_players_playing_tonight."""
+
+    @patch("src.nba_data.get_players_for_teams")
+    @patch("src.nba_data.get_todays_games")
+    def test_attaches_opponents(self, mock_games, mock_players):
+        """Test each player gets the opposing team of their game."""
+        mock_games.return_value = [
+            {"home_team_id": 1, "away_team_id": 2},
+            {"home_team_id": 3, "away_team_id": 4},
+        ]
+        mock_players.return_value = [{"id": 10, "team_id": 2}, {"id": 11, "team_id": 3}]
+
+        players, games = nba_data.get_players_playing_tonight("2025-02-01")
+
+        assert sorted(mock_players.call_args.args[0]) == [1, 2, 3, 4]
+        assert [p["opponent_team_id"] for p in players] == [1, 4]
+        assert games == mock_games.return_value
+
+    def test_opponent_lookup_first_game_wins(self):
+        """Test both sides map to each other and a team's first game wins."""
+        games = [{"home_team_id": 1, "away_team_id": 2}, {"home_team_id": 3, "away_team_id": 1}]
+        assert nba_data._opponents_by_team(games) == {1: 2, 2: 1, 3: 1}
@@ -0,0 +1,29 @@
+"""Tests for current season detection."""
+
+from freezegun import freeze_time
+
+from src import get_current_season
+
+
+class TestGetCurrentSeason:
+    """Tests for get_current_season."""
+
+    @freeze_time("2025-11-15")
+    def test_fall_starts_new_season(self):
+        assert get_current_season() == "2025-26"
+
+    @freeze_time("2026-03-01")
+    def test_spring_belongs_to_previous_year_season(self):
+        assert get_current_season() == "2025-26"
+
+    @freeze_time("2025-10-01")
+    def test_october_boundary(self):
+        assert get_current_season() == "2025-26"
+
+    @freeze_time("2025-09-30")
+    def test_september_is_previous_season(self):
+        assert get_current_season() == "2024-25"
+
+    @freeze_time("2099-12-31")
+    def test_century_rollover(self):
+        assert get_current_season() == "2099-00"
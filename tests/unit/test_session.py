@@ -0,0 +1,103 @@
+"""Tests for TTFLSession recommendation caching."""
+
+from unittest.mock import patch
+
+import pytest
+
+from src.form_analysis import analyze_form_batch
+from src.picker import PlayerRecommendation
+from src.session import TTFLSession
+
+
+def _rec(player_id, name, score):
+    return PlayerRecommendation(
+        name=name,
+        team="LAL",
+        player_id=player_id,
+        opponent_team="BOS",
+        avg_ttfl=score,
+        weighted_avg=score,
+        trend_factor=1.0,
+        trend_direction="stable",
+        consistency_factor=1.0,
+        defense_factor=1.0,
+        best_defender=None,
+        defender_factor=1.0,
+        adjusted_score=score,
+        injury_status=None,
+        dnp_risk=0.0,
+        is_locked=False,
+    )
+
+
+@pytest.fixture
+def session():
+    with patch.object(TTFLSession, "_fetch_shared_data"):
+        session = TTFLSession(verbose=False)
+    session._players_cache["2025-02-01"] = ([], [])
+    return session
+
+
+@pytest.fixture
+def ranked():
+    return [
+        _rec(203999, "Nikola Jokic", 55.0),
+        _rec(2544, "LeBron James", 45.0),
+        _rec(1628369, "Jayson Tatum", 40.0),
+    ]
+
+
+class TestGetRecommendations:
+    """Tests for ranking reuse across calls."""
+
+    def test_ranking_computed_once_per_date(self, session, ranked):
+        with patch.object(TTFLSession, "_rank_players", return_value=ranked) as mock_rank:
+            session.get_recommendations(date="2025-02-01", top_n=2)
+            session.get_recommendations(date="2025-02-01", top_n=3, extra_locks={"Nikola Jokic"})
+
+        mock_rank.assert_called_once()
+
+    def test_extra_locks_filter_ranking(self, session, ranked):
+        with patch.object(TTFLSession, "_rank_players", return_value=ranked):
+            recs = session.get_recommendations(date="2025-02-01", top_n=2, extra_locks={"nikola jokic"})
+
+        assert [r.name for r in recs] == ["LeBron James", "Jayson Tatum"]
+
+    def test_extra_locks_flagged_when_included(self, session, ranked):
+        with patch.object(TTFLSession, "_rank_players", return_value=ranked):
+            recs = session.get_recommendations(
+                date="2025-02-01", top_n=1, include_locked=True, extra_locks={"Nikola Jokic"}
+            )
+
+        assert recs[0].name == "Nikola Jokic"
+        assert recs[0].is_locked
+        assert not ranked[0].is_locked  # Cached ranking is left untouched
+
+
+class TestRankPlayers:
+    """Tests for per-player caching inside the ranking."""
+
+    def test_form_analyzed_once_across_dates(self, session):
+        player = {"id": 1, "name": "Nikola Jokic", "team": "DEN", "team_id": 10, "opponent_team_id": 20}
+        session._players_cache["2025-02-01"] = ([dict(player)], [])
+        session._players_cache["2025-02-02"] = ([dict(player)], [])
+        session._league_averages = {}
+        session._ttfl_cache[1] = [50.0, 45.0, 55.0]
+
+        with patch("src.session.analyze_form_batch", wraps=analyze_form_batch) as mock_batch:
+            first = session._rank_players("2025-02-01", False, False, True, False)
+            second = session._rank_players("2025-02-02", False, False, True, False)
+
+        assert first[0].weighted_avg == second[0].weighted_avg
+        analyzed = [call.args[0] for call in mock_batch.call_args_list]
+        assert analyzed == [[[50.0, 45.0, 55.0]], []]
+
+    def test_locked_players_matched_case_insensitively(self, session):
+        player = {"id": 1, "name": "Nikola Jokic", "team": "DEN", "team_id": 10, "opponent_team_id": 20}
+        session._players_cache["2025-02-01"] = ([player], [])
+        session._league_averages = {}
+        session._ttfl_cache[1] = [50.0, 45.0, 55.0]
+        session._locked_cf = frozenset({"NIKOLA JOKIC".casefold()})
+
+        assert session._rank_players("2025-02-01", False, False, True, False) == []
+        assert [r.name for r in session._rank_players("2025-02-01", False, True, True, False)] == ["Nikola Jokic"]
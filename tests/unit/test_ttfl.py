@@ -1,8 +1,56 @@
 """Tests for TTFL score calculation."""
 
+import random
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
 import pytest
 
-from src.ttfl import calculate_ttfl, calculate_ttfl_from_game_log
+from src.ttfl import (
+    TTFL_STAT_COLUMNS,
+    calculate_ttfl,
+    calculate_ttfl_batch,
+)
+
+_ZERO_STATS = MappingProxyType(dict.fromkeys(TTFL_STAT_COLUMNS, 0))
+
+# Positive: 0 + 10 + 0 + 2 + 1 + 4 + 2 + 0 = 19
+# Negative: 4 + 2 + 0 + 1 = 7
+# Total: 19 - 7 = 12
+_NONE_STATS = MappingProxyType({
+    "PTS": None,
+    "REB": 10,
+    "AST": None,
+    "STL": 2,
+    "BLK": 1,
+    "FGM": 4,
+    "FGA": 8,
+    "FG3M": 2,
+    "FG3A": 4,
+    "FTM": 0,
+    "FTA": 0,
+    "TOV": 1,
+})
+
+# High-efficiency triple-double
+# Positive: 35 + 12 + 15 + 3 + 2 + 14 + 4 + 3 = 88
+# Negative: 6 + 4 + 1 + 4 = 15
+# Total: 88 - 15 = 73
+_TRIPLE_DOUBLE_STATS = MappingProxyType({
+    "PTS": 35,
+    "REB": 12,
+    "AST": 15,
+    "STL": 3,
+    "BLK": 2,
+    "FGM": 14,
+    "FGA": 20,
+    "FG3M": 4,
+    "FG3A": 8,
+    "FTM": 3,
+    "FTA": 4,
+    "TOV": 4,
+})
 
 
 class TestCalculateTTFL:
@@ -38,130 +86,92 @@ class TestCalculateTTFL:
         result = calculate_ttfl(turnover_heavy_stats)
         assert result == 23
 
-    def test_zero_stats(self):
-        """Test TTFL calculation with all zeros."""
-        stats = {
-            "PTS": 0,
-            "REB": 0,
-            "AST": 0,
-            "STL": 0,
-            "BLK": 0,
-            "FGM": 0,
-            "FGA": 0,
-            "FG3M": 0,
-            "FG3A": 0,
-            "FTM": 0,
-            "FTA": 0,
-            "TOV": 0,
-        }
-        result = calculate_ttfl(stats)
-        assert result == 0
-
-    def test_missing_keys(self):
-        """Test TTFL calculation with missing keys (defaults to 0)."""
-        stats = {"PTS": 10, "REB": 5}
-        result = calculate_ttfl(stats)
-        # Only PTS and REB contribute
-        assert result == 15
-
-    def test_empty_dict(self):
-        """Test TTFL calculation with empty dict."""
-        result = calculate_ttfl({})
-        assert result == 0
-
-    def test_none_values(self):
-        """Test TTFL calculation with None values (treated as 0)."""
-        stats = {
-            "PTS": None,
-            "REB": 10,
-            "AST": None,
-            "STL": 2,
-            "BLK": 1,
-            "FGM": 4,
-            "FGA": 8,
-            "FG3M": 2,
-            "FG3A": 4,
-            "FTM": 0,
-            "FTA": 0,
-            "TOV": 1,
-        }
-        # Positive: 0 + 10 + 0 + 2 + 1 + 4 + 2 + 0 = 19
-        # Negative: 4 + 2 + 0 + 1 = 7
-        # Total: 19 - 7 = 12
-        result = calculate_ttfl(stats)
-        assert result == 12
-
-    def test_high_efficiency_game(self):
-        """Test high-efficiency triple-double game."""
-        stats = {
-            "PTS": 35,
-            "REB": 12,
-            "AST": 15,
-            "STL": 3,
-            "BLK": 2,
-            "FGM": 14,
-            "FGA": 20,
-            "FG3M": 4,
-            "FG3A": 8,
-            "FTM": 3,
-            "FTA": 4,
-            "TOV": 4,
-        }
-        # Positive: 35 + 12 + 15 + 3 + 2 + 14 + 4 + 3 = 88
-        # Negative: 6 + 4 + 1 + 4 = 15
-        # Total: 88 - 15 = 73
-        result = calculate_ttfl(stats)
-        assert result == 73
-
-
-class TestCalculateTTFLFromGameLog:
-    """Tests for calculate_ttfl_from_game_log function."""
-
-    def test_game_log_format(self):
-        """Test that game log format is properly handled."""
-        game_log = {
-            "PTS": 25,
-            "REB": 8,
-            "AST": 6,
-            "STL": 2,
-            "BLK": 1,
-            "FGM": 10,
-            "FGA": 18,
-            "FG3M": 3,
-            "FG3A": 7,
-            "FTM": 2,
-            "FTA": 3,
-            "TOV": 3,
-        }
-        result = calculate_ttfl_from_game_log(game_log)
-        assert result == 41
-
-    def test_game_log_with_extra_fields(self):
-        """Test game log with additional fields that should be ignored."""
-        game_log = {
-            "PTS": 20,
-            "REB": 5,
-            "AST": 5,
-            "STL": 1,
-            "BLK": 1,
-            "FGM": 8,
-            "FGA": 15,
-            "FG3M": 2,
-            "FG3A": 6,
-            "FTM": 2,
-            "FTA": 2,
-            "TOV": 2,
-            "MIN": "32:00",  # Extra field
-            "PLUS_MINUS": 10,  # Extra field
-            "GAME_ID": "0022300123",  # Extra field
-        }
-        # Positive: 20 + 5 + 5 + 1 + 1 + 8 + 2 + 2 = 44
-        # Negative: 7 + 4 + 0 + 2 = 13
-        # Total: 44 - 13 = 31
-        result = calculate_ttfl_from_game_log(game_log)
-        assert result == 31
-
-    def test_game_log_empty(self):
-        """Test empty game log."""
-        result = calculate_ttfl_from_game_log({})
-        assert result == 0
+    @pytest.mark.parametrize(
+        ("stats", "expected"),
+        [
+            pytest.param(_ZERO_STATS, 0, id="zeros"),
+            # Missing keys default to 0: only PTS and REB contribute
+            pytest.param(MappingProxyType({"PTS": 10, "REB": 5}), 15, id="missing-keys"),
+            pytest.param(MappingProxyType({}), 0, id="empty"),
+            # None values are treated as 0
+            pytest.param(_NONE_STATS, 12, id="none-values"),
+            pytest.param(_TRIPLE_DOUBLE_STATS, 73, id="high-efficiency"),
+        ],
+    )
+    def test_stat_line(self, stats, expected):
+        """Test TTFL calculation for edge-case and literal stat lines."""
+        assert calculate_ttfl(stats) == expected
+
+    def test_random_stat_lines(self):
+        """Test scoring properties over many generated stat lines (seeded, so reproducible)."""
+        rng = random.Random(0)
+        for _ in range(25):
+            makes = {"FGM": rng.randint(0, 15), "FG3M": rng.randint(0, 6), "FTM": rng.randint(0, 10)}
+            stats = {
+                "PTS": rng.randint(0, 50),
+                "REB": rng.randint(0, 20),
+                "AST": rng.randint(0, 15),
+                "STL": rng.randint(0, 5),
+                "BLK": rng.randint(0, 5),
+                "TOV": rng.randint(0, 8),
+                **makes,
+                # Perfect shooting: attempts equal makes
+                "FGA": makes["FGM"],
+                "FG3A": makes["FG3M"],
+                "FTA": makes["FTM"],
+            }
+            positives = sum(stats[k] for k in ("PTS", "REB", "AST", "STL", "BLK", "FGM", "FG3M", "FTM"))
+
+            # Without misses only turnovers are subtracted
+            assert calculate_ttfl(stats) == positives - stats["TOV"]
+            # Every missed shot costs exactly one point
+            for attempts in ("FGA", "FG3A", "FTA"):
+                assert calculate_ttfl({**stats, attempts: stats[attempts] + 1}) == positives - stats["TOV"] - 1
+
+
+# Game log stat lines, one row per game
+_GAME_LOGS = np.array(
+    [
+        (25, 8, 6, 2, 1, 10, 18, 3, 7, 2, 3, 3),
+        (20, 5, 5, 1, 1, 8, 15, 2, 6, 2, 2, 2),
+    ],
+    dtype=[(col, "i4") for col in ("PTS", "REB", "AST", "STL", "BLK", "FGM", "FGA", "FG3M", "FG3A", "FTM", "FTA", "TOV")],
+)
+
+# Game log fields that don't count toward the score
+_EXTRA_LOG_FIELDS = MappingProxyType({"MIN": "32:00", "PLUS_MINUS": 10, "GAME_ID": "0022300123"})
+
+
+class TestCalculateTTFLBatch:
+    """Tests for calculate_ttfl_batch function."""
+
+    def test_matches_scalar_formula(self, sample_game_stats, perfect_shooting_stats, turnover_heavy_stats):
+        """Test each row scores the same as calculate_ttfl."""
+        rows = [sample_game_stats, perfect_shooting_stats, turnover_heavy_stats]
+        result = calculate_ttfl_batch(pd.DataFrame(rows))
+        assert result.tolist() == [calculate_ttfl(row) for row in rows]
+
+    def test_game_logs_match_formula(self):
+        """Test game logs (extra fields ignored) score the same as the formula."""
+        # Positive stats minus misses and turnovers, for every log at once
+        expected = (
+            _GAME_LOGS["PTS"] + _GAME_LOGS["REB"] + _GAME_LOGS["AST"] + _GAME_LOGS["STL"] + _GAME_LOGS["BLK"]
+            + _GAME_LOGS["FGM"] + _GAME_LOGS["FG3M"] + _GAME_LOGS["FTM"]
+            - (_GAME_LOGS["FGA"] - _GAME_LOGS["FGM"])
+            - (_GAME_LOGS["FG3A"] - _GAME_LOGS["FG3M"])
+            - (_GAME_LOGS["FTA"] - _GAME_LOGS["FTM"])
+            - _GAME_LOGS["TOV"]
+        )
+        assert expected.tolist() == [41, 31]
+
+        game_logs = pd.DataFrame(_GAME_LOGS).assign(**_EXTRA_LOG_FIELDS)
+        assert calculate_ttfl_batch(game_logs).tolist() == expected.tolist()
+
+    def test_missing_values_count_as_zero(self):
+        """Test missing columns and NaN values are treated as 0."""
+        df = pd.DataFrame([{"PTS": 10, "REB": None}, {"PTS": 5, "REB": 3}])
+        assert calculate_ttfl_batch(df).tolist() == [10, 8]
+
+    def test_empty_frame(self):
+        """Test an empty DataFrame gives an empty array."""
+        assert calculate_ttfl_batch(pd.DataFrame()).tolist() == []
@@ -0,0 +1,143 @@
+"""Tests for TTFL website history parsing."""
+
+from unittest.mock import patch
+
+import pytest
+import responses
+from freezegun import freeze_time
+
+from src.ttfl_client import get_locked_players, get_pick_history, load_cookies, parse_history_html
+
+HISTORY_URL = "https://fantasy.trashtalk.co/?tpl=historique"
+
+HISTORY_HTML = """
+<html>
+<head><title>Historique</title><script>var x = "<table>";</script></head>
+<body>
+<nav><a href="/">Accueil</a></nav>
+<table>
+  <tr><th>Date</th><th>Joueur</th><th>Pts</th><th>Reb</th><th>Ast</th><th>Stl</th><th>Blk</th>
+      <th>Ftm</th><th>Fgm</th><th>Fg3m</th><th>Malus</th><th>Score</th><th>Bonus x2</th></tr>
+  <tr><th>2025-01-21</th><td>Luka Dončić</td><td>40</td><td>10</td><td>9</td><td>2</td><td>1</td>
+      <td>8</td><td>14</td><td>4</td><td>15</td><td>69</td><td>oui</td></tr>
+  <tr><th>2025-01-20</th><td>Nikola Jokic</td><td>25</td><td>12</td><td>10</td><td>1</td><td>0</td>
+      <td>5</td><td>10</td><td>0</td><td>8</td><td>55</td><td>non</td></tr>
+</table>
+<footer>Trashtalk</footer>
+</body>
+</html>
+"""
+
+
+class TestParseHistoryHtml:
+    """Tests for parse_history_html."""
+
+    def test_parses_pick_rows(self):
+        picks = parse_history_html(HISTORY_HTML)
+
+        assert [p["player"] for p in picks] == ["Luka Dončić", "Nikola Jokic"]
+        assert picks[0]["date"] == "2025-01-21"
+        assert picks[0]["score"] == 69
+        assert picks[0]["locked"] is True
+        assert picks[1]["locked"] is False
+
+    def test_parses_stats(self):
+        picks = parse_history_html(HISTORY_HTML)
+
+        assert picks[0]["stats"] == {
+            "pts": 40, "reb": 10, "ast": 9, "stl": 2, "blk": 1,
+            "ftm": 8, "fgm": 14, "fg3m": 4, "malus": 15,
+        }
+
+    def test_skip_stats(self):
+        picks = parse_history_html(HISTORY_HTML, parse_stats=False)
+
+        assert picks[0]["stats"] is None
+        assert picks[0]["score"] == 69
+
+    def test_no_table(self):
+        assert parse_history_html("<html><body><p>Connectez-vous</p></body></html>") == []
+
+    def test_rows_inside_tbody(self):
+        html = HISTORY_HTML.replace("<table>", "<table><tbody>").replace("</table>", "</tbody></table>")
+
+        assert len(parse_history_html(html)) == 2
+
+
+@pytest.fixture
+def cookie_file(tmp_path):
+    path = tmp_path / "cookies.txt"
+    path.write_text(
+        "# Netscape HTTP Cookie File\n"
+        "fantasy.trashtalk.co\tFALSE\t/\tTRUE\t2000000000\tsession\tabc123\n"
+    )
+    return str(path)
+
+
+class TestLoadCookies:
+    """Tests for load_cookies."""
+
+    def test_reads_name_and_value(self, cookie_file):
+        assert load_cookies(cookie_file) == {"session": "abc123"}
+
+    def test_http_only_and_expired_cookies(self, tmp_path):
+        path = tmp_path / "cookies.txt"
+        path.write_text(
+            "# Netscape HTTP Cookie File\n"
+            "\n"
+            "#HttpOnly_.trashtalk.co\tTRUE\t/\tTRUE\t2000000000\tauth\ttoken\n"
+            "fantasy.trashtalk.co\tFALSE\t/\tFALSE\t1\told\tvalue with spaces\r\n"
+            "malformed line\n"
+        )
+
+        assert load_cookies(str(path)) == {"auth": "token", "old": "value with spaces"}
+
+
+class TestGetPickHistory:
+    """Tests for get_pick_history caching."""
+
+    @responses.activate
+    def test_second_call_served_from_disk(self, cookie_file):
+        responses.add(responses.GET, HISTORY_URL, body=HISTORY_HTML)
+
+        first = get_pick_history(cookie_file)
+        second = get_pick_history(cookie_file)
+
+        assert len(responses.calls) == 1
+        assert second == first
+        assert "session=abc123" in responses.calls[0].request.headers["Cookie"]
+
+    @responses.activate
+    def test_new_cookie_file_refetches(self, cookie_file):
+        responses.add(responses.GET, HISTORY_URL, body=HISTORY_HTML)
+
+        get_pick_history(cookie_file)
+        with open(cookie_file, "a") as f:
+            f.write("fantasy.trashtalk.co\tFALSE\t/\tTRUE\t2000000000\tother\txyz\n")
+        get_pick_history(cookie_file)
+
+        assert len(responses.calls) == 2
+
+
+@freeze_time("2025-02-10 12:00:00")
+class TestGetLockedPlayers:
+    """Tests for get_locked_players."""
+
+    @patch("src.ttfl_client.get_pick_history")
+    def test_recent_picks_locked(self, mock_history):
+        mock_history.return_value = [
+            {"date": "2025-02-09", "player": "Luka Dončić", "locked": False},
+            {"date": "2025-01-12", "player": "Nikola Jokic", "locked": False},
+            {"date": "2024-12-01", "player": "LeBron James", "locked": True},
+        ]
+
+        assert get_locked_players("cookies.txt") == {"Luka Dončić", "Nikola Jokic"}
+
+    @patch("src.ttfl_client.get_pick_history")
+    def test_unparseable_date_falls_back_to_flag(self, mock_history):
+        mock_history.return_value = [
+            {"date": "hier", "player": "Luka Dončić", "locked": True},
+            {"date": "hier", "player": "Nikola Jokic", "locked": False},
+        ]
+
+        assert get_locked_players("cookies.txt") == {"Luka Dončić"}